@@ -4,12 +4,15 @@ All AI agents inherit from this abstract base class
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
-from openai import AsyncOpenAI
+from typing import Dict, List, Optional, Any, AsyncIterator
 from app.config import settings
+from app.agents.llm_scheduler import llm_scheduler
+from app.utils.lazy_import import lazy_import
 import json
 import time
 
+openai = lazy_import("openai")  # Loaded when the first agent is constructed
+
 
 class BaseAgent(ABC):
     """Abstract base class for all AI agents"""
@@ -27,7 +30,7 @@ class BaseAgent(ABC):
         self.temperature = temperature
         self.max_tokens = max_tokens
         self.system_prompt = system_prompt
-        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         
         # Performance tracking
         self.total_calls = 0
@@ -51,33 +54,44 @@ class BaseAgent(ABC):
         messages: List[Dict[str, str]],
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
-        response_format: Optional[Dict] = None
+        response_format: Optional[Dict] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Call OpenAI API with retry logic and cost tracking
+        `model` overrides the agent's default model for this call;
+        `timeout` (seconds) caps the HTTP call, e.g. to the request deadline,
+        and includes time queued in the LLM scheduler;
+        `priority` overrides the current `llm_priority` class
         """
         start_time = time.time()
+        model = model or self.model
         
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=temperature or self.temperature,
-                max_tokens=max_tokens or self.max_tokens,
-                response_format=response_format
-            )
+            async with llm_scheduler.slot(model, priority, timeout) as usage:
+                if timeout is not None:
+                    timeout = max(timeout - usage.waited_ms / 1000, 0.001)
+                response = await self.client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature or self.temperature,
+                    max_tokens=max_tokens or self.max_tokens,
+                    response_format=response_format,
+                    **({"timeout": timeout} if timeout is not None else {})
+                )
+                usage.completion_tokens = response.usage.completion_tokens
             
             # Extract data
             content = response.choices[0].message.content
             tokens_used = response.usage.total_tokens
             
-            # Calculate cost (GPT-4-turbo pricing as of Dec 2024)
-            if "gpt-4" in self.model:
-                cost = (response.usage.prompt_tokens * 0.00001) + \
-                       (response.usage.completion_tokens * 0.00003)
-            else:  # GPT-3.5
-                cost = (response.usage.prompt_tokens * 0.0000005) + \
-                       (response.usage.completion_tokens * 0.0000015)
+            cost = self._calculate_cost(
+                response.usage.prompt_tokens,
+                response.usage.completion_tokens,
+                model
+            )
             
             # Track metrics
             self.total_calls += 1
@@ -91,12 +105,70 @@ class BaseAgent(ABC):
                 "tokens_used": tokens_used,
                 "cost": cost,
                 "latency_ms": latency_ms,
-                "model": self.model
+                "model": model,
+                "prompt_tokens": response.usage.prompt_tokens,
+                "completion_tokens": response.usage.completion_tokens,
+                "queued_ms": int(usage.waited_ms)
             }
             
         except Exception as e:
             raise Exception(f"{self.name} agent error: {str(e)}")
     
+    async def stream_openai(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        response_format: Optional[Dict] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream completion text deltas from OpenAI
+        
+        Streamed responses carry no usage block, so tokens are estimated
+        (~4 characters per prompt token, one token per content delta)
+        """
+        try:
+            # The slot is held for the whole stream
+            async with llm_scheduler.slot(self.model) as usage:
+                stream = await self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=temperature or self.temperature,
+                    max_tokens=max_tokens or self.max_tokens,
+                    response_format=response_format,
+                    stream=True
+                )
+                
+                completion_tokens = 0
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        completion_tokens += 1
+                        usage.completion_tokens = completion_tokens
+                        yield delta
+                    
+        except Exception as e:
+            raise Exception(f"{self.name} agent error: {str(e)}")
+        
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        self.total_calls += 1
+        self.total_tokens += prompt_tokens + completion_tokens
+        self.total_cost += self._calculate_cost(prompt_tokens, completion_tokens)
+    
+    def _calculate_cost(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        model: Optional[str] = None
+    ) -> float:
+        """Calculate cost (GPT-4-turbo pricing as of Dec 2024)"""
+        if "gpt-4" in (model or self.model):
+            return (prompt_tokens * 0.00001) + (completion_tokens * 0.00003)
+        # GPT-3.5
+        return (prompt_tokens * 0.0000005) + (completion_tokens * 0.0000015)
+    
     def get_metrics(self) -> Dict[str, Any]:
         """Return agent performance metrics"""
         return {
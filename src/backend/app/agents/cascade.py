@@ -0,0 +1,209 @@
+"""
+Model Cascade
+Quality gates and per-topic accounting for cheap-model-first answering
+"""
+
+from typing import Dict, Any, Optional, List, Tuple, FrozenSet
+from decimal import Decimal
+from app.config import EXAM_PARTS
+import re
+
+
+# Anything that looks like an authority the student can look up
+_CITATION_RE = re.compile(
+    r"\b(pub(lication)?\.?\s*\d+|irc\b|§\s*\d+|section\s+\d+|circular\s+230|"
+    r"treas(ury)?\.?\s*reg|form\s+\d+|schedule\s+[a-z]\b)",
+    re.IGNORECASE
+)
+_AMOUNT_RE = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)|\b(\d+(?:\.\d+)?)\s?%")
+_WORD_RE = re.compile(r"[a-z]{4,}")
+
+# Pieces of an answer that carry its conclusion
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_CONCLUSION_RE = re.compile(
+    r"\b(therefore|thus|so|in (short|summary)|bottom line|overall|the answer|correct answer)\b",
+    re.IGNORECASE
+)
+_CHOICE_RE = re.compile(r"\b[Aa]nswer(?:\s+is)?\s*[:\-]?\s*\**\(?([A-D])\b")
+_NEGATION_RE = re.compile(
+    r"\b(not|no|cannot|never|neither|nor|isn't|aren't|doesn't|don't|can't|won't|wouldn't)\b",
+    re.IGNORECASE
+)
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if word.endswith("s") else word
+
+
+# topic -> stems of its significant words, from the exam blueprint
+_TOPIC_STEMS = {
+    topic: {_stem(w) for w in _WORD_RE.findall(topic.lower())} | set(re.findall(r"\d+", topic))
+    for part in EXAM_PARTS.values()
+    for topic in part["topics"]
+}
+
+
+def classify_topic(user_message: str) -> str:
+    """Best-matching blueprint topic for a question ("general" if none)"""
+    words = {_stem(w) for w in _WORD_RE.findall(user_message.lower())}
+    words |= set(re.findall(r"\d+", user_message))
+
+    best_topic, best_hits = "general", 0
+    for topic, stems in _TOPIC_STEMS.items():
+        hits = len(stems & words)
+        if hits > best_hits:
+            best_topic, best_hits = topic, hits
+    return best_topic
+
+
+def has_citation(answer: str) -> bool:
+    return bool(_CITATION_RE.search(answer))
+
+
+def _amounts(text: str) -> FrozenSet[str]:
+    """Dollar amounts and percentages, normalized ("$1,000.00" == "$1000")"""
+    amounts = set()
+    for dollars, percent in _AMOUNT_RE.findall(text):
+        value = Decimal((dollars or percent).replace(",", "")).normalize()
+        amounts.add(f"${value:f}" if dollars else f"{value:f}%")
+    return frozenset(amounts)
+
+
+def _conclusion(answer: str) -> Tuple[Optional[str], FrozenSet[str], bool]:
+    """
+    (answer choice, amounts, negated) of an answer's conclusion
+
+    The conclusion is the last sentence with a marker such as "therefore"
+    or "the answer", else the last sentence stating an amount, else the
+    last sentence.
+    """
+    choices = _CHOICE_RE.findall(answer)
+    sentences = [s for s in _SENTENCE_SPLIT_RE.split(answer) if s.strip()]
+    if not sentences:
+        return (choices[-1] if choices else None), frozenset(), False
+
+    conclusion = next(
+        (s for s in reversed(sentences) if _CONCLUSION_RE.search(s)),
+        next((s for s in reversed(sentences) if _AMOUNT_RE.search(s)), sentences[-1])
+    )
+    return (choices[-1] if choices else None), _amounts(conclusion), bool(_NEGATION_RE.search(conclusion))
+
+
+def answers_agree(first: str, second: str) -> bool:
+    """
+    Self-consistency check between two sampled answers
+
+    Paraphrases share little wording, so this compares what each answer
+    concludes: the answer choice (when both give one), and the dollar
+    amounts / percentages of the concluding sentence, or, when it states
+    none, whether it is negated ("is deductible" vs "is not deductible").
+    """
+    first_choice, first_amounts, first_negated = _conclusion(first)
+    second_choice, second_amounts, second_negated = _conclusion(second)
+
+    if first_choice and second_choice and first_choice != second_choice:
+        return False
+    if first_amounts or second_amounts:
+        return first_amounts == second_amounts
+    return first_negated == second_negated
+
+
+def quality_gate(
+    answer: str,
+    require_citation: bool,
+    second_answer: Optional[str] = None
+) -> Optional[str]:
+    """
+    Decide whether a fast-model answer is good enough
+    (retrieval confidence is checked before generation, by the caller)
+
+    Returns:
+        None if it passes, otherwise the escalation reason
+    """
+    if require_citation and not has_citation(answer):
+        return "missing_citation"
+    if second_answer is not None and not answers_agree(answer, second_answer):
+        return "inconsistent"
+    return None
+
+
+class CascadeStats:
+    """Per-topic escalation rate, latency saved and cost saved"""
+
+    def __init__(self):
+        self._topics: Dict[str, Dict[str, Any]] = {}
+
+        # Running average large-model latency, used to estimate what a fast answer avoided
+        self._large_calls = 0
+        self._large_latency_ms = 0.0
+
+    def _topic(self, topic: str) -> Dict[str, Any]:
+        if topic not in self._topics:
+            self._topics[topic] = {
+                "requests": 0,
+                "fast_answered": 0,
+                "escalated": 0,
+                "direct_large": 0,
+                "escalation_reasons": {},
+                "latency_saved_ms": 0.0,
+                "cost_saved": 0.0,
+            }
+        return self._topics[topic]
+
+    def record_large(self, topic: str, result: Dict[str, Any], direct: bool = False) -> None:
+        """A large-model answer (escalated, or sent straight to the large model)"""
+        self._large_calls += 1
+        self._large_latency_ms += (result["latency_ms"] - self._large_latency_ms) / self._large_calls
+
+        if direct:
+            stats = self._topic(topic)
+            stats["requests"] += 1
+            stats["direct_large"] += 1
+
+    def record_fast(
+        self,
+        topic: str,
+        fast_results: List[Dict[str, Any]],
+        large_cost_estimate: float
+    ) -> None:
+        """
+        Fast model answered and passed the gate
+
+        Args:
+            large_cost_estimate: What the same tokens would have cost on the large model
+        """
+        stats = self._topic(topic)
+        stats["requests"] += 1
+        stats["fast_answered"] += 1
+
+        stats["cost_saved"] += large_cost_estimate - sum(r["cost"] for r in fast_results)
+        if self._large_calls:
+            stats["latency_saved_ms"] += (
+                self._large_latency_ms - max(r["latency_ms"] for r in fast_results)
+            )
+
+    def record_escalation(self, topic: str, reason: str, fast_results: List[Dict[str, Any]]) -> None:
+        """Fast answer failed the gate; its latency and cost were wasted"""
+        stats = self._topic(topic)
+        stats["requests"] += 1
+        stats["escalated"] += 1
+        stats["escalation_reasons"][reason] = stats["escalation_reasons"].get(reason, 0) + 1
+        stats["latency_saved_ms"] -= max(r["latency_ms"] for r in fast_results)
+        stats["cost_saved"] -= sum(r["cost"] for r in fast_results)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        by_topic = {}
+        for topic, stats in self._topics.items():
+            tried_fast = stats["fast_answered"] + stats["escalated"]
+            by_topic[topic] = {
+                **stats,
+                "escalation_rate": round(stats["escalated"] / tried_fast, 3) if tried_fast else 0.0,
+                "latency_saved_ms": round(stats["latency_saved_ms"], 1),
+                "cost_saved": round(stats["cost_saved"], 4),
+            }
+
+        return {
+            "by_topic": by_topic,
+            "total_latency_saved_ms": round(sum(t["latency_saved_ms"] for t in self._topics.values()), 1),
+            "total_cost_saved": round(sum(t["cost_saved"] for t in self._topics.values()), 4),
+        }
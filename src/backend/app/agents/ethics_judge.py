@@ -0,0 +1,136 @@
+"""
+Ethics Judge Agent
+Drafts Circular 230 roleplay scenario trees offline and judges free-text
+answers that fall outside a tree's precomputed branches
+"""
+
+from typing import Dict, Any, Optional
+from app.agents.base_agent import BaseAgent
+from app.config import settings, SYSTEM_PROMPTS
+from app.schemas.ethics import EthicsVerdict
+import json
+
+
+SCENARIO_SCHEMA = """{
+  "title": "short title",
+  "client_name": "name",
+  "client_avatar": "one emoji",
+  "root": "n1",
+  "nodes": {
+    "n1": {
+      "situation": "what the preparer sees",
+      "prompt": "what the client says or asks, in quotes",
+      "choices": [
+        {
+          "text": "what the preparer does",
+          "is_ethical": true,
+          "reference": "Circular 230 section, e.g. §10.22 - Diligence as to Accuracy",
+          "outcome": "consequence and why, citing the section",
+          "practice_rights_impact": 10,
+          "next": "n2"
+        }
+      ]
+    },
+    "n2": {"situation": "...", "prompt": "...", "choices": []}
+  }
+}"""
+
+
+class EthicsJudgeAgent(BaseAgent):
+    """
+    LLM side of the ethics roleplay: never called on the turn path for
+    a precomputed choice, only offline and for unmatched free text
+    """
+
+    def __init__(self):
+        super().__init__(
+            name="ethics_judge",
+            model=settings.OPENAI_MODEL_SPECIALIST,
+            temperature=settings.DATA_ANALYST_TEMPERATURE,  # Consistent rulings for cached answers
+            max_tokens=600,
+            system_prompt=SYSTEM_PROMPTS["tax_specialist"]
+        )
+
+    async def process(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Judge a free-text answer to one scenario node
+
+        Args:
+            user_message: The student's answer
+            context: {"node": node payload (situation, prompt, choices)}
+
+        Returns:
+            {"matches_choice": int | None, "is_ethical", "reference",
+             "outcome", "practice_rights_impact"} plus usage
+
+        Raises:
+            pydantic.ValidationError: the ruling has no usable is_ethical
+        """
+        node = (context or {}).get("node", {})
+        choices = "\n".join(f"{c['index']}. {c['text']}" for c in node.get("choices", []))
+
+        prompt = (
+            "You are grading a Circular 230 ethics roleplay.\n\n"
+            f"Situation: {node.get('situation', '')}\n"
+            f"Client: {node.get('prompt', '')}\n\n"
+            f"Scripted responses:\n{choices}\n\n"
+            f"Student's response: {user_message}\n\n"
+            "If the student's response means the same as one scripted response, set "
+            "matches_choice to its number. Otherwise set matches_choice to null and judge it "
+            "yourself. Return JSON: {\"matches_choice\": int or null, \"is_ethical\": bool, "
+            "\"reference\": \"Circular 230 section\", \"outcome\": \"2-3 sentences: consequence "
+            "and why\", \"practice_rights_impact\": int from -30 to 10}"
+        )
+
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+        result = await self.call_openai(
+            messages=messages,
+            response_format={"type": "json_object"}
+        )
+        verdict = EthicsVerdict.model_validate(json.loads(result["content"])).model_dump()
+
+        return {
+            **verdict,
+            "tokens_used": result["tokens_used"],
+            "cost": result["cost"],
+            "latency_ms": result["latency_ms"]
+        }
+
+    async def draft_scenario(self, topic: str, depth: int, branching: int) -> Dict[str, Any]:
+        """
+        Draft one branching scenario tree for a Part 3 topic (offline generation)
+
+        Returns:
+            Scenario dict in the ScenarioStore input format
+        """
+        prompt = (
+            f"Write a branching roleplay scenario for EA exam Part 3, topic: {topic}.\n"
+            "A client pressures an Enrolled Agent toward a Circular 230 violation.\n"
+            f"- Every non-final node has {branching} choices, exactly one ethical\n"
+            f"- Paths are {depth} decisions deep: ethical choices lead on to a follow-up "
+            "complication, unethical choices may end the scenario (next: null) or escalate\n"
+            "- Final nodes have an empty choices list and describe how the engagement ends\n"
+            "- Cite the specific Circular 230 section in every choice\n\n"
+            f"Return JSON exactly in this shape:\n{SCENARIO_SCHEMA}"
+        )
+
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+        result = await self.call_openai(
+            messages=messages,
+            temperature=settings.TAX_SPECIALIST_TEMPERATURE,
+            max_tokens=settings.MAX_TOKENS_SPECIALIST,
+            response_format={"type": "json_object"}
+        )
+        return dict(json.loads(result["content"]), topic=topic)
@@ -0,0 +1,274 @@
+"""
+LLM Scheduler
+Process-wide admission control for outbound LLM calls: priority classes
+and an adaptive (AIMD) concurrency limit per model
+"""
+
+from typing import Dict, Any, Optional, List, Deque, AsyncIterator, Iterator
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from app.config import settings
+import asyncio
+import statistics
+import time
+
+
+PRIORITY_INTERACTIVE = "interactive"  # Chat: a user is waiting on the answer
+PRIORITY_PRACTICE = "practice"  # On-demand practice question generation
+PRIORITY_BATCH = "batch"  # Offline jobs (question bank, mission flavor text)
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_PRACTICE, PRIORITY_BATCH)  # Highest first
+
+# Rough time-to-first-token in completion-token equivalents, so short
+# (routing) and long (answer) calls give comparable latency samples
+_PREFILL_TOKENS = 32
+
+# Weight of each window's median in the latency baseline
+_BASELINE_ALPHA = 0.1
+
+_current_priority: ContextVar[str] = ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """
+    Run LLM calls made inside the block (and tasks started there) at `priority`
+
+    Example:
+        with llm_priority(PRIORITY_BATCH):
+            await generate_question_bank(...)
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Provider 429 (openai.RateLimitError and friends carry status_code)"""
+    return getattr(error, "status_code", None) == 429
+
+
+class SlotUsage:
+    """What the caller reports back about a call made in a scheduler slot"""
+
+    def __init__(self, waited_ms: float):
+        self.waited_ms = waited_ms
+        self.completion_tokens = 0
+
+
+class ModelLimiter:
+    """
+    Concurrency limit and priority queues for one model
+
+    The limit follows AIMD: it grows by ~1 per limit's worth of successful
+    calls while the limit is what holds callers back, halves on a 429,
+    and shrinks gently when latency per token climbs past
+    LLM_LATENCY_TOLERANCE x the baseline. Like TCP, it backs off at most
+    once per window (a limit's worth of finished calls), since one
+    overload burst fails or slows every call in flight at once.
+
+    Latency is judged per window of at least LLM_LATENCY_WINDOW calls:
+    the window's median ms/token is compared with the baseline, an EWMA
+    of earlier window medians. Single slow calls (normal provider jitter)
+    never move the limit; only a sustained rise does, and the baseline
+    follows a provider that stays slower.
+
+    Waiters are admitted strictly by priority. Lower classes may only
+    fill a share of the limit (LLM_PRACTICE_SHARE / LLM_BATCH_SHARE), so
+    the remaining slots are usually free when interactive calls arrive.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.limit = float(settings.LLM_CONCURRENCY_INITIAL)
+        self.in_flight = 0
+        self._queues: Dict[str, Deque[asyncio.Future]] = {p: deque() for p in PRIORITIES}
+        self._waits: Dict[str, Deque[float]] = {p: deque(maxlen=1000) for p in PRIORITIES}
+
+        self.baseline_ms_per_token: Optional[float] = None
+        self._window: List[float] = []  # ms/token of calls in the current latency window
+        self._since_decrease = 0  # Calls finished since the last backoff
+
+        self.completed = 0
+        self.rate_limited = 0
+        self.decreases = 0
+
+    def _capacity(self, priority: str) -> int:
+        share = {
+            PRIORITY_INTERACTIVE: 1.0,
+            PRIORITY_PRACTICE: settings.LLM_PRACTICE_SHARE,
+            PRIORITY_BATCH: settings.LLM_BATCH_SHARE,
+        }[priority]
+        return max(1, int(self.limit * share))
+
+    def _can_start(self, priority: str) -> bool:
+        ahead = PRIORITIES[:PRIORITIES.index(priority) + 1]
+        return self.in_flight < self._capacity(priority) and not any(self._queues[p] for p in ahead)
+
+    def _dispatch(self) -> None:
+        """Admit queued waiters, highest priority first"""
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue and self.in_flight < self._capacity(priority):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue  # Gave up waiting
+                self.in_flight += 1
+                waiter.set_result(None)
+            if queue:
+                return  # A blocked class blocks every class below it
+
+    async def acquire(self, priority: str, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot
+
+        Returns:
+            Milliseconds spent queued
+
+        Raises:
+            asyncio.TimeoutError: no slot within `timeout` seconds
+        """
+        start_time = time.monotonic()
+        if self._can_start(priority):
+            self.in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._queues[priority].append(waiter)
+            try:
+                await asyncio.wait_for(waiter, timeout)
+            except BaseException:
+                if waiter.done() and not waiter.cancelled():
+                    self._release()  # Admitted just as the caller gave up
+                else:
+                    waiter.cancel()
+                    try:
+                        self._queues[priority].remove(waiter)
+                    except ValueError:
+                        pass
+                raise
+
+        waited_ms = (time.monotonic() - start_time) * 1000
+        self._waits[priority].append(waited_ms)
+        return waited_ms
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _decrease(self, ratio: float) -> None:
+        if self._since_decrease < int(self.limit):
+            return
+        self._since_decrease = 0
+        self.limit = max(self.limit * ratio, float(settings.LLM_CONCURRENCY_MIN))
+        self.decreases += 1
+
+    def on_success(self, latency_ms: float, completion_tokens: int) -> None:
+        # Only grow while the limit is what holds callers back
+        saturated = self.in_flight >= int(self.limit) or any(self._queues.values())
+        self.completed += 1
+        self._since_decrease += 1
+
+        if not self._observe_latency(latency_ms / (completion_tokens + _PREFILL_TOKENS)) and saturated:
+            self.limit = min(self.limit + 1 / self.limit, float(settings.LLM_CONCURRENCY_MAX))
+        self._release()
+
+    def _observe_latency(self, ms_per_token: float) -> bool:
+        """Add a sample; at the end of a window, back off if its median rose. True if it did"""
+        self._window.append(ms_per_token)
+        if len(self._window) < max(settings.LLM_LATENCY_WINDOW, int(self.limit)):
+            return False
+
+        median = statistics.median(self._window)
+        self._window = []
+        if self.baseline_ms_per_token is None:
+            self.baseline_ms_per_token = median
+            return False
+
+        slower = median > settings.LLM_LATENCY_TOLERANCE * self.baseline_ms_per_token
+        if slower:
+            self._decrease(0.9)
+        self.baseline_ms_per_token += _BASELINE_ALPHA * (median - self.baseline_ms_per_token)
+        return slower
+
+    def on_error(self, error: BaseException) -> None:
+        self._since_decrease += 1
+        if is_rate_limited(error):
+            self.rate_limited += 1
+            self._decrease(settings.LLM_BACKOFF_RATIO)
+        self._release()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        wait_ms = {}
+        for priority, waits in self._waits.items():
+            ordered = sorted(waits)
+            wait_ms[priority] = {
+                "p50": round(statistics.median(ordered), 1) if ordered else 0.0,
+                "p95": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)], 1) if ordered else 0.0,
+            }
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queue_depth": {p: len(q) for p, q in self._queues.items()},
+            "wait_ms": wait_ms,
+            "completed": self.completed,
+            "rate_limited": self.rate_limited,
+            "limit_decreases": self.decreases,
+            "baseline_ms_per_token": round(self.baseline_ms_per_token or 0.0, 2),
+        }
+
+
+class LLMScheduler:
+    """One ModelLimiter per model, shared by every agent in the process"""
+
+    def __init__(self):
+        self._limiters: Dict[str, ModelLimiter] = {}
+
+    def limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = self._limiters[model] = ModelLimiter(model)
+        return limiter
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        model: str,
+        priority: Optional[str] = None,
+        timeout: Optional[float] = None
+    ) -> AsyncIterator[SlotUsage]:
+        """
+        Hold a concurrency slot for one call
+
+        Example:
+            async with llm_scheduler.slot(model) as usage:
+                response = await client.chat.completions.create(...)
+                usage.completion_tokens = response.usage.completion_tokens
+
+        Args:
+            priority: Defaults to the current `llm_priority` (interactive)
+            timeout: Seconds to wait for a slot
+        """
+        limiter = self.limiter(model)
+        usage = SlotUsage(await limiter.acquire(priority or current_priority(), timeout))
+        start_time = time.monotonic()
+        try:
+            yield usage
+        except BaseException as e:
+            limiter.on_error(e)
+            raise
+        limiter.on_success((time.monotonic() - start_time) * 1000, usage.completion_tokens)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {model: limiter.get_metrics() for model, limiter in self._limiters.items()}
+
+
+# Process-wide instance used by BaseAgent
+llm_scheduler = LLMScheduler()
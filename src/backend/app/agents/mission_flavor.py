@@ -0,0 +1,60 @@
+"""
+Mission Flavor Agent
+Rewrites templated mission descriptions in the coach's voice
+"""
+
+from typing import Dict, Any, Optional
+from app.agents.base_agent import BaseAgent
+from app.config import settings, SYSTEM_PROMPTS
+
+
+class MissionFlavorAgent(BaseAgent):
+    """
+    Optional flavor-text pass for nightly missions
+    Never changes mission structure, only the description text
+    """
+
+    def __init__(self):
+        super().__init__(
+            name="mission_flavor",
+            model=settings.OPENAI_MODEL_ORCHESTRATOR,  # Cheap model; output is cosmetic
+            temperature=settings.SOCRATIC_COACH_TEMPERATURE,
+            max_tokens=80,
+            system_prompt=SYSTEM_PROMPTS["socratic_coach"]
+        )
+
+    async def process(
+        self,
+        user_message: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Rewrite a mission description
+
+        Args:
+            user_message: Templated mission description
+            context: {"mission": mission_row}
+        """
+        mission = (context or {}).get("mission", {})
+
+        prompt = (
+            "Rewrite this daily study mission description in one encouraging sentence "
+            "(max 25 words). Keep every number and topic name unchanged.\n\n"
+            f"Title: {mission.get('title', '')}\n"
+            f"Description: {user_message}\n"
+            f"Reason: {mission.get('generated_reason', '')}"
+        )
+
+        messages = [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+
+        result = await self.call_openai(messages=messages)
+
+        return {
+            "content": result["content"],
+            "tokens_used": result["tokens_used"],
+            "cost": result["cost"],
+            "latency_ms": result["latency_ms"]
+        }
@@ -6,6 +6,7 @@ Routes user queries to the appropriate specialist agent
 from typing import Dict, Any, Optional
 from app.agents.base_agent import BaseAgent
 from app.config import settings, SYSTEM_PROMPTS
+from app.utils.deadline import get_deadline
 import json
 import re
 
@@ -24,6 +25,7 @@ class OrchestratorAgent(BaseAgent):
             max_tokens=settings.MAX_TOKENS_ORCHESTRATOR,
             system_prompt=SYSTEM_PROMPTS["orchestrator"]
         )
+        self.ai_routing_skipped = 0
         
         # Keyword patterns for quick routing (fallback if AI fails)
         self.patterns = {
@@ -72,6 +74,13 @@ class OrchestratorAgent(BaseAgent):
         if keyword_result["confidence"] > 0.8:
             return keyword_result
         
+        # Not enough budget left for an AI round trip plus the answer: keep the keyword guess
+        deadline = get_deadline(context)
+        if deadline and deadline.remaining_ms() < settings.ORCHESTRATOR_AI_ROUTING_MIN_MS:
+            self.ai_routing_skipped += 1
+            keyword_result["routing_method"] += "_deadline"
+            return keyword_result
+        
         # If unclear, use AI routing (slower but more accurate)
         ai_result = await self._ai_routing(user_message, context)
         return ai_result
@@ -137,11 +146,18 @@ class OrchestratorAgent(BaseAgent):
         ]
         
         try:
+            # A fixed slice of the budget: a slow routing call falls back to
+            # keywords instead of leaving the specialist nothing to answer with
+            deadline = get_deadline(context)
+            timeout = None
+            if deadline:
+                timeout = min(deadline.remaining(), settings.ORCHESTRATOR_AI_ROUTING_TIMEOUT_MS / 1000)
             result = await self.call_openai(
                 messages=messages,
                 temperature=0.2,  # Low temperature for deterministic routing
                 max_tokens=150,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                timeout=timeout
             )
             
             routing_decision = json.loads(result["content"])
@@ -160,6 +176,12 @@ class OrchestratorAgent(BaseAgent):
             print(f"AI routing failed: {e}")
             return self._keyword_routing(user_message)
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """Agent metrics plus AI routing skipped for lack of budget"""
+        metrics = super().get_metrics()
+        metrics["ai_routing_skipped"] = self.ai_routing_skipped
+        return metrics
+    
     def should_use_multi_agent(self, user_message: str) -> bool:
         """
         Determine if query requires multiple agents
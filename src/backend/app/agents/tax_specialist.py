@@ -3,10 +3,16 @@ Tax Specialist Agent
 Expert in tax law with RAG-powered IRS publication citations
 """
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, AsyncIterator, Tuple
 from app.agents.base_agent import BaseAgent
-from app.config import settings, SYSTEM_PROMPTS
+from app.agents.cascade import CascadeStats, classify_topic, quality_gate
+from app.config import settings, SYSTEM_PROMPTS, EXAM_PARTS
+from app.utils.deadline import DeadlineExceeded, get_deadline
+from app.utils.question_parser import extract_practice_question
+from app.utils.streaming_json import StreamingJSONObjectParser
+import asyncio
 import json
+import uuid
 
 
 class TaxSpecialistAgent(BaseAgent):
@@ -14,7 +20,7 @@ class TaxSpecialistAgent(BaseAgent):
     Tax law expert agent with access to IRS publications via RAG
     """
     
-    def __init__(self, rag_retriever=None):
+    def __init__(self, rag_retriever=None, dedup_index=None):
         super().__init__(
             name="tax_specialist",
             model=settings.OPENAI_MODEL_SPECIALIST,
@@ -23,6 +29,11 @@ class TaxSpecialistAgent(BaseAgent):
             system_prompt=SYSTEM_PROMPTS["tax_specialist"]
         )
         self.rag_retriever = rag_retriever
+        self.dedup_index = dedup_index
+        self.duplicates_rejected = 0
+        self.low_budget_requests = 0
+        self.fast_model = settings.OPENAI_MODEL_SPECIALIST_FAST
+        self.cascade_stats = CascadeStats()
     
     async def process(
         self,
@@ -46,12 +57,16 @@ class TaxSpecialistAgent(BaseAgent):
             }
         """
         
+        # Fit retrieval and generation to what is left of the request deadline
+        top_k, max_tokens = self._budget(context)
+        
         # Step 1: Retrieve relevant IRS publication passages (RAG)
         rag_results = []
         if self.rag_retriever:
             rag_results = await self.rag_retriever.search(
                 query=user_message,
-                top_k=settings.TOP_K_RESULTS
+                top_k=top_k,
+                exam_part=(context or {}).get("exam_part")  # Only that part's publications
             )
         
         # Step 2: Build enhanced prompt with RAG context
@@ -72,10 +87,17 @@ class TaxSpecialistAgent(BaseAgent):
             for msg in context["conversation_history"][-3:]:  # Last 3 messages
                 messages.insert(-1, msg)
         
-        result = await self.call_openai(
-            messages=messages,
-            temperature=self.temperature
-        )
+        cascade = None
+        if settings.SPECIALIST_CASCADE_ENABLED:
+            result, cascade = await self._cascade_generate(
+                messages, user_message, rag_results, context, max_tokens
+            )
+        else:
+            result = await self.call_openai(
+                messages=messages,
+                temperature=self.temperature,
+                **self._call_limits(context, max_tokens)
+            )
         
         # Step 4: Parse and structure response
         response_content = result["content"]
@@ -102,9 +124,135 @@ class TaxSpecialistAgent(BaseAgent):
             "confidence": self._calculate_confidence(rag_results),
             "tokens_used": result["tokens_used"],
             "cost": result["cost"],
-            "latency_ms": result["latency_ms"]
+            "latency_ms": result["latency_ms"],
+            "model": result["model"],
+            "cascade": cascade
         }
     
+    async def _cascade_generate(
+        self,
+        messages: List[Dict[str, str]],
+        user_message: str,
+        rag_results: List[Dict],
+        context: Optional[Dict[str, Any]],
+        max_tokens: Optional[int] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Answer with the fast model, escalating to the large model on a failed quality gate
+        
+        Questions the orchestrator could only route with AI (ambiguous), or
+        whose retrieval confidence is already low, go straight to the large
+        model instead of paying for a fast answer that would be discarded.
+        """
+        topic = classify_topic(user_message)
+        routing = (context or {}).get("routing", {})
+        
+        direct_reason = None
+        if routing.get("routing_method") == "ai":
+            direct_reason = "ambiguous_routing"
+        elif rag_results and self._calculate_confidence(rag_results) < settings.CASCADE_MIN_CONFIDENCE:
+            direct_reason = "low_retrieval_confidence"
+        
+        if direct_reason:
+            result = await self.call_openai(
+                messages=messages, temperature=self.temperature, **self._call_limits(context, max_tokens)
+            )
+            self.cascade_stats.record_large(topic, result, direct=True)
+            return result, {"topic": topic, "escalated": False, "direct_reason": direct_reason}
+        
+        samples = 2 if settings.CASCADE_SELF_CONSISTENCY else 1
+        limits = self._call_limits(context, max_tokens)
+        fast_results = await asyncio.gather(*[
+            self.call_openai(
+                messages=messages,
+                temperature=self.temperature,
+                model=self.fast_model,
+                **limits
+            )
+            for _ in range(samples)
+        ])
+        
+        reason = quality_gate(
+            fast_results[0]["content"],
+            require_citation=settings.CASCADE_REQUIRE_CITATION,
+            second_answer=fast_results[1]["content"] if samples > 1 else None
+        )
+        
+        if reason is None:
+            self.cascade_stats.record_fast(
+                topic,
+                fast_results,
+                large_cost_estimate=self._calculate_cost(
+                    fast_results[0]["prompt_tokens"],
+                    fast_results[0]["completion_tokens"],
+                    self.model
+                )
+            )
+            result = dict(fast_results[0])
+            result["cost"] = sum(r["cost"] for r in fast_results)
+            result["tokens_used"] = sum(r["tokens_used"] for r in fast_results)
+            return result, {"topic": topic, "escalated": False}
+        
+        self.cascade_stats.record_escalation(topic, reason, fast_results)
+        large = await self.call_openai(
+            messages=messages, temperature=self.temperature, **self._call_limits(context, max_tokens)
+        )
+        self.cascade_stats.record_large(topic, large)
+        
+        # Report what the request really cost, including the discarded fast answer(s)
+        result = dict(large)
+        result["cost"] = large["cost"] + sum(r["cost"] for r in fast_results)
+        result["tokens_used"] = large["tokens_used"] + sum(r["tokens_used"] for r in fast_results)
+        result["latency_ms"] = large["latency_ms"] + max(r["latency_ms"] for r in fast_results)
+        return result, {"topic": topic, "escalated": True, "reason": reason}
+    
+    def _budget(self, context: Optional[Dict[str, Any]]) -> Tuple[int, Optional[int]]:
+        """
+        RAG top_k and max_tokens for the time left on the request deadline
+        
+        Raises:
+            DeadlineExceeded: if the deadline already passed
+        """
+        deadline = get_deadline(context)
+        if deadline is None:
+            return settings.TOP_K_RESULTS, None
+        
+        deadline.check("tax_specialist")
+        if deadline.remaining_ms() >= settings.SPECIALIST_LOW_BUDGET_MS:
+            return settings.TOP_K_RESULTS, None
+        
+        self.low_budget_requests += 1
+        max_tokens = min(settings.SPECIALIST_LOW_BUDGET_MAX_TOKENS, self.max_tokens)
+        return max(settings.TOP_K_RESULTS // 2, 1), max_tokens
+    
+    def _call_limits(
+        self,
+        context: Optional[Dict[str, Any]],
+        max_tokens: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        max_tokens and timeout for one OpenAI call, so it ends before the
+        request is cancelled at the deadline's hard limit
+        
+        The timeout is the time left minus SPECIALIST_TIMEOUT_MARGIN_MS, and
+        max_tokens is what SPECIALIST_TOKENS_PER_SECOND can generate in it.
+        Computed per call, so an escalated cascade call gets what is left
+        after the fast one.
+        
+        Raises:
+            DeadlineExceeded: if no time is left for the call
+        """
+        max_tokens = max_tokens or self.max_tokens
+        deadline = get_deadline(context)
+        if deadline is None:
+            return {"max_tokens": max_tokens}
+        
+        timeout = deadline.hard_remaining() - settings.SPECIALIST_TIMEOUT_MARGIN_MS / 1000
+        if timeout <= 0:
+            raise DeadlineExceeded("tax_specialist")
+        fits = int(timeout * settings.SPECIALIST_TOKENS_PER_SECOND)
+        return {"max_tokens": max(min(max_tokens, fits), 1), "timeout": timeout}
+    
     def _build_prompt_with_rag(
         self,
         user_message: str,
@@ -150,31 +298,18 @@ class TaxSpecialistAgent(BaseAgent):
     def _extract_practice_question(self, response_content: str) -> Optional[Dict]:
         """
         Extract practice question from response if present
-        Format: **Practice Question:** followed by question, options, answer
+        Handles an embedded JSON object or a **Practice Question:** section
+        with lettered options, a correct answer line and an explanation
         """
-        # Simple regex-based extraction (can be enhanced)
-        import re
-        
-        # Look for practice question section
-        match = re.search(
-            r'\*\*Practice Question:\*\*\s*(.+?)(?:\*\*|$)',
-            response_content,
-            re.DOTALL
-        )
-        
-        if not match:
-            return None
-        
-        question_text = match.group(1).strip()
-        
-        # TODO: Parse question, options, correct answer
-        # For now, return as-is
-        return {
-            "question": question_text,
-            "options": [],  # Parse from text
-            "correct_answer": None,  # Parse from text
-            "explanation": ""
-        }
+        return extract_practice_question(response_content)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Agent metrics plus duplicate rejections, deadline degradation and cascade savings"""
+        metrics = super().get_metrics()
+        metrics["duplicates_rejected"] = self.duplicates_rejected
+        metrics["low_budget_requests"] = self.low_budget_requests
+        metrics["cascade"] = self.cascade_stats.get_metrics()
+        return metrics
     
     def _extract_related_topics(self, rag_results: List[Dict]) -> List[str]:
         """Extract related topics from RAG results"""
@@ -200,38 +335,23 @@ class TaxSpecialistAgent(BaseAgent):
         confidence = 0.6 + (avg_score * 0.4)
         return round(confidence, 2)
     
-    async def generate_practice_question(
+    async def _build_question_messages(
         self,
         topic: str,
-        difficulty: str = "medium",
-        user_context: Optional[Dict[str, Any]] = None
-    ) -> Dict[str, Any]:
-        """
-        Generate a practice question on a specific topic
-        
-        Args:
-            topic: Tax topic (e.g., "partnership_basis")
-            difficulty: "easy", "medium", or "hard"
-            user_context: User's ReadyScore, weak areas, etc.
-            
-        Returns:
-            {
-                "question": "Question text...",
-                "options": ["A) ...", "B) ...", "C) ...", "D) ..."],
-                "correct_answer": 2,  # Index of correct option
-                "explanation": "Detailed explanation...",
-                "irs_citation": "Pub 541, page 23",
-                "difficulty": "medium",
-                "topic": "partnership_basis"
-            }
-        """
+        difficulty: str
+    ) -> List[Dict[str, str]]:
+        """Build the practice question prompt (shared by batch and streaming paths)"""
         
         # Get RAG context for this topic
         rag_results = []
         if self.rag_retriever:
             rag_results = await self.rag_retriever.search(
                 query=f"{topic} example calculation",
-                top_k=2
+                top_k=2,
+                exam_part=next(
+                    (part for part, config in EXAM_PARTS.items() if topic in config["topics"]),
+                    None
+                )
             )
         
         # Build prompt
@@ -271,14 +391,120 @@ Return as JSON:
             {"role": "user", "content": prompt}
         ]
         
-        result = await self.call_openai(
+        return messages
+    
+    async def generate_practice_question(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        user_context: Optional[Dict[str, Any]] = None,
+        dedup_retries: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate a practice question on a specific topic
+        
+        Args:
+            topic: Tax topic (e.g., "partnership_basis")
+            difficulty: "easy", "medium", or "hard"
+            user_context: User's ReadyScore, weak areas, etc.
+            dedup_retries: Regenerations when the question near-duplicates
+                           the bank (default DEDUP_MAX_RETRIES); a caller
+                           with its own retry loop passes 0
+            
+        Returns:
+            {
+                "question": "Question text...",
+                "options": ["A) ...", "B) ...", "C) ...", "D) ..."],
+                "correct_answer": 2,  # Index of correct option
+                "explanation": "Detailed explanation...",
+                "irs_citation": "Pub 541, page 23",
+                "difficulty": "medium",
+                "topic": "partnership_basis"
+            }
+        """
+        
+        messages = await self._build_question_messages(topic, difficulty)
+        
+        # Regenerate when the question near-duplicates one already in the bank
+        dedup_retries = dedup_retries if dedup_retries is not None else settings.DEDUP_MAX_RETRIES
+        for _ in range(dedup_retries + 1):
+            result = await self.call_openai(
+                messages=messages,
+                temperature=0.7,  # Higher creativity for question generation
+                response_format={"type": "json_object"}
+            )
+            
+            question_data = json.loads(result["content"])
+            
+            if self.dedup_index is None:
+                break
+            
+            # Only checked here; the caller indexes it with remember_question once it is kept
+            duplicates = self.dedup_index.find_duplicates(question_data)
+            if not duplicates:
+                question_data["id"] = question_data.get("id") or str(uuid.uuid4())
+                break
+            
+            self.duplicates_rejected += 1
+            question_data["duplicate_of"] = duplicates[0][0]
+            messages = messages[:2] + [
+                {"role": "assistant", "content": result["content"]},
+                {"role": "user", "content": "That scenario is already in the question bank. "
+                                            "Write a different scenario testing the same topic."}
+            ]
+        
+        question_data["topic"] = topic
+        question_data["difficulty"] = difficulty
+        
+        return question_data
+    
+    async def stream_practice_question(
+        self,
+        topic: str,
+        difficulty: str = "medium",
+        user_context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate a practice question, yielding each field as soon as it is complete
+        
+        Yields:
+            {"field": "question", "value": "..."}, then options, correct_answer,
+            explanation, ... in completion order, and finally
+            {"done": True, "question": {...full question...}}
+        """
+        messages = await self._build_question_messages(topic, difficulty)
+        parser = StreamingJSONObjectParser()
+        
+        async for delta in self.stream_openai(
             messages=messages,
-            temperature=0.7,  # Higher creativity for question generation
+            temperature=0.7,
             response_format={"type": "json_object"}
-        )
+        ):
+            for field, value in parser.feed(delta):
+                yield {"field": field, "value": value}
         
-        question_data = json.loads(result["content"])
+        question_data = parser.close()
         question_data["topic"] = topic
         question_data["difficulty"] = difficulty
         
-        return question_data
+        # Fields are already on the client, so duplicates are flagged, not regenerated
+        if self.dedup_index is not None:
+            duplicates = self.dedup_index.find_duplicates(question_data)
+            if not duplicates:
+                question_data["id"] = question_data.get("id") or str(uuid.uuid4())
+            else:
+                self.duplicates_rejected += 1
+                question_data["duplicate_of"] = duplicates[0][0]
+        
+        yield {"done": True, "question": question_data}
+    
+    def remember_question(self, question: Dict[str, Any]) -> None:
+        """
+        Index a question that was kept (written to the bank or served), so
+        later generations are checked against it
+        
+        Generation only queries the index: a question that then fails
+        validation must not block valid ones as a "duplicate".
+        """
+        if self.dedup_index is not None and question.get("id") and not question.get("duplicate_of"):
+            self.dedup_index.insert(question["id"], question)
@@ -4,6 +4,7 @@ Loads environment variables and provides app-wide configuration
 """
 
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import List, Optional
 import os
 
@@ -32,6 +33,17 @@ class Settings(BaseSettings):
     OPENAI_MODEL_COACH: str = "gpt-4-turbo-preview"
     OPENAI_MODEL_ANALYST: str = "gpt-4-turbo-preview"
     OPENAI_MODEL_ORCHESTRATOR: str = "gpt-3.5-turbo"
+    OPENAI_MODEL_SPECIALIST_FAST: str = "gpt-3.5-turbo"  # First tier of the specialist cascade
+    
+    # LLM Scheduler (per-model adaptive concurrency, priority classes)
+    LLM_CONCURRENCY_INITIAL: int = 16
+    LLM_CONCURRENCY_MIN: int = 2
+    LLM_CONCURRENCY_MAX: int = 128
+    LLM_BACKOFF_RATIO: float = 0.5  # Limit multiplier on a 429
+    LLM_LATENCY_TOLERANCE: float = 1.5  # Back off gently when a window's median exceeds this x baseline
+    LLM_LATENCY_WINDOW: int = 32  # Minimum calls per latency window
+    LLM_PRACTICE_SHARE: float = 0.9  # Fraction of the limit practice generation may fill
+    LLM_BATCH_SHARE: float = 0.7  # Fraction of the limit batch jobs may fill
     
     # Agent Temperature Settings
     TAX_SPECIALIST_TEMPERATURE: float = 0.5
@@ -46,6 +58,22 @@ class Settings(BaseSettings):
     MAX_TOKENS_ANALYST: int = 2500
     MAX_TOKENS_ORCHESTRATOR: int = 500
     
+    # Model Cascade (tax specialist answers with the fast model first)
+    SPECIALIST_CASCADE_ENABLED: bool = False
+    CASCADE_MIN_CONFIDENCE: float = 0.75  # Below this retrieval confidence, skip straight to the large model
+    CASCADE_REQUIRE_CITATION: bool = True  # Escalate fast answers that cite no IRS authority
+    CASCADE_SELF_CONSISTENCY: bool = False  # Sample the fast model twice and escalate on disagreement
+    
+    # Request Deadlines
+    REQUEST_DEADLINE_MS: int = 3000  # Chat SLA; stages degrade to fit what is left of it
+    REQUEST_TIMEOUT_MS: int = 20000  # Hard cap; the request is cancelled after this
+    ORCHESTRATOR_AI_ROUTING_MIN_MS: int = 2000  # Skip AI routing with less budget than this left
+    ORCHESTRATOR_AI_ROUTING_TIMEOUT_MS: int = 600  # Routing call cap; the rest of the budget is the answer's
+    SPECIALIST_LOW_BUDGET_MS: int = 2000  # Below this, halve RAG results and cap max_tokens
+    SPECIALIST_LOW_BUDGET_MAX_TOKENS: int = 300
+    SPECIALIST_TOKENS_PER_SECOND: int = 40  # Conservative generation rate; max_tokens fits the time to REQUEST_TIMEOUT_MS
+    SPECIALIST_TIMEOUT_MARGIN_MS: int = 500  # Specialist calls time out this long before the request is cancelled
+    
     # Supabase / PostgreSQL
     SUPABASE_URL: str
     SUPABASE_KEY: str
@@ -66,6 +94,16 @@ class Settings(BaseSettings):
     CHUNK_OVERLAP: int = 50
     TOP_K_RESULTS: int = 5  # Number of RAG results to retrieve
     SIMILARITY_THRESHOLD: float = 0.75
+    VECTOR_STORE_DIR: str = "data/vector_store"  # One subdirectory per publication partition
+    VECTOR_STORE_PARTS: Optional[List[int]] = None  # Exam parts this worker serves (None = all)
+    RAG_ANN_MIN_CHUNKS: int = 50000  # Partitions at least this large get an IVF index
+    RAG_IVF_NPROBE: int = 16  # IVF cells scanned per query; higher = better recall, slower
+    
+    # Embeddings
+    OPENAI_EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    EMBEDDING_BATCH_SIZE: int = 100  # Texts per embeddings API call
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache.sqlite3"  # Content-addressed, shared by workers
+    EMBEDDING_CACHE_HOT_SIZE: int = 10000  # Vectors kept in the in-memory LRU tier
     
     # Caching
     REDIS_URL: Optional[str] = None
@@ -93,10 +131,75 @@ class Settings(BaseSettings):
     EASY_BONUS_MULTIPLIER: float = 1.3
     MIN_EASINESS_FACTOR: float = 1.3
     
+    # Mastery Tracking (weak areas)
+    MASTERY_DECAY_ALPHA: float = 0.2  # Weight of the newest attempt in decayed accuracy
+    WEAK_AREA_MIN_ATTEMPTS: int = 3  # Attempts before a topic can be ranked
+    
+    # Knowledge Heatmap (time-bucketed rollups)
+    ROLLUP_DAY_RETENTION: int = 120  # Days of daily buckets; older history lives in weeks/months
+    ROLLUP_WEEK_RETENTION: int = 104  # Weeks of weekly buckets; months are kept forever
+    HEATMAP_MAX_BUCKETS: int = 60  # Columns per heatmap request
+    HEATMAP_HIGH_ACCURACY: float = 0.8
+    HEATMAP_MEDIUM_ACCURACY: float = 0.6
+    
+    # Question Bank & Exam Assembly
+    QUESTION_BANK_PATH: str = "data/question_bank.jsonl"
+    ADAPTIVE_EXAM_SE_TARGET: float = 0.3  # Stop adaptive exams once ability SE falls below this
+    EXAM_SESSION_PATH: str = "data/exam_sessions.sqlite3"  # Adaptive exam response logs, shared by workers
+    EXAM_SESSION_TTL_SECONDS: int = 21600  # Idle adaptive sessions are dropped after 6 hours
+    EXAM_SESSION_CACHE_SIZE: int = 1000  # Live sessions kept per worker (LRU)
+    
+    # Question Deduplication (MinHash/LSH)
+    DEDUP_NUM_PERM: int = 128
+    DEDUP_BANDS: int = 16  # 16 bands x 8 rows ~ 0.7 candidate threshold
+    DEDUP_THRESHOLD: float = 0.8  # Estimated Jaccard to count as a duplicate
+    DEDUP_MAX_RETRIES: int = 2  # Regenerations before accepting a flagged duplicate
+    
+    # Bulk Question Generation (scripts/generate_question_bank.py)
+    QUESTION_GEN_CONCURRENCY: int = 16  # Generation calls in flight at once
+    QUESTION_GEN_MAX_ATTEMPTS: int = 3  # Tries per quota slot before leaving it for the next run
+    QUESTION_GEN_CHECKPOINT_EVERY: int = 25  # Accepted questions between checkpoint writes
+    
     # Mission Generation
     MISSIONS_PER_DAY: int = 3
     XP_BASE_REWARD: int = 100
     XP_MULTIPLIER_STREAK: float = 1.1
+    MISSION_BATCH_WORKERS: int = 4  # Process pool size for nightly generation
+    MISSION_BATCH_CHUNK_SIZE: int = 500  # Users per worker task
+    DAILY_MISSIONS_PATH: str = "data/daily_missions.jsonl"  # Output of scripts/generate_missions.py
+    
+    # Ethics Roleplay
+    ETHICS_SCENARIOS_PATH: str = "data/ethics_scenarios.jsonl"  # Output of scripts/generate_ethics_scenarios.py
+    ETHICS_LEARNED_ANSWERS_PATH: str = "data/ethics_learned_answers.jsonl"  # Free-text rulings, replayed at startup
+    ETHICS_ANSWER_MAX_CHARS: int = 500
+    ETHICS_MAX_LEARNED_PER_NODE: int = 200  # Free-text rulings cached per node; later ones are served uncached
+    ETHICS_GEN_CONCURRENCY: int = 8
+    
+    # Sprint Grading
+    SPRINT_XP_PER_CORRECT: int = 10  # Before XP_BASE_REWARD / streak scaling
+    SPRINT_MAX_SUBMISSIONS: int = 50  # Answers per grading request
+    SPRINT_DEDUP_WINDOW_SECONDS: int = 86400  # A question earns XP once per user in this window
+    SPRINT_STATE_PATH: str = "data/sprint_state.sqlite3"  # XP, answer streaks and recent answers, shared by workers
+    ANSWER_KEY_MAX_GENERATED: int = 100000  # On-demand questions kept gradable per worker
+    ATTEMPT_INGEST_BATCH_SIZE: int = 500  # Attempts per downstream store call
+    ATTEMPT_INGEST_MAX_PENDING: int = 200000  # Oldest queued attempts dropped past this
+    ATTEMPT_LOG_PATH: str = "data/attempt_log.sqlite3"  # Shared by workers; mastery/heatmap are rebuilt from it
+    ATTEMPT_LOG_POLL_MS: float = 500  # How often a worker applies attempts logged by the others
+    ATTEMPT_LOG_READ_BATCH: int = 5000  # Rows per read while catching up
+    
+    # Startup
+    PRELOAD_ASSETS: bool = True  # Load read-only assets in the gunicorn master before fork
+    
+    # Profiling (admin endpoints; off unless ADMIN_API_TOKEN is set)
+    PROFILE_MAX_SECONDS: int = 60
+    PROFILE_SAMPLE_INTERVAL_MS: float = 5.0
+    PROFILE_MIN_INTERVAL_MS: float = 1.0  # Shortest interval_ms a caller may ask for
+    PROFILE_MAX_INTERVAL_MS: float = 1000.0
+    PROFILE_REQUEST_INTERVAL_MS: float = 1.0  # Finer sampling for single requests
+    PROFILE_REQUEST_SAMPLE_RATE: float = 0.0  # Fraction of all requests profiled automatically
+    PROFILE_REQUEST_HISTORY: int = 50  # Per-request profiles kept per worker
+    PROFILE_TRACEMALLOC_FRAMES: int = 16
+    PROFILE_MAX_TRACEMALLOC_FRAMES: int = 64
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -104,6 +207,7 @@ class Settings(BaseSettings):
     SENTRY_DSN: Optional[str] = None
     
     # Security
+    ADMIN_API_TOKEN: Optional[str] = None  # X-Admin-Token for /api/admin/*
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     
@@ -112,8 +216,27 @@ class Settings(BaseSettings):
         case_sensitive = True
 
 
+@lru_cache()
+def get_settings() -> Settings:
+    """Build the Settings singleton on first use"""
+    return Settings()
+
+
+class _LazySettings:
+    """
+    Proxy for the Settings singleton
+    Importing app.config (and the agents, services and scripts built on it)
+    no longer requires secrets; Settings() (and its validation) runs on the
+    first attribute access. app.main reads settings while it is imported
+    (app title and version, CORS origins), so importing the app still does
+    """
+    
+    def __getattr__(self, name: str):
+        return getattr(get_settings(), name)
+
+
 # Singleton instance
-settings = Settings()
+settings = _LazySettings()
 
 
 # Agent System Prompts
@@ -195,27 +318,32 @@ IRS_PUBLICATIONS = {
     "pub_17": {
         "name": "Your Federal Income Tax (For Individuals)",
         "url": "https://www.irs.gov/pub/irs-pdf/p17.pdf",
-        "topics": ["individual_taxation", "deductions", "credits"]
+        "topics": ["individual_taxation", "deductions", "credits"],
+        "exam_parts": [1]
     },
     "pub_334": {
         "name": "Tax Guide for Small Business",
         "url": "https://www.irs.gov/pub/irs-pdf/p334.pdf",
-        "topics": ["business_taxation", "self_employment", "deductions"]
+        "topics": ["business_taxation", "self_employment", "deductions"],
+        "exam_parts": [2]
     },
     "pub_541": {
         "name": "Partnerships",
         "url": "https://www.irs.gov/pub/irs-pdf/p541.pdf",
-        "topics": ["partnerships", "basis", "distributions"]
+        "topics": ["partnerships", "basis", "distributions"],
+        "exam_parts": [2]
     },
     "pub_542": {
         "name": "Corporations",
         "url": "https://www.irs.gov/pub/irs-pdf/p542.pdf",
-        "topics": ["c_corporations", "s_corporations", "dividends"]
+        "topics": ["c_corporations", "s_corporations", "dividends"],
+        "exam_parts": [2]
     },
     "circular_230": {
         "name": "Circular 230 - Regulations Governing Practice",
         "url": "https://www.irs.gov/pub/irs-pdf/pcir230.pdf",
-        "topics": ["ethics", "representation", "practice_rights"]
+        "topics": ["ethics", "representation", "practice_rights"],
+        "exam_parts": [3]
     }
 }
 
@@ -2,25 +2,76 @@
 EA Study Coach - FastAPI Main Application
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Header, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from datetime import date, timedelta
+import asyncio
+import orjson
+import os
 import time
+import uuid
 
-from app.config import settings
+from app.config import settings, EXAM_PARTS
 from app.agents.orchestrator import OrchestratorAgent
 from app.agents.tax_specialist import TaxSpecialistAgent
+from app.agents.ethics_judge import EthicsJudgeAgent
+from app.agents.llm_scheduler import llm_scheduler, llm_priority, PRIORITY_PRACTICE
+from app.rag.embeddings import Embedder
+from app.rag.retriever import RAGRetriever
+from app.services.mastery_store import MasteryStore
+from app.services.mission_generator import MissionStore
+from app.services.rollup_store import RollupStore
+from app.services.ethics_scenarios import ScenarioStore, FreeTextJudge
+from app.services.answer_key import AnswerKey
+from app.services.sprint_grader import SprintGrader
+from app.services.attempt_ingest import AttemptIngest
+from app.services.attempt_log import AttemptLog
+from app.services.dashboard import build_dashboard, dashboard_etag, etag_matches
+from app.services.question_bank import QuestionBank
+from app.services.question_generator import validate_question
+from app.services.exam_assembler import assemble_exam, AdaptiveExamSession
+from app.services.exam_sessions import ExamSessionStore
+from app import preload
+from app.schemas.chat import ChatRequest, ChatResponse
+from app.schemas.questions import QuestionGenerateRequest, QuestionGenerateResponse
+from app.schemas.ethics import RoleplayTurnRequest
+from app.schemas.sprint import SprintGradeRequest
+from app.schemas.exams import ExamAssembleRequest, AdaptiveExamRequest, AdaptiveAnswerRequest
+from app.schemas.performance import AttemptBatchRequest
+from app.schemas.system import HealthResponse, MetricsResponse
+from app.utils.responses import FastJSONResponse, fragment
+from app.utils.deadline import Deadline, DeadlineExceeded, ClientDisconnected, run_until_disconnect
+from app.utils.profiling import (
+    SamplingProfiler, AllocationProfiler, ProfilingMiddleware,
+    request_profiles, profile_lock, is_admin_token
+)
 # from app.agents.socratic_coach import SocraticCoachAgent  # To be implemented
 # from app.agents.data_analyst import DataAnalystAgent  # To be implemented
 
 # from app.api import chat, performance, missions, questions  # To be implemented
-# from app.rag.retriever import RAGRetriever  # To be implemented
 
 
 # Global agent instances
 orchestrator: OrchestratorAgent = None
 tax_specialist: TaxSpecialistAgent = None
+mastery_store: MasteryStore = None
+mission_store: MissionStore = None
+rollup_store: RollupStore = None
+ethics_judge: EthicsJudgeAgent = None
+ethics_scenarios: ScenarioStore = None
+free_text_judge: FreeTextJudge = None
+answer_key: AnswerKey = None
+sprint_grader: SprintGrader = None
+attempt_ingest: AttemptIngest = None
+attempt_log: AttemptLog = None
+question_bank: QuestionBank = None
+embedder: Embedder = None
+rag_retriever: RAGRetriever = None
+exam_sessions: ExamSessionStore = None
+chat_request_stats = {"completed": 0, "client_disconnected": 0, "deadline_exceeded": 0}
 # socratic_coach: SocraticCoachAgent = None
 # data_analyst: DataAnalystAgent = None
 
@@ -34,18 +85,72 @@ async def lifespan(app: FastAPI):
     # Startup
     print("🚀 Starting EA Study Coach API...")
     
-    global orchestrator, tax_specialist
+    global orchestrator, tax_specialist, mastery_store, mission_store, rollup_store
+    global question_bank, embedder, rag_retriever, exam_sessions
+    global ethics_judge, ethics_scenarios, free_text_judge
+    global answer_key, sprint_grader, attempt_ingest, attempt_log
+    
+    # Read-only assets: inherited from the gunicorn master when preloaded,
+    # loaded here otherwise (uvicorn / dev)
+    question_bank = preload.get("question_bank")
+    dedup_index = preload.get("dedup_index")  # Checked before accepting new questions
+    answer_key = preload.get("answer_key")  # Sprint grading; generated questions are added per worker
+    print(f"📝 Question bank loaded: {len(question_bank)} questions")
+    
+    # Adaptive exam sessions: answer logs on disk so any worker can continue one
+    exam_sessions = ExamSessionStore(question_bank)
+    
+    # Query/chunk embeddings, cached on disk by content hash (used by the RAG retriever)
+    embedder = Embedder()
     
-    # Initialize RAG retriever (to be implemented)
-    # rag_retriever = RAGRetriever()
-    # await rag_retriever.initialize()
+    # RAG over the publication partitions this worker serves; off until publications are ingested
+    vector_store = preload.get("vector_store")
+    if vector_store.chunk_count():
+        rag_retriever = RAGRetriever(vector_store, embedder)
+        print(f"📖 RAG partitions loaded: {vector_store.get_metrics()['partitions']}")
     
     # Initialize agents
     orchestrator = OrchestratorAgent()
-    tax_specialist = TaxSpecialistAgent(rag_retriever=None)  # Add RAG later
+    tax_specialist = TaxSpecialistAgent(
+        rag_retriever=rag_retriever,
+        dedup_index=dedup_index
+    )
+    ethics_judge = EthicsJudgeAgent()
     # socratic_coach = SocraticCoachAgent()
     # data_analyst = DataAnalystAgent()
     
+    # Mastery aggregates (weak areas, streaks) and topic x time rollups
+    # (knowledge heatmap): this worker's in-memory views of the shared
+    # attempt log, rebuilt from it now and kept in step with other workers
+    rollup_store = RollupStore()
+    attempt_log = AttemptLog([])
+    mastery_store = MasteryStore(history_id=attempt_log.log_id)
+    attempt_log.sinks = [mastery_store.record_attempts, rollup_store.record_attempts]
+    replayed = await attempt_log.sync()
+    attempt_log.start()
+    print(f"📈 Attempt log replayed: {replayed} attempts")
+    
+    # Sprint grading: answer key in memory, XP/streaks/dedup in shared SQLite;
+    # graded attempts reach the attempt log in the background
+    sprint_grader = SprintGrader(answer_key)
+    attempt_ingest = AttemptIngest([attempt_log.append_blocking]).start()
+    
+    # Today's precomputed missions (nightly batch output, reloaded when it changes)
+    mission_store = MissionStore()
+    loaded = await mission_store.refresh()
+    if loaded:
+        print(f"🎯 Daily missions loaded: {loaded}")
+    
+    # Ethics roleplay trees (offline batch output); free-text rulings learned
+    # by earlier runs are replayed into them
+    if os.path.exists(settings.ETHICS_SCENARIOS_PATH):
+        ethics_scenarios = ScenarioStore.load_jsonl(settings.ETHICS_SCENARIOS_PATH)
+    else:
+        ethics_scenarios = ScenarioStore()
+    free_text_judge = FreeTextJudge(ethics_scenarios, ethics_judge, settings.ETHICS_LEARNED_ANSWERS_PATH)
+    replayed = free_text_judge.replay()
+    print(f"⚖️ Ethics scenarios loaded: {len(ethics_scenarios)} ({replayed} learned answers)")
+    
     print("✅ All agents initialized")
     print(f"📍 API running at http://{settings.API_HOST}:{settings.API_PORT}")
     print(f"📚 Docs available at http://{settings.API_HOST}:{settings.API_PORT}/docs")
@@ -55,11 +160,25 @@ async def lifespan(app: FastAPI):
     # Shutdown
     print("👋 Shutting down EA Study Coach API...")
     
+    if attempt_ingest:
+        await attempt_ingest.stop()
+    if attempt_log:
+        await attempt_log.stop()
+    
     # Print final metrics
     if orchestrator:
         print(f"Orchestrator: {orchestrator.get_metrics()}")
     if tax_specialist:
         print(f"Tax Specialist: {tax_specialist.get_metrics()}")
+    if ethics_judge:
+        print(f"Ethics Judge: {ethics_judge.get_metrics()}")
+    if embedder:
+        print(f"Embeddings: {embedder.get_metrics()}")
+        embedder.cache.close()
+    if exam_sessions:
+        exam_sessions.close()
+    if sprint_grader:
+        sprint_grader.close()
 
 
 # Create FastAPI app
@@ -67,10 +186,19 @@ app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
     description="Multi-Agent AI System for EA Exam Preparation",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 
+# Constant response fragments, serialized once
+FOLLOW_UP_SUGGESTIONS = fragment([
+    "Can you explain this with an example?",
+    "What are common exam traps for this topic?",
+    "Generate a practice question on this"
+])
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -80,9 +208,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-request profiles (X-Profile header, or PROFILE_REQUEST_SAMPLE_RATE)
+app.add_middleware(ProfilingMiddleware)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints answer 404 unless X-Admin-Token matches ADMIN_API_TOKEN"""
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
 
 # Health check endpoint
-@app.get("/health")
+@app.get("/health", response_model=HealthResponse)
 async def health_check():
     """System health check"""
     return {
@@ -91,6 +228,7 @@ async def health_check():
         "agents": {
             "orchestrator": "online" if orchestrator else "offline",
             "tax_specialist": "online" if tax_specialist else "offline",
+            "ethics_judge": "online" if ethics_judge else "offline",
             # "socratic_coach": "online" if socratic_coach else "offline",
             # "data_analyst": "online" if data_analyst else "offline"
         },
@@ -99,11 +237,19 @@ async def health_check():
 
 
 # Simple chat endpoint (MVP)
-@app.post("/api/chat")
-async def chat(request: dict):
+@app.post("/api/chat", responses={200: {"model": ChatResponse}})
+async def chat(request: ChatRequest, http_request: Request):
     """
     Send message to AI mentor
     
+    Runs under a REQUEST_DEADLINE_MS budget that the orchestrator and
+    specialist degrade to fit, and is cancelled (including in-flight
+    OpenAI calls) when the client disconnects or REQUEST_TIMEOUT_MS passes.
+    
+    The body is serialized directly with orjson; ChatResponse documents it
+    in the OpenAPI schema but is not applied at runtime (the API tests
+    check the payload against it).
+    
     Request body:
     {
         "user_id": "uuid",
@@ -116,46 +262,48 @@ async def chat(request: dict):
     }
     """
     try:
-        user_message = request.get("message")
-        context = request.get("context", {})
+        user_message = request.message
+        context = request.context.model_dump(exclude_none=True)
+        context["deadline"] = Deadline(settings.REQUEST_DEADLINE_MS, hard_ms=settings.REQUEST_TIMEOUT_MS)
         
-        if not user_message:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Message is required"
-            )
-        
-        # Step 1: Route to appropriate agent
-        routing = await orchestrator.process(user_message, context)
+        # Fill weak areas server-side when the client didn't send them
+        if "weak_areas" not in context and request.user_id:
+            weak_areas = mastery_store.weak_area_names(request.user_id)
+            if weak_areas:
+                context["weak_areas"] = weak_areas
         
-        # Step 2: Get response from selected agent
-        if routing["agent"] == "TAX_SPECIALIST":
-            response = await tax_specialist.process(user_message, context)
-        # elif routing["agent"] == "SOCRATIC_COACH":
-        #     response = await socratic_coach.process(user_message, context)
-        # elif routing["agent"] == "DATA_ANALYST":
-        #     response = await data_analyst.process(user_message, context)
-        else:
-            # Fallback
-            response = await tax_specialist.process(user_message, context)
+        routing, response = await run_until_disconnect(
+            http_request,
+            _route_and_answer(user_message, context),
+            timeout=settings.REQUEST_TIMEOUT_MS / 1000
+        )
+        chat_request_stats["completed"] += 1
         
-        # Step 3: Return combined response
-        return {
+        # Step 3: Return combined response (shape documented by ChatResponse)
+        return FastJSONResponse({
             "success": True,
             "routing": routing,
             "response": response["content"],
             "citations": response.get("citations", []),
-            "follow_up_suggestions": [
-                "Can you explain this with an example?",
-                "What are common exam traps for this topic?",
-                "Generate a practice question on this"
-            ],
+            "follow_up_suggestions": FOLLOW_UP_SUGGESTIONS,
             "metadata": {
                 "tokens_used": response.get("tokens_used", 0),
                 "latency_ms": response.get("latency_ms", 0),
                 "cost": response.get("cost", 0.0)
             }
-        }
+        })
+        
+    except ClientDisconnected:
+        # Nobody is listening; 499 only shows up in access logs
+        chat_request_stats["client_disconnected"] += 1
+        return Response(status_code=499)
+    
+    except DeadlineExceeded as e:
+        chat_request_stats["deadline_exceeded"] += 1
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=str(e)
+        )
         
     except Exception as e:
         raise HTTPException(
@@ -164,12 +312,35 @@ async def chat(request: dict):
         )
 
 
+async def _route_and_answer(user_message: str, context: Dict):
+    """Routing and agent call for /api/chat, run as one cancellable task"""
+    # Step 1: Route to appropriate agent
+    routing = await orchestrator.process(user_message, context)
+    
+    # Step 2: Get response from selected agent
+    context["routing"] = routing  # Lets the specialist cascade see how the query was routed
+    if routing["agent"] == "TAX_SPECIALIST":
+        response = await tax_specialist.process(user_message, context)
+    # elif routing["agent"] == "SOCRATIC_COACH":
+    #     response = await socratic_coach.process(user_message, context)
+    # elif routing["agent"] == "DATA_ANALYST":
+    #     response = await data_analyst.process(user_message, context)
+    else:
+        # Fallback
+        response = await tax_specialist.process(user_message, context)
+    
+    return routing, response
+
+
 # Practice question endpoint (MVP)
-@app.post("/api/questions/generate")
-async def generate_question(request: dict):
+@app.post("/api/questions/generate", responses={200: {"model": QuestionGenerateResponse}})
+async def generate_question(request: QuestionGenerateRequest):
     """
     Generate practice question
     
+    Serialized directly with orjson; QuestionGenerateResponse documents
+    the body but is not applied at runtime (the API tests check it).
+    
     Request body:
     {
         "topic": "partnership_basis",
@@ -181,26 +352,18 @@ async def generate_question(request: dict):
     }
     """
     try:
-        topic = request.get("topic")
-        difficulty = request.get("difficulty", "medium")
-        user_context = request.get("user_context", {})
-        
-        if not topic:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Topic is required"
+        with llm_priority(PRIORITY_PRACTICE):
+            question = await tax_specialist.generate_practice_question(
+                topic=request.topic,
+                difficulty=request.difficulty,
+                user_context=request.user_context.model_dump(exclude_none=True)
             )
+        _accept_generated(question)
         
-        question = await tax_specialist.generate_practice_question(
-            topic=topic,
-            difficulty=difficulty,
-            user_context=user_context
-        )
-        
-        return {
+        return FastJSONResponse({
             "success": True,
             "question": question
-        }
+        })
         
     except Exception as e:
         raise HTTPException(
@@ -209,13 +372,391 @@ async def generate_question(request: dict):
         )
 
 
+def _accept_generated(question: Dict) -> None:
+    """
+    Give a served question an id and add it to the answer key, so sprints
+    can submit it; valid ones also join the near-duplicate index
+    """
+    if not question.get("id"):
+        question["id"] = str(uuid.uuid4())
+    answer_key.add(question)
+    if validate_question(question) is None:
+        tax_specialist.remember_question(question)
+
+
+# Streaming practice question endpoint
+@app.post("/api/questions/generate/stream")
+async def generate_question_stream(request: QuestionGenerateRequest):
+    """
+    Generate a practice question as newline-delimited JSON
+    
+    Same request body as /api/questions/generate. Each line is one event:
+    {"field": "question", "value": "..."} as each field completes, then
+    {"done": true, "question": {...}}. The client can render the stem
+    while the explanation is still being generated.
+    """
+    async def events():
+        try:
+            with llm_priority(PRIORITY_PRACTICE):
+                async for event in tax_specialist.stream_practice_question(
+                    topic=request.topic,
+                    difficulty=request.difficulty,
+                    user_context=request.user_context.model_dump(exclude_none=True)
+                ):
+                    if event.get("done"):
+                        _accept_generated(event["question"])
+                    yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            yield orjson.dumps({"error": f"Error generating question: {str(e)}"}) + b"\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+# Fixed-form exam endpoint
+@app.post("/api/exams/assemble")
+async def create_exam(request: ExamAssembleRequest):
+    """
+    Assemble a full blueprint-stratified exam from the question bank
+    
+    Request body:
+    {
+        "exam_part": 2,
+        "num_questions": 100,  // optional, defaults to the part's length
+        "seed": 42  // optional, for reproducible forms
+    }
+    """
+    exam_part = request.exam_part
+    
+    if exam_part not in EXAM_PARTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="exam_part must be 1, 2 or 3"
+        )
+    
+    exam = assemble_exam(
+        question_bank,
+        exam_part,
+        num_questions=request.num_questions,
+        seed=request.seed
+    )
+    
+    return {
+        "success": True,
+        "exam": exam
+    }
+
+
+# Adaptive exam endpoints
+@app.post("/api/exams/adaptive")
+async def start_adaptive_exam(request: AdaptiveExamRequest):
+    """
+    Start a computerized-adaptive exam session
+    
+    Request body:
+    {
+        "exam_part": 2,
+        "max_items": 50  // optional
+    }
+    """
+    exam_part = request.exam_part
+    
+    if exam_part not in EXAM_PARTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="exam_part must be 1, 2 or 3"
+        )
+    
+    session = AdaptiveExamSession(
+        question_bank,
+        exam_part,
+        max_items=request.max_items
+    )
+    question = session.next_question()
+    if question is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No questions available for Part {exam_part}"
+        )
+    await exam_sessions.add(session)
+    
+    return {
+        "success": True,
+        "session": session.summary(),
+        "question": question
+    }
+
+
+@app.post("/api/exams/adaptive/{session_id}/answer")
+async def answer_adaptive_exam(session_id: str, request: AdaptiveAnswerRequest):
+    """
+    Submit an answer and receive the next adaptive item
+    
+    Request body:
+    {
+        "question_id": "q123",
+        "answer": 2
+    }
+    """
+    session = await exam_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam session not found"
+        )
+    
+    answered_before = len(session.responses)
+    try:
+        result = session.record_response(request.question_id, request.answer)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    next_question = session.next_question()
+    if not await exam_sessions.save(session, answered_before):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This item was already answered"
+        )
+    if next_question is None:
+        await exam_sessions.discard(session_id)
+    
+    return {
+        "success": True,
+        "result": result,
+        "session": session.summary(),
+        "question": next_question
+    }
+
+
+# Attempt ingest endpoint
+@app.post("/api/performance/attempts")
+async def record_attempts(request: AttemptBatchRequest):
+    """
+    Record question attempts in the shared attempt log
+    
+    Request body:
+    {
+        "attempts": [
+            {
+                "user_id": "uuid",
+                "question_topic": "Partnerships",
+                "is_correct": false,
+                "time_spent_seconds": 74,
+                "attempted_at": "2025-01-15T18:04:00"
+            }
+        ]
+    }
+    
+    The batch is validated as a whole: one malformed row rejects it (422)
+    before anything is recorded, so the client can fix and resend it.
+    This worker's aggregates include it on return; other workers pick it
+    up within ATTEMPT_LOG_POLL_MS.
+    """
+    attempts = [attempt.model_dump(mode="json") for attempt in request.attempts]
+    recorded = await attempt_log.append(attempts)
+    
+    return {
+        "success": True,
+        "recorded": recorded
+    }
+
+
+# Weak areas endpoint
+@app.get("/api/performance/weak-areas/{user_id}")
+async def get_weak_areas(user_id: str, k: int = 3):
+    """Rank a user's k weakest topics with confidence"""
+    return {
+        "user_id": user_id,
+        "weak_areas": mastery_store.weak_areas(user_id, k)
+    }
+
+
+# Knowledge heatmap endpoint
+@app.get("/api/performance/heatmap/{user_id}")
+async def get_heatmap(
+    user_id: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: Optional[str] = None
+):
+    """
+    Topic x time mastery grid from the rollups (never raw attempts)
+    
+    Defaults to the last 12 weeks; granularity is picked from the range
+    unless given ("day", "week" or "month").
+    """
+    end = end or date.today()
+    start = start or end - timedelta(weeks=12)
+    
+    try:
+        heatmap = rollup_store.heatmap(user_id, start, end, granularity)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    return {
+        "user_id": user_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        **heatmap
+    }
+
+
+# Dashboard endpoint
+@app.get("/api/dashboard/{user_id}")
+async def get_dashboard(user_id: str, http_request: Request):
+    """
+    Everything the landing dashboard renders, in one response
+    
+    Stats, ReadyScore, streak, focus areas, today's missions and per-part
+    progress. The ETag only changes when the user records attempts, gets
+    new missions, or the day rolls over; a matching If-None-Match gets a
+    bodiless 304 without assembling anything.
+    """
+    await mission_store.refresh()  # Picks up tonight's batch output without a restart
+    etag = dashboard_etag(user_id, mastery_store, mission_store)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    dashboard = await build_dashboard(user_id, mastery_store, mission_store)
+    return FastJSONResponse(dashboard, headers=headers)
+
+
+# Sprint grading endpoint
+@app.post("/api/sprints/grade")
+async def grade_sprint(request: SprintGradeRequest):
+    """
+    Grade a batch of Sprint Mode / mission answers
+    
+    Request body:
+    {
+        "user_id": "uuid",
+        "submissions": [
+            {"question_id": "q123", "answer": 2, "time_spent_seconds": 14.5}
+        ]
+    }
+    
+    Grading is answer-key lookups only, and the response carries the
+    updated answer streak and XP. A question the user already answered
+    within SPRINT_DEDUP_WINDOW_SECONDS, on any worker, comes back as a
+    duplicate and earns nothing. Mastery, streak-day and heatmap updates are queued and
+    applied in the background.
+    """
+    if len(request.submissions) > settings.SPRINT_MAX_SUBMISSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.SPRINT_MAX_SUBMISSIONS} submissions per request"
+        )
+    
+    graded, attempts = await sprint_grader.grade(
+        request.user_id,
+        [submission.model_dump() for submission in request.submissions]
+    )
+    attempt_ingest.submit(attempts)
+    
+    return {
+        "success": True,
+        "user_id": request.user_id,
+        **graded
+    }
+
+
+# Ethics roleplay endpoints
+@app.get("/api/ethics/scenarios")
+async def list_ethics_scenarios(topic: Optional[str] = None):
+    """Precomputed Circular 230 scenarios, optionally for one Part 3 topic"""
+    return {
+        "scenarios": ethics_scenarios.list(topic)
+    }
+
+
+@app.get("/api/ethics/scenarios/{scenario_id}")
+async def start_ethics_scenario(scenario_id: str):
+    """Scenario details and its opening node"""
+    scenario = ethics_scenarios.get(scenario_id)
+    if scenario is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scenario not found"
+        )
+    
+    return {
+        "scenario": scenario,
+        "node": ethics_scenarios.node(scenario["root"])
+    }
+
+
+@app.post("/api/ethics/scenarios/{scenario_id}/turn")
+async def take_ethics_turn(scenario_id: str, request: RoleplayTurnRequest):
+    """
+    Play one roleplay turn
+    
+    Request body:
+    {
+        "node": 12,
+        "choice": 1  // a scripted choice, or
+        "answer": "I'd explain that I can't sign it"  // free text
+    }
+    
+    Scripted choices, repeated free text and free text that is a scripted
+    choice word for word are lookups. Any other free text costs one LLM
+    ruling, which is then cached into the tree ("source" tells which).
+    """
+    node = ethics_scenarios.node_of(scenario_id, request.node)
+    if node is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Scenario node not found"
+        )
+    
+    if request.choice is not None:
+        choice = ethics_scenarios.choice_index(node, request.choice)
+        if choice is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="choice out of range for this node"
+            )
+        result, source = ethics_scenarios.outcome(choice), "tree"
+    else:
+        if len(request.answer) > settings.ETHICS_ANSWER_MAX_CHARS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"answer must be at most {settings.ETHICS_ANSWER_MAX_CHARS} characters"
+            )
+        if ethics_scenarios.node_choices[node] == 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Scenario has already ended"
+            )
+        try:
+            result, source = await free_text_judge.answer(node, request.answer)
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error judging answer: {str(e)}"
+            )
+    
+    return {
+        "success": True,
+        "source": source,
+        **result
+    }
+
+
 # Agent metrics endpoint
-@app.get("/api/metrics")
+@app.get("/api/metrics", response_model=MetricsResponse)
 async def get_metrics():
     """Get performance metrics for all agents"""
     metrics = {
         "orchestrator": orchestrator.get_metrics() if orchestrator else {},
         "tax_specialist": tax_specialist.get_metrics() if tax_specialist else {},
+        "ethics_judge": ethics_judge.get_metrics() if ethics_judge else {},
     }
     
     # Calculate totals
@@ -228,10 +769,127 @@ async def get_metrics():
             "total_calls": total_calls,
             "total_cost": round(total_cost, 4)
         },
+        "startup": preload.get_metrics(),
+        "chat_requests": chat_request_stats,
+        "embeddings": embedder.get_metrics() if embedder else {},
+        "rag": rag_retriever.get_metrics() if rag_retriever else {},
+        "llm_scheduler": llm_scheduler.get_metrics(),
+        "ethics": free_text_judge.get_metrics() if free_text_judge else {},
+        "sprints": {
+            **(sprint_grader.get_metrics() if sprint_grader else {}),
+            "ingest": attempt_ingest.get_metrics() if attempt_ingest else {},
+            "attempt_log": attempt_log.get_metrics() if attempt_log else {},
+        },
         "timestamp": time.time()
     }
 
 
+# Profiling endpoints (admin)
+def _profile_seconds(seconds: float) -> float:
+    if not 0 < seconds <= settings.PROFILE_MAX_SECONDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"seconds must be in (0, {settings.PROFILE_MAX_SECONDS}]"
+        )
+    return seconds
+
+
+def _profile_interval_ms(interval_ms: Optional[float]) -> Optional[float]:
+    if interval_ms is not None and not (
+        settings.PROFILE_MIN_INTERVAL_MS <= interval_ms <= settings.PROFILE_MAX_INTERVAL_MS
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"interval_ms must be in "
+                f"[{settings.PROFILE_MIN_INTERVAL_MS}, {settings.PROFILE_MAX_INTERVAL_MS}]"
+            )
+        )
+    return interval_ms
+
+
+def _profile_frames(frames: Optional[int]) -> Optional[int]:
+    if frames is not None and not 1 <= frames <= settings.PROFILE_MAX_TRACEMALLOC_FRAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"frames must be in [1, {settings.PROFILE_MAX_TRACEMALLOC_FRAMES}]"
+        )
+    return frames
+
+
+def _profile_response(profiler, kind: str) -> PlainTextResponse:
+    """Collapsed stacks as the body, summary in headers"""
+    summary = {"kind": kind, "pid": os.getpid(), **profiler.summary()}
+    return PlainTextResponse(
+        profiler.collapsed(),
+        headers={"X-Profile-Summary": orjson.dumps(summary).decode()}
+    )
+
+
+@app.post("/api/admin/profile/cpu", dependencies=[Depends(require_admin)])
+async def profile_cpu(seconds: float = 10.0, interval_ms: Optional[float] = None, include_idle: bool = False):
+    """
+    Sample this worker's stacks for `seconds` and return collapsed stacks
+    
+    The worker keeps serving traffic while it is sampled. Render with
+    flamegraph.pl, inferno-flamegraph or speedscope.
+    """
+    seconds = _profile_seconds(seconds)
+    interval_ms = _profile_interval_ms(interval_ms)
+    if profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    
+    async with profile_lock:
+        profiler = SamplingProfiler(interval_ms=interval_ms, include_idle=include_idle).start()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.stop()
+    
+    return _profile_response(profiler, "cpu")
+
+
+@app.post("/api/admin/profile/memory", dependencies=[Depends(require_admin)])
+async def profile_memory(seconds: float = 10.0, frames: Optional[int] = None):
+    """
+    Trace allocations for `seconds`; collapsed stacks weighted by net bytes allocated
+    
+    tracemalloc slows allocation-heavy code noticeably while it runs. The
+    snapshots and their diff run in a worker thread, off the event loop.
+    """
+    seconds = _profile_seconds(seconds)
+    frames = _profile_frames(frames)
+    if profile_lock.locked():
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+    
+    async with profile_lock:
+        profiler = await asyncio.to_thread(AllocationProfiler(frames=frames).start)
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            await asyncio.to_thread(profiler.stop)
+    
+    return _profile_response(profiler, "memory")
+
+
+@app.get("/api/admin/profile/requests", dependencies=[Depends(require_admin)])
+async def list_request_profiles():
+    """Recent per-request profiles on this worker, newest first"""
+    return {"pid": os.getpid(), "profiles": request_profiles.list()}
+
+
+@app.get("/api/admin/profile/requests/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_request_profile(profile_id: str):
+    """Collapsed stacks of one per-request profile"""
+    profile = request_profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile {profile_id} not found (evicted, or profiled on another worker)"
+        )
+    return PlainTextResponse(profile["collapsed"])
+
+
 # Root endpoint
 @app.get("/")
 async def root():
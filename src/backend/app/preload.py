@@ -0,0 +1,136 @@
+"""
+Read-only Asset Preloading
+Loads shared assets once, ideally in the gunicorn master before workers fork
+"""
+
+from typing import Dict, Any, Callable, List
+from app.config import settings, SYSTEM_PROMPTS
+import importlib
+import os
+import time
+
+
+# Lazily imported modules every worker ends up loading anyway (agent construction).
+# Everything else app.main needs (numpy, the services) is imported eagerly with it
+PRELOAD_MODULES = ("openai",)
+
+
+# name -> loader, in registration order (later loaders may depend on earlier ones)
+_loaders: Dict[str, Callable[[], Any]] = {}
+_assets: Dict[str, Any] = {}
+_load_seconds: Dict[str, float] = {}
+
+# PID of the process that ran preload_all(); differs from os.getpid() in forked workers
+_preloaded_pid = None
+
+
+def register(name: str):
+    """Register a loader for a read-only asset"""
+    def decorator(loader: Callable[[], Any]) -> Callable[[], Any]:
+        _loaders[name] = loader
+        return loader
+    return decorator
+
+
+def get(name: str) -> Any:
+    """Return an asset, loading it now if it was not preloaded"""
+    if name not in _assets:
+        start_time = time.perf_counter()
+        _assets[name] = _loaders[name]()
+        _load_seconds[name] = time.perf_counter() - start_time
+    return _assets[name]
+
+
+def preload_all() -> Dict[str, float]:
+    """
+    Load every registered asset
+
+    Call in the master process before fork; workers then share the
+    loaded pages copy-on-write instead of each building their own.
+
+    Returns:
+        Load time in seconds per asset
+    """
+    global _preloaded_pid
+
+    for module in PRELOAD_MODULES:
+        start_time = time.perf_counter()
+        importlib.import_module(module).__name__  # Attribute access forces a lazy module to load
+        _load_seconds[f"module:{module}"] = time.perf_counter() - start_time
+
+    for name in _loaders:
+        get(name)
+    _preloaded_pid = os.getpid()
+    return dict(_load_seconds)
+
+
+def loaded() -> List[str]:
+    return list(_assets)
+
+
+def get_metrics() -> Dict[str, Any]:
+    return {
+        "loaded": loaded(),
+        "load_ms": {name: round(s * 1000, 1) for name, s in _load_seconds.items()},
+        "preloaded_pid": _preloaded_pid,
+        "worker_pid": os.getpid(),
+    }
+
+
+# ----------------------------------------------------------------------
+# Assets
+# ----------------------------------------------------------------------
+
+@register("question_bank")
+def _load_question_bank():
+    from app.services.question_bank import QuestionBank
+
+    if os.path.exists(settings.QUESTION_BANK_PATH):
+        return QuestionBank.load_jsonl(settings.QUESTION_BANK_PATH)
+    return QuestionBank()
+
+
+@register("dedup_index")
+def _load_dedup_index():
+    from app.services.question_dedup import NearDuplicateIndex
+
+    index = NearDuplicateIndex()
+    for question in get("question_bank").questions:
+        index.insert(question["id"], question)
+    return index
+
+
+@register("answer_key")
+def _load_answer_key():
+    from app.services.answer_key import AnswerKey
+
+    return AnswerKey(get("question_bank"))
+
+
+@register("vector_store")
+def _load_vector_store():
+    """IRS publication partitions for the exam parts this worker serves (memory-mapped)"""
+    from app.rag.vector_store import VectorStore, publications_for
+
+    publications = None
+    if settings.VECTOR_STORE_PARTS:
+        publications = sorted({
+            name for part in settings.VECTOR_STORE_PARTS for name in publications_for(exam_part=part)
+        })
+    return VectorStore.load(settings.VECTOR_STORE_DIR, publications=publications)
+
+
+@register("prompt_token_counts")
+def _load_prompt_token_counts():
+    """Token count of each agent system prompt (fixed per deploy)"""
+    from app.utils.lazy_import import lazy_import
+
+    try:
+        tiktoken = lazy_import("tiktoken")
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Fallback: ~4 characters per token
+        print(f"Tokenizer unavailable, estimating prompt tokens: {e}")
+        return {name: len(prompt) // 4 for name, prompt in SYSTEM_PROMPTS.items()}
+
+    return {name: len(encoding.encode(prompt)) for name, prompt in SYSTEM_PROMPTS.items()}
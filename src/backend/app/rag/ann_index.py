@@ -0,0 +1,167 @@
+"""
+ANN Index
+Inverted-file (IVF) index with a spherical k-means coarse quantizer
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+import numpy as np
+
+
+# Rows per block when assigning vectors to centroids (bounds the score matrix)
+_ASSIGN_BLOCK = 16384
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+class IVFIndex:
+    """
+    Approximate cosine top-k over one matrix of unit vectors
+
+    Vectors are clustered into `nlist` cells; a query scores the centroids,
+    then only the vectors in the `nprobe` best cells. Recall rises and speed
+    falls with nprobe (nprobe == nlist is exact search). The index stores
+    row ids only, the vectors stay in the caller's (possibly memory-mapped)
+    matrix.
+
+    Inserts after training go to their nearest existing cell; retrain once
+    the data has grown well past what the centroids were trained on
+    (`needs_retrain`).
+    """
+
+    def __init__(self, centroids: np.ndarray, lists: List[np.ndarray], trained_size: int):
+        self.centroids = centroids
+        self.lists = lists
+        self.trained_size = trained_size
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self.lists)
+
+    @staticmethod
+    def default_nlist(n: int) -> int:
+        """~4 * sqrt(n) cells, the usual IVF starting point"""
+        return max(1, min(n, int(4 * np.sqrt(n))))
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        nlist: Optional[int] = None,
+        iterations: int = 10,
+        sample_per_list: int = 32,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """
+        Cluster a sample with spherical k-means, then assign every vector
+
+        Args:
+            vectors: (n, d) unit vectors
+            nlist: Number of cells (default `default_nlist(n)`)
+            sample_per_list: Training sample size per cell
+        """
+        n = len(vectors)
+        nlist = nlist or cls.default_nlist(n)
+        rng = np.random.RandomState(seed)
+
+        sample_size = min(n, nlist * sample_per_list)
+        sample = np.asarray(vectors[np.sort(rng.choice(n, sample_size, replace=False))])
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=nlist)
+            filled = np.flatnonzero(counts)
+
+            sums = np.empty_like(centroids)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+            sums[filled] = np.add.reduceat(sample[order], starts, axis=0)
+
+            # Empty cells restart at a random sample point
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = _unit(sums)
+
+        index = cls(centroids, [np.empty(0, dtype=np.int64) for _ in range(nlist)], n)
+        index.add(vectors, start_id=0)
+        return index
+
+    def assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Nearest cell per vector"""
+        cells = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), _ASSIGN_BLOCK):
+            block = np.asarray(vectors[start:start + _ASSIGN_BLOCK])
+            cells[start:start + len(block)] = np.argmax(block @ self.centroids.T, axis=1)
+        return cells
+
+    def add(self, vectors: np.ndarray, start_id: int) -> None:
+        """Insert vectors whose row ids are start_id, start_id + 1, ..."""
+        if not len(vectors):
+            return
+        cells = self.assign(vectors)
+        order = np.argsort(cells, kind="stable")
+        ids = np.arange(start_id, start_id + len(vectors), dtype=np.int64)[order]
+        bounds = np.searchsorted(cells[order], np.arange(self.nlist + 1))
+        for cell in np.flatnonzero(np.diff(bounds)):
+            new_ids = ids[bounds[cell]:bounds[cell + 1]]
+            self.lists[cell] = np.concatenate([self.lists[cell], new_ids])
+
+    def search(
+        self,
+        vectors: np.ndarray,
+        query: np.ndarray,
+        top_k: int,
+        nprobe: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k rows of `vectors` for a unit `query`
+
+        Args:
+            nprobe: Cells to scan, clamped to 1..nlist
+
+        Returns:
+            (row ids, scores), unordered
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        probe = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        ids = np.concatenate([self.lists[cell] for cell in probe])
+        if not len(ids):
+            return ids, np.empty(0, dtype=np.float32)
+
+        ids.sort()  # Sequential reads from a memory-mapped matrix
+        scores = vectors[ids] @ query
+        k = min(top_k, len(ids))
+        best = np.argpartition(-scores, k - 1)[:k]
+        return ids[best], scores[best]
+
+    def needs_retrain(self, growth: float = 4.0) -> bool:
+        return len(self) > self.trained_size * growth
+
+    def save(self, path: str) -> None:
+        offsets = np.cumsum([0] + [len(ids) for ids in self.lists])
+        ids = np.concatenate(self.lists) if self.lists else np.empty(0, dtype=np.int64)
+        np.savez(path, centroids=self.centroids, offsets=offsets, ids=ids,
+                 trained_size=np.int64(self.trained_size))
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        data = np.load(path)
+        offsets, ids = data["offsets"], data["ids"]
+        lists = [ids[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+        return cls(data["centroids"], lists, int(data["trained_size"]))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        sizes = np.array([len(ids) for ids in self.lists])
+        return {
+            "nlist": self.nlist,
+            "vectors": int(sizes.sum()),
+            "max_list": int(sizes.max()) if len(sizes) else 0,
+            "mean_list": round(float(sizes.mean()), 1) if len(sizes) else 0.0,
+            "needs_retrain": self.needs_retrain(),
+        }
@@ -0,0 +1,272 @@
+"""
+Embedding Cache
+Content-addressed store of float32 embeddings: in-memory LRU over SQLite
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+from collections import OrderedDict
+from app.config import settings
+import asyncio
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import unicodedata
+import numpy as np
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_SQL_BATCH = 500
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of text before embedding
+
+    Unicode NFKC and collapsed whitespace only: case and punctuation change
+    the embedding, so they are kept.
+    """
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def cache_key(model: str, text: str) -> bytes:
+    """SHA-256 of (model, normalized text); identical inputs share one vector"""
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache
+
+    Hot tier: OrderedDict LRU of numpy vectors in this process.
+    Cold tier: SQLite table of raw float32 bytes keyed by `cache_key`, in
+    WAL mode so every gunicorn worker can read while one writes. The
+    connection is opened lazily per process, so a cache built in the
+    master is safe to inherit across fork.
+
+    SQLite never runs on the event loop: `fetch_many` reads in a worker
+    thread, and `put_many` only queues rows for a per-process writer
+    thread that commits everything queued so far in one transaction.
+    New vectors are in the hot tier at once; `flush` waits for the disk.
+    """
+
+    def __init__(self, path: Optional[str] = None, hot_size: Optional[int] = None):
+        self.path = path or settings.EMBEDDING_CACHE_PATH
+        self.hot_size = hot_size if hot_size is not None else settings.EMBEDDING_CACHE_HOT_SIZE
+
+        self._hot: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._conn_lock = threading.Lock()
+        self._pending: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._writer_pid: Optional[int] = None
+
+        self.lookups = 0
+        self.hot_hits = 0
+        self.disk_hits = 0
+        self.writes = 0
+        self.write_batches = 0
+        self.write_errors = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY,"
+            " model TEXT NOT NULL,"
+            " dim INTEGER NOT NULL,"
+            " vector BLOB NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        conn.commit()
+        return conn
+
+    def _db(self) -> sqlite3.Connection:
+        """Read connection for this process (callers hold `_conn_lock`)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn, self._conn_pid = self._connect(), os.getpid()
+        return self._conn
+
+    def _remember(self, key: bytes, vector: np.ndarray) -> None:
+        if self.hot_size <= 0:
+            return
+        self._hot[key] = vector
+        self._hot.move_to_end(key)
+        while len(self._hot) > self.hot_size:
+            self._hot.popitem(last=False)
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        return self.get_many(model, [text])[0]
+
+    def _lookup_hot(
+        self,
+        model: str,
+        texts: List[str]
+    ) -> Tuple[List[Optional[np.ndarray]], Dict[bytes, List[int]]]:
+        """Hot-tier results, plus cold key -> input positions for the misses"""
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        cold: Dict[bytes, List[int]] = {}
+        self.lookups += len(texts)
+        for i, text in enumerate(texts):
+            key = cache_key(model, text)
+            vector = self._hot.get(key)
+            if vector is not None:
+                self._hot.move_to_end(key)
+                self.hot_hits += 1
+                results[i] = vector
+            else:
+                cold.setdefault(key, []).append(i)
+        return results, cold
+
+    def _read(self, keys: List[bytes]) -> List[Tuple[bytes, bytes]]:
+        """(key, vector blob) rows for `keys`, one query per 500 keys"""
+        rows = []
+        with self._conn_lock:
+            db = self._db()
+            for start in range(0, len(keys), _SQL_BATCH):
+                batch = keys[start:start + _SQL_BATCH]
+                rows.extend(db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                ).fetchall())
+        return rows
+
+    def _promote(
+        self,
+        rows: List[Tuple[bytes, bytes]],
+        cold: Dict[bytes, List[int]],
+        results: List[Optional[np.ndarray]]
+    ) -> None:
+        for key, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            self._remember(key, vector)
+            for i in cold[key]:
+                results[i] = vector
+            self.disk_hits += len(cold[key])
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Cached vectors for `texts` (None where missing), in input order
+
+        Hot-tier misses are fetched from SQLite and promoted into the hot
+        tier. Blocks on SQLite; use `fetch_many` from the event loop.
+        """
+        results, cold = self._lookup_hot(model, texts)
+        if cold:
+            self._promote(self._read(list(cold)), cold, results)
+        return results
+
+    async def fetch_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """`get_many` with the SQLite read in a worker thread"""
+        results, cold = self._lookup_hot(model, texts)
+        if cold:
+            rows = await asyncio.to_thread(self._read, list(cold))
+            self._promote(rows, cold, results)
+        return results
+
+    def put(self, model: str, text: str, vector: Iterable[float]) -> None:
+        self.put_many(model, [(text, vector)])
+
+    def put_many(self, model: str, items: Iterable[Tuple[str, Iterable[float]]]) -> None:
+        """
+        Add (text, vector) pairs to the hot tier and queue them for SQLite
+
+        Never blocks: the writer thread commits them with whatever else is
+        queued (existing keys are left as they are).
+        """
+        rows = []
+        for text, vector in items:
+            key = cache_key(model, text)
+            vector = np.asarray(vector, dtype=np.float32)
+            self._remember(key, vector)
+            rows.append((key, model, len(vector), vector.tobytes()))
+
+        if rows:
+            self._writer_queue().put(rows)
+
+    def _writer_queue(self) -> queue.Queue:
+        if self._writer is None or self._writer_pid != os.getpid():
+            self._pending = queue.Queue()
+            self._writer = threading.Thread(
+                target=self._write_loop, args=(self._pending,), name="embedding-cache-writer", daemon=True
+            )
+            self._writer_pid = os.getpid()
+            self._writer.start()
+        return self._pending
+
+    def _write_loop(self, pending: queue.Queue) -> None:
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            items = [pending.get()]
+            while True:
+                try:
+                    items.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [row for item in items if item is not None for row in item]
+            stopping = None in items
+            if rows:
+                try:
+                    with conn:
+                        before = conn.total_changes
+                        conn.executemany(
+                            "INSERT OR IGNORE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)",
+                            rows
+                        )
+                        self.writes += conn.total_changes - before
+                    self.write_batches += 1
+                except sqlite3.Error as e:
+                    self.write_errors += 1
+                    print(f"Embedding cache write failed ({len(rows)} vectors): {e}")
+            for _ in items:
+                pending.task_done()
+        conn.close()
+
+    def flush(self) -> None:
+        """Wait until everything queued by `put_many` is committed"""
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._pending.join()
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._conn_lock:
+            return self._db().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self) -> None:
+        """Commit queued writes, then close this process's connections"""
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._pending.put(None)
+            self._writer.join()
+        self._writer = self._pending = None
+        with self._conn_lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        hits = self.hot_hits + self.disk_hits
+        return {
+            "lookups": self.lookups,
+            "hot_hits": self.hot_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.lookups - hits,
+            "hit_rate": round(hits / self.lookups, 3) if self.lookups else 0.0,
+            "hot_hit_rate": round(self.hot_hits / self.lookups, 3) if self.lookups else 0.0,
+            "hot_entries": len(self._hot),
+            "pending_writes": self._pending.qsize() if self._pending is not None else 0,
+            "writes": self.writes,
+            "write_batches": self.write_batches,
+            "write_errors": self.write_errors,
+        }
@@ -0,0 +1,103 @@
+"""
+Embeddings
+OpenAI text embeddings for RAG queries and publication chunks, behind the embedding cache
+"""
+
+from typing import Dict, Any, Optional, List
+from app.config import settings
+from app.rag.embedding_cache import EmbeddingCache, normalize_text
+from app.utils.lazy_import import lazy_import
+import time
+import numpy as np
+
+openai = lazy_import("openai")
+
+# USD per 1K tokens
+EMBEDDING_PRICES = {
+    "text-embedding-ada-002": 0.0001,
+    "text-embedding-3-small": 0.00002,
+    "text-embedding-3-large": 0.00013,
+}
+
+
+class Embedder:
+    """
+    Embeds text through the cache: only texts never seen before (for this
+    model) reach the API, in batches of `batch_size`.
+
+    Query embedding is the first step of every RAG-backed specialist
+    answer, so a cache hit there removes a network round trip.
+    """
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.model = model or settings.OPENAI_EMBEDDING_MODEL
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.batch_size = batch_size if batch_size is not None else settings.EMBEDDING_BATCH_SIZE
+        self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+        # API usage (cache misses only)
+        self.total_calls = 0
+        self.total_tokens = 0
+        self.total_cost = 0.0
+        self.api_latency_ms = 0
+
+    async def embed(self, text: str) -> np.ndarray:
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        Embeddings for `texts` in input order (float32 vectors)
+
+        Cache misses are de-duplicated before calling the API and written
+        back in bulk, so ingestion re-runs only pay for changed chunks.
+        """
+        vectors = await self.cache.fetch_many(self.model, texts)
+
+        missing: Dict[str, List[int]] = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(normalize_text(texts[i]), []).append(i)
+
+        pending = list(missing)
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start:start + self.batch_size]
+            embedded = await self._call_api(batch)
+            self.cache.put_many(self.model, zip(batch, embedded))
+            for text, vector in zip(batch, embedded):
+                for i in missing[text]:
+                    vectors[i] = vector
+
+        return vectors
+
+    async def _call_api(self, texts: List[str]) -> List[np.ndarray]:
+        start_time = time.time()
+        try:
+            response = await self.client.embeddings.create(model=self.model, input=texts)
+        except Exception as e:
+            raise Exception(f"embedding error: {str(e)}")
+
+        tokens = response.usage.total_tokens
+        self.total_calls += 1
+        self.total_tokens += tokens
+        self.total_cost += tokens / 1000 * EMBEDDING_PRICES.get(self.model, 0.0001)
+        self.api_latency_ms += int((time.time() - start_time) * 1000)
+
+        ordered = sorted(response.data, key=lambda d: d.index)
+        return [np.asarray(d.embedding, dtype=np.float32) for d in ordered]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "api_calls": self.total_calls,
+            "api_tokens": self.total_tokens,
+            "api_cost": round(self.total_cost, 4),
+            "avg_api_latency_ms": (
+                round(self.api_latency_ms / self.total_calls, 1) if self.total_calls else 0.0
+            ),
+            "cache": self.cache.get_metrics(),
+        }
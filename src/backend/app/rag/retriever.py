@@ -0,0 +1,97 @@
+"""
+RAG Retriever
+Searches IRS publication chunks, pre-filtered by exam part, publication and topic
+"""
+
+from typing import Dict, Any, Optional, List, Iterable
+from app.config import settings, IRS_PUBLICATIONS
+from app.rag.embeddings import Embedder
+from app.rag.vector_store import VectorStore, publications_for
+
+
+class RAGRetriever:
+    """
+    Query embedding (cached) + partitioned vector search
+
+    Metadata filters pick the publication partitions before any vector is
+    scored: an exam_part=3 ethics question only searches Circular 230.
+    """
+
+    def __init__(self, store: VectorStore, embedder: Embedder):
+        self.store = store
+        self.embedder = embedder
+
+        self.searches = 0
+        self.chunks_scored = 0
+        self.chunks_available = 0
+
+    def select_publications(
+        self,
+        exam_part: Optional[int] = None,
+        publications: Optional[Iterable[str]] = None,
+        topics: Optional[Iterable[str]] = None
+    ) -> Optional[List[str]]:
+        """Partitions to search for the given filters (None = no filter, search all)"""
+        if exam_part is None and publications is None and not topics:
+            return None
+
+        selected = publications_for(exam_part, topics)
+        if publications is not None:
+            selected = [p for p in selected if p in set(publications)]
+        return selected
+
+    async def search(
+        self,
+        query: str,
+        top_k: Optional[int] = None,
+        exam_part: Optional[int] = None,
+        publications: Optional[Iterable[str]] = None,
+        topics: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Most relevant chunks for a query
+
+        Args:
+            exam_part: Only publications tagged with this EA exam part
+            publications: Only these IRS_PUBLICATIONS keys
+            topics: Only publications tagged with any of these topics
+
+        Returns:
+            [{"source", "page", "text", "score", "topics", "publication"}], best first,
+            at or above SIMILARITY_THRESHOLD
+        """
+        top_k = top_k if top_k is not None else settings.TOP_K_RESULTS
+        selected = self.select_publications(exam_part, publications, topics)
+
+        self.searches += 1
+        self.chunks_scored += self.store.chunk_count(selected)
+        self.chunks_available += self.store.chunk_count()
+
+        if selected == [] or not self.store.chunk_count(selected):
+            return []
+
+        query_vector = await self.embedder.embed(query)
+        results = []
+        for chunk in self.store.search(query_vector, top_k, selected):
+            if chunk["score"] < settings.SIMILARITY_THRESHOLD:
+                break
+            publication = IRS_PUBLICATIONS.get(chunk["publication"], {})
+            results.append({
+                "source": chunk.get("source") or publication.get("name", chunk["publication"]),
+                "page": chunk.get("page"),
+                "text": chunk["text"],
+                "score": chunk["score"],
+                "topics": publication.get("topics", []),
+                "publication": chunk["publication"],
+            })
+        return results
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "searches": self.searches,
+            "avg_chunks_scored": round(self.chunks_scored / self.searches, 1) if self.searches else 0.0,
+            "search_space_fraction": (
+                round(self.chunks_scored / self.chunks_available, 3) if self.chunks_available else 0.0
+            ),
+            "store": self.store.get_metrics(),
+        }
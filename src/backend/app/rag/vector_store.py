@@ -0,0 +1,243 @@
+"""
+Vector Store
+Local chunk embeddings partitioned by IRS publication
+"""
+
+from typing import Dict, Any, Optional, List, Iterable
+from app.config import settings, IRS_PUBLICATIONS
+from app.rag.ann_index import IVFIndex
+import json
+import os
+import shutil
+import tempfile
+import numpy as np
+
+
+class Partition:
+    """
+    One publication's chunks: unit-normalized float32 matrix plus metadata
+    rows, and an IVF index once the partition is large enough to need one
+    """
+
+    def __init__(
+        self,
+        publication: str,
+        vectors: np.ndarray,
+        chunks: List[Dict[str, Any]],
+        index: Optional[IVFIndex] = None
+    ):
+        if len(vectors) != len(chunks):
+            raise ValueError(f"{publication}: {len(vectors)} vectors for {len(chunks)} chunks")
+        self.publication = publication
+        self.vectors = vectors
+        self.chunks = chunks
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+
+class VectorStore:
+    """
+    Cosine search over per-publication partitions
+
+    Each publication is its own partition, so a query only scores the
+    chunks of the publications its filters select. Small partitions are
+    searched exactly; partitions with an IVF index (`build_index`) are
+    searched approximately, scanning `nprobe` cells.
+
+    On disk a partition is `<dir>/<publication>/vectors.npy` +
+    `chunks.jsonl` (+ `index.npz`); vectors are memory-mapped on load, and
+    a worker can load only the publications for the exam parts it serves.
+    """
+
+    def __init__(self):
+        self.partitions: Dict[str, Partition] = {}
+
+    def add(
+        self,
+        publication: str,
+        chunks: List[Dict[str, Any]],
+        vectors: Iterable[Iterable[float]]
+    ) -> None:
+        """Append chunks (with their embeddings) to a publication's partition"""
+        vectors = _normalize(np.asarray(list(vectors), dtype=np.float32))
+        chunks = [dict(chunk, publication=publication) for chunk in chunks]
+
+        index = None
+        existing = self.partitions.get(publication)
+        if existing is not None and len(existing):
+            index = existing.index
+            if index is not None:
+                index.add(vectors, start_id=len(existing))
+            vectors = np.vstack([existing.vectors, vectors])
+            chunks = existing.chunks + chunks
+        self.partitions[publication] = Partition(publication, vectors, chunks, index)
+
+    def build_index(
+        self,
+        min_chunks: Optional[int] = None,
+        nlist: Optional[int] = None,
+        publications: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        Train IVF indexes for partitions with at least `min_chunks` chunks
+
+        Returns:
+            Publications that were indexed
+        """
+        min_chunks = settings.RAG_ANN_MIN_CHUNKS if min_chunks is None else min_chunks
+        indexed = []
+        for name in publications or list(self.partitions):
+            partition = self.partitions.get(name)
+            if partition is None or len(partition) < max(min_chunks, 1):
+                continue
+            partition.index = IVFIndex.train(partition.vectors, nlist=nlist)
+            indexed.append(name)
+        return indexed
+
+    def search(
+        self,
+        query_vector: Iterable[float],
+        top_k: int,
+        publications: Optional[Iterable[str]] = None,
+        nprobe: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k chunks by cosine similarity
+
+        Args:
+            publications: Partitions to search (None = every loaded partition)
+            nprobe: IVF cells to scan in indexed partitions (default RAG_IVF_NPROBE)
+
+        Returns:
+            Chunk metadata dicts with a "score", best first
+        """
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        names = self.partitions if publications is None else [
+            p for p in publications if p in self.partitions
+        ]
+
+        candidates = []
+        for name in names:
+            partition = self.partitions[name]
+            if not len(partition):
+                continue
+            if partition.index is not None:
+                ids, scores = partition.index.search(
+                    partition.vectors, query, top_k, nprobe if nprobe is not None else settings.RAG_IVF_NPROBE
+                )
+            else:
+                scores = partition.vectors @ query
+                k = min(top_k, len(scores))
+                ids = np.argpartition(-scores, k - 1)[:k]
+                scores = scores[ids]
+            candidates.extend((float(s), name, int(i)) for i, s in zip(ids, scores))
+
+        candidates.sort(key=lambda c: c[0], reverse=True)
+        return [
+            dict(self.partitions[name].chunks[i], score=round(score, 4))
+            for score, name, i in candidates[:top_k]
+        ]
+
+    def chunk_count(self, publications: Optional[Iterable[str]] = None) -> int:
+        names = self.partitions if publications is None else publications
+        return sum(len(self.partitions[n]) for n in names if n in self.partitions)
+
+    def save(self, directory: str) -> None:
+        """
+        Write every partition
+
+        Each partition is written to a temporary directory that then
+        replaces the old one, so files from an earlier save (an
+        `index.npz` the partition no longer has) never outlive it, and a
+        failed save leaves the previous partition intact.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, partition in self.partitions.items():
+            path = os.path.join(directory, name)
+            staging = tempfile.mkdtemp(prefix=f".{name}.", dir=directory)
+            try:
+                np.save(os.path.join(staging, "vectors.npy"), np.asarray(partition.vectors))
+                with open(os.path.join(staging, "chunks.jsonl"), "w", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(chunk) + "\n" for chunk in partition.chunks))
+                if partition.index is not None:
+                    partition.index.save(os.path.join(staging, "index.npz"))
+                if os.path.isdir(path):
+                    # Loaded partitions may be memory-mapped from `path`; renaming keeps those maps valid
+                    retired = staging + ".old"
+                    os.rename(path, retired)
+                    os.rename(staging, path)
+                    shutil.rmtree(retired, ignore_errors=True)
+                else:
+                    os.rename(staging, path)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+
+    @classmethod
+    def load(
+        cls,
+        directory: str,
+        publications: Optional[Iterable[str]] = None,
+        mmap: bool = True
+    ) -> "VectorStore":
+        """
+        Load saved partitions (all, or only `publications`)
+
+        A missing directory or publication loads as empty, so the API can
+        start before the publications have been ingested.
+        """
+        store = cls()
+        if not os.path.isdir(directory):
+            return store
+
+        names = (
+            sorted(n for n in os.listdir(directory) if not n.startswith("."))  # Skip interrupted saves
+            if publications is None else publications
+        )
+        for name in names:
+            path = os.path.join(directory, name)
+            if not os.path.exists(os.path.join(path, "vectors.npy")):
+                continue
+            vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r" if mmap else None)
+            with open(os.path.join(path, "chunks.jsonl"), "r", encoding="utf-8") as f:
+                chunks = [json.loads(line) for line in f if line.strip()]
+            index_path = os.path.join(path, "index.npz")
+            index = IVFIndex.load(index_path) if os.path.exists(index_path) else None
+            store.partitions[name] = Partition(name, vectors, chunks, index)
+        return store
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "partitions": {name: len(p) for name, p in self.partitions.items()},
+            "chunks": self.chunk_count(),
+            "ann_indexes": {
+                name: p.index.get_metrics() for name, p in self.partitions.items() if p.index is not None
+            },
+        }
+
+
+def publications_for(
+    exam_part: Optional[int] = None,
+    topics: Optional[Iterable[str]] = None
+) -> List[str]:
+    """
+    Publications matching metadata filters (IRS_PUBLICATIONS tags)
+
+    Args:
+        exam_part: Keep publications tagged with this exam part
+        topics: Keep publications tagged with any of these topics
+    """
+    wanted_topics = {t.lower().replace(" ", "_") for t in topics} if topics else None
+    return [
+        name
+        for name, publication in IRS_PUBLICATIONS.items()
+        if (exam_part is None or exam_part in publication.get("exam_parts", []))
+        and (wanted_topics is None or wanted_topics & set(publication["topics"]))
+    ]
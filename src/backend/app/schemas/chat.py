@@ -0,0 +1,62 @@
+"""
+Chat Schemas
+Request/response models for the AI mentor chat endpoint
+"""
+
+from typing import Dict, Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ChatContext(BaseModel):
+    """Client-side study context sent with each message"""
+    
+    model_config = ConfigDict(extra="allow")
+    
+    ready_score: Optional[int] = None
+    exam_part: Optional[int] = Field(default=None, ge=1, le=3)
+    weak_areas: Optional[List[str]] = None
+    recent_topics: Optional[List[str]] = None
+    request_focus: Optional[bool] = None
+    conversation_history: Optional[List[Dict[str, str]]] = None
+
+
+class ChatRequest(BaseModel):
+    """POST /api/chat body"""
+    
+    user_id: Optional[str] = None
+    message: str = Field(min_length=1)
+    context: ChatContext = Field(default_factory=ChatContext)
+
+
+class RoutingDecision(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    agent: str
+    confidence: float
+    reasoning: Optional[str] = None
+    should_use_rag: Optional[bool] = None
+    routing_method: Optional[str] = None
+
+
+class Citation(BaseModel):
+    source: str
+    page: Optional[int] = None
+    text: str
+    relevance_score: Optional[float] = None
+
+
+class ChatMetadata(BaseModel):
+    tokens_used: int = 0
+    latency_ms: int = 0
+    cost: float = 0.0
+
+
+class ChatResponse(BaseModel):
+    """POST /api/chat response"""
+    
+    success: bool
+    routing: RoutingDecision
+    response: str
+    citations: List[Citation] = []
+    follow_up_suggestions: List[str] = []
+    metadata: ChatMetadata
@@ -0,0 +1,64 @@
+"""
+Ethics Roleplay Schemas
+Request models for Circular 230 scenario turns and the judge's rulings
+"""
+
+from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+
+VERDICT_TEXT_MAX_CHARS = 1000
+
+
+class RoleplayTurnRequest(BaseModel):
+    """POST /api/ethics/scenarios/{scenario_id}/turn body: a scripted choice or free text"""
+    
+    node: int = Field(ge=0)
+    choice: Optional[int] = Field(default=None, ge=0)
+    answer: Optional[str] = Field(default=None, min_length=1)
+    
+    @model_validator(mode="after")
+    def one_of_choice_or_answer(self):
+        if (self.choice is None) == (self.answer is None):
+            raise ValueError("Send exactly one of choice or answer")
+        return self
+
+
+class EthicsVerdict(BaseModel):
+    """
+    Judge ruling on a free-text answer, coerced into what the tree can store
+    
+    matches_choice that isn't a plain integer (null, true, "1st") means no
+    match; practice_rights_impact is clamped to [-30, 10] with 0 for junk.
+    is_ethical has no safe default, so a ruling without one is rejected.
+    """
+    
+    matches_choice: Optional[int] = None
+    is_ethical: bool
+    reference: str = ""
+    outcome: str = ""
+    practice_rights_impact: int = 0
+    
+    @field_validator("matches_choice", mode="before")
+    @classmethod
+    def plain_int_or_none(cls, value):
+        if isinstance(value, bool) or not isinstance(value, (int, str)):
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    
+    @field_validator("reference", "outcome", mode="before")
+    @classmethod
+    def bounded_text(cls, value):
+        return str(value)[:VERDICT_TEXT_MAX_CHARS] if value is not None else ""
+    
+    @field_validator("practice_rights_impact", mode="before")
+    @classmethod
+    def clamped_impact(cls, value):
+        try:
+            impact = int(float(value))
+        except (TypeError, ValueError, OverflowError):
+            return 0
+        return max(-30, min(10, impact))
@@ -0,0 +1,33 @@
+"""
+Exam Schemas
+Request models for fixed-form and adaptive exams
+"""
+
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+# Longest exam a client may request (each EA part is 100 questions)
+MAX_EXAM_QUESTIONS = 200
+
+
+class ExamAssembleRequest(BaseModel):
+    """POST /api/exams/assemble body"""
+    
+    exam_part: int
+    num_questions: Optional[int] = Field(default=None, ge=1, le=MAX_EXAM_QUESTIONS)  # Defaults to the part's length
+    seed: Optional[int] = None  # For reproducible forms
+
+
+class AdaptiveExamRequest(BaseModel):
+    """POST /api/exams/adaptive body"""
+    
+    exam_part: int
+    max_items: Optional[int] = Field(default=None, ge=1, le=MAX_EXAM_QUESTIONS)
+
+
+class AdaptiveAnswerRequest(BaseModel):
+    """POST /api/exams/adaptive/{session_id}/answer body"""
+    
+    question_id: str = Field(min_length=1)
+    answer: int = Field(ge=0)
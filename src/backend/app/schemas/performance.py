@@ -0,0 +1,24 @@
+"""
+Performance Schemas
+Request models for attempt ingest
+"""
+
+from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class AttemptRow(BaseModel):
+    """One `question_attempts` row"""
+    
+    user_id: str = Field(min_length=1)
+    question_topic: str = Field(min_length=1)
+    is_correct: bool
+    time_spent_seconds: float = Field(default=0.0, ge=0)
+    attempted_at: Optional[datetime] = None
+
+
+class AttemptBatchRequest(BaseModel):
+    """POST /api/performance/attempts body; validated as a whole before anything is recorded"""
+    
+    attempts: List[AttemptRow]
@@ -0,0 +1,44 @@
+"""
+Question Schemas
+Request/response models for practice question generation
+"""
+
+from typing import Optional, List
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class QuestionUserContext(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    ready_score: Optional[int] = None
+    weak_areas: Optional[List[str]] = None
+
+
+class QuestionGenerateRequest(BaseModel):
+    """POST /api/questions/generate body"""
+    
+    topic: str = Field(min_length=1)
+    difficulty: str = Field(default="medium", pattern="^(easy|medium|hard)$")
+    user_context: QuestionUserContext = Field(default_factory=QuestionUserContext)
+
+
+class PracticeQuestion(BaseModel):
+    model_config = ConfigDict(extra="allow")
+    
+    id: Optional[str] = None
+    question: str
+    options: List[str]
+    correct_answer: Optional[int] = None
+    explanation: str = ""
+    irs_citation: Optional[str] = None
+    common_trap: Optional[str] = None
+    topic: str
+    difficulty: str
+    duplicate_of: Optional[str] = None
+
+
+class QuestionGenerateResponse(BaseModel):
+    """POST /api/questions/generate response"""
+    
+    success: bool
+    question: PracticeQuestion
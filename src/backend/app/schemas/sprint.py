@@ -0,0 +1,22 @@
+"""
+Sprint Schemas
+Request models for batched answer grading
+"""
+
+from typing import Optional, List
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class SprintSubmission(BaseModel):
+    question_id: str = Field(min_length=1)
+    answer: int = Field(ge=0)
+    time_spent_seconds: float = Field(default=0.0, ge=0)
+    answered_at: Optional[datetime] = None
+
+
+class SprintGradeRequest(BaseModel):
+    """POST /api/sprints/grade body"""
+    
+    user_id: str = Field(min_length=1)
+    submissions: List[SprintSubmission] = Field(min_length=1)
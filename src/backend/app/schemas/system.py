@@ -0,0 +1,32 @@
+"""
+System Schemas
+Health check and metrics response models
+"""
+
+from typing import Dict, Any
+from pydantic import BaseModel
+
+
+class HealthResponse(BaseModel):
+    status: str
+    version: str
+    agents: Dict[str, str]
+    timestamp: float
+
+
+class MetricsTotals(BaseModel):
+    total_calls: int
+    total_cost: float
+
+
+class MetricsResponse(BaseModel):
+    agents: Dict[str, Dict[str, Any]]
+    totals: MetricsTotals
+    startup: Dict[str, Any]
+    chat_requests: Dict[str, int]
+    embeddings: Dict[str, Any]
+    rag: Dict[str, Any]
+    llm_scheduler: Dict[str, Any]
+    ethics: Dict[str, Any]
+    sprints: Dict[str, Any]
+    timestamp: float
@@ -0,0 +1,79 @@
+"""
+Answer Key Index
+Correct option and topic for every gradable question, looked up by id
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+from app.config import settings
+import numpy as np
+
+
+class AnswerKey:
+    """
+    Question id -> (correct option, topic) in O(1)
+
+    Bank questions are compiled once into two small arrays (correct option,
+    topic index) behind an id -> row dict, so grading never touches the
+    question dicts themselves. Built from the preloaded bank, the arrays
+    stay shared between forked workers.
+
+    Questions generated on demand are added per worker to a bounded
+    overlay (oldest evicted first); a sprint answers them within minutes.
+    """
+
+    def __init__(self, bank=None, max_generated: Optional[int] = None):
+        self.max_generated = max_generated  # Default ANSWER_KEY_MAX_GENERATED
+        self._rows: Dict[str, int] = {}
+        self._topics: List[str] = []
+        topic_index: Dict[str, int] = {}
+
+        questions = bank.questions if bank is not None else []
+        self.answers = np.full(len(questions), -1, dtype=np.int8)  # -1: no usable key
+        self.topic_ids = np.zeros(len(questions), dtype=np.int16)
+        for row, question in enumerate(questions):
+            answer = question.get("correct_answer")
+            if not isinstance(answer, int) or not 0 <= answer < len(question.get("options") or []):
+                continue
+            topic = question["topic"]
+            if topic not in topic_index:
+                topic_index[topic] = len(self._topics)
+                self._topics.append(topic)
+            self.answers[row] = answer
+            self.topic_ids[row] = topic_index[topic]
+            self._rows[question["id"]] = row
+
+        self._generated: "OrderedDict[str, Tuple[int, str]]" = OrderedDict()
+
+    def add(self, question: Dict[str, Any]) -> bool:
+        """Register a generated question; returns False if it can't be graded"""
+        question_id = question.get("id")
+        answer = question.get("correct_answer")
+        if not question_id or not isinstance(answer, int) or not question.get("topic"):
+            return False
+        if question_id in self._rows:
+            return True
+
+        self._generated[question_id] = (answer, question["topic"])
+        self._generated.move_to_end(question_id)
+        limit = self.max_generated if self.max_generated is not None else settings.ANSWER_KEY_MAX_GENERATED
+        while len(self._generated) > limit:
+            self._generated.popitem(last=False)
+        return True
+
+    def lookup(self, question_id: str) -> Optional[Tuple[int, str]]:
+        """(correct option, topic), or None for an unknown question"""
+        row = self._rows.get(question_id)
+        if row is not None:
+            return int(self.answers[row]), self._topics[self.topic_ids[row]]
+        return self._generated.get(question_id)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "bank_questions": len(self._rows),
+            "generated_questions": len(self._generated),
+            "memory_bytes": int(self.answers.nbytes + self.topic_ids.nbytes),
+        }
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._generated)
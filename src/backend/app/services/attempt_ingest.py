@@ -0,0 +1,99 @@
+"""
+Attempt Ingest Queue
+Hands graded attempts to the aggregate stores off the request path
+"""
+
+from typing import Dict, Any, Optional, List, Callable, Deque
+from collections import deque
+from app.config import settings
+import asyncio
+
+
+class AttemptIngest:
+    """
+    Background batching of attempt rows into the downstream stores
+
+    `submit` only appends to a deque, so the caller returns immediately;
+    a task on the same event loop drains the deque in batches and passes
+    each batch to every sink (e.g. AttemptLog.append_blocking) in a worker
+    thread, so sinks may block. Rows are shaped like `question_attempts`.
+
+    The queue is bounded by ATTEMPT_INGEST_MAX_PENDING: if the sinks fall
+    that far behind, the oldest rows are dropped (and counted) rather than
+    letting memory grow without limit. Rows still queued at shutdown are
+    flushed, since the sink (the attempt log) outlives the process.
+    """
+
+    def __init__(
+        self,
+        sinks: List[Callable[[List[Dict[str, Any]]], Any]],
+        batch_size: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.sinks = sinks
+        self.batch_size = batch_size if batch_size is not None else settings.ATTEMPT_INGEST_BATCH_SIZE
+        self.max_pending = max_pending if max_pending is not None else settings.ATTEMPT_INGEST_MAX_PENDING
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.submitted = 0
+        self.ingested = 0
+        self.dropped = 0
+        self.sink_errors = 0
+        self.batches = 0
+
+    def submit(self, attempts: List[Dict[str, Any]]) -> None:
+        """Queue attempt rows; never blocks"""
+        self._pending.extend(attempts)
+        self.submitted += len(attempts)
+        overflow = len(self._pending) - self.max_pending
+        for _ in range(max(0, overflow)):
+            self._pending.popleft()
+            self.dropped += 1
+        self._wakeup.set()
+
+    async def _flush(self) -> None:
+        """Ingest one batch"""
+        batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+        for sink in self.sinks:
+            try:
+                await asyncio.to_thread(sink, batch)
+            except Exception as e:
+                self.sink_errors += 1
+                print(f"Attempt ingest failed in {getattr(sink, '__qualname__', sink)}: {e}")
+        self.ingested += len(batch)
+        self.batches += 1
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                await self._flush()
+
+    def start(self) -> "AttemptIngest":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        """Stop the drain task and ingest whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            await self._flush()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "submitted": self.submitted,
+            "ingested": self.ingested,
+            "dropped": self.dropped,
+            "sink_errors": self.sink_errors,
+            "batches": self.batches,
+        }
@@ -0,0 +1,188 @@
+"""
+Attempt Log
+Append-only `question_attempts` log shared by every worker
+"""
+
+from typing import Dict, Any, Optional, List, Callable, Tuple
+from datetime import datetime
+from app.config import settings
+from app.services.mastery_store import parse_attempt
+import asyncio
+import os
+import sqlite3
+import threading
+import uuid
+
+
+_COLUMNS = ("user_id", "question_topic", "is_correct", "time_spent_seconds", "attempted_at")
+
+
+class AttemptLog:
+    """
+    The source of truth for mastery, streak and heatmap aggregates
+
+    Attempts are appended to one SQLite table (WAL, like the embedding
+    cache and exam sessions) that every gunicorn worker shares. The
+    in-memory stores (MasteryStore, RollupStore) are per-worker views of
+    it: `sync` applies rows past the last one this worker has seen, in log
+    order, so every worker converges on the same aggregates and a
+    restarted worker rebuilds them by replaying the log from the start.
+
+    A worker syncs right after its own appends and every
+    ATTEMPT_LOG_POLL_MS in the background, so another worker's writes
+    show up within that interval. SQLite runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        sinks: List[Callable[[List[Dict[str, Any]]], Any]],
+        path: Optional[str] = None,
+        poll_ms: Optional[float] = None,
+        read_batch: Optional[int] = None
+    ):
+        self.sinks = sinks
+        self.path = path or settings.ATTEMPT_LOG_PATH
+        self.poll_ms = poll_ms if poll_ms is not None else settings.ATTEMPT_LOG_POLL_MS
+        self.read_batch = read_batch if read_batch is not None else settings.ATTEMPT_LOG_READ_BATCH
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._conn_lock = threading.Lock()
+        self._sync_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._log_id: Optional[str] = None
+
+        self.last_id = 0
+        self.appended = 0
+        self.applied = 0
+        self.sink_errors = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """Connection for this process (callers hold `_conn_lock`)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS question_attempts ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " user_id TEXT NOT NULL,"
+                " question_topic TEXT NOT NULL,"
+                " is_correct INTEGER NOT NULL,"
+                " time_spent_seconds REAL NOT NULL,"
+                " attempted_at TEXT"
+                ")"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS log_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("INSERT OR IGNORE INTO log_meta VALUES ('log_id', ?)", (uuid.uuid4().hex,))
+            conn.commit()
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    @property
+    def log_id(self) -> str:
+        """Identity of the log file; a recreated log gets a new one"""
+        if self._log_id is None:
+            with self._conn_lock:
+                self._log_id = self._db().execute("SELECT value FROM log_meta WHERE key = 'log_id'").fetchone()[0]
+        return self._log_id
+
+    def append_blocking(self, attempts: List[Dict[str, Any]]) -> int:
+        """
+        Append `question_attempts` rows in one transaction
+
+        Every row is parsed first, so a malformed row rejects the whole
+        batch and never reaches the log (or any worker's stores). Rows
+        without `attempted_at` are stamped now, so a later replay lands
+        them on the same day.
+        """
+        for attempt in attempts:
+            parse_attempt(attempt)
+        now = datetime.now().isoformat()
+        rows = [
+            (
+                a["user_id"], a["question_topic"], int(a["is_correct"]),
+                float(a.get("time_spent_seconds") or 0.0), a.get("attempted_at") or now,
+            )
+            for a in attempts
+        ]
+        with self._conn_lock:
+            db = self._db()
+            with db:
+                db.executemany(
+                    f"INSERT INTO question_attempts ({', '.join(_COLUMNS)}) VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+        self.appended += len(rows)
+        return len(rows)
+
+    async def append(self, attempts: List[Dict[str, Any]]) -> int:
+        """Append rows, then apply everything new to this worker's stores"""
+        appended = await asyncio.to_thread(self.append_blocking, attempts)
+        await self.sync()
+        return appended
+
+    def _read_after(self, last_id: int) -> List[Tuple[Any, ...]]:
+        with self._conn_lock:
+            return self._db().execute(
+                f"SELECT id, {', '.join(_COLUMNS)} FROM question_attempts WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, self.read_batch)
+            ).fetchall()
+
+    async def sync(self) -> int:
+        """Apply rows appended (by any worker) since the last sync; returns rows applied"""
+        applied = 0
+        async with self._sync_lock:
+            while True:
+                rows = await asyncio.to_thread(self._read_after, self.last_id)
+                if not rows:
+                    return applied
+                batch = [
+                    dict(zip(_COLUMNS, (user_id, topic, bool(is_correct), time_spent, attempted_at)))
+                    for _, user_id, topic, is_correct, time_spent, attempted_at in rows
+                ]
+                for sink in self.sinks:
+                    try:
+                        sink(batch)
+                    except Exception as e:
+                        self.sink_errors += 1
+                        print(f"Attempt log sync failed in {getattr(sink, '__qualname__', sink)}: {e}")
+                self.last_id = rows[-1][0]
+                self.applied += len(batch)
+                applied += len(batch)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_ms / 1000)
+            try:
+                await self.sync()
+            except sqlite3.Error as e:
+                print(f"Attempt log sync failed: {e}")
+
+    def start(self) -> "AttemptLog":
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        with self._conn_lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "last_id": self.last_id,
+            "appended": self.appended,
+            "applied": self.applied,
+            "sink_errors": self.sink_errors,
+        }
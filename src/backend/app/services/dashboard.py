@@ -0,0 +1,168 @@
+"""
+Dashboard Assembly
+Everything the landing dashboard shows, in one payload with a per-user ETag
+"""
+
+from typing import Dict, Any, Optional, List
+from datetime import date
+from app.config import settings, EXAM_PARTS
+from app.services.mastery_store import MasteryStore
+from app.services.mission_generator import MissionStore
+import asyncio
+import hashlib
+import orjson
+
+
+def dashboard_etag(
+    user_id: str,
+    mastery_store: MasteryStore,
+    mission_store: MissionStore,
+    today: Optional[date] = None
+) -> str:
+    """
+    Weak ETag for a user's dashboard
+
+    Built from the mastery version counter and today's (few) mission rows,
+    so it is cheap to check before any section is assembled. It changes
+    when the user records an attempt or gets new missions, at midnight
+    (today's missions, streak liveness) and on deploy. Mastery versions
+    count attempts from the shared attempt log, so every worker that has
+    caught up issues the same ETag; the log's id is included so a
+    recreated log never matches an old one.
+    """
+    today = today or date.today()
+    missions = orjson.dumps(mission_store.get(user_id, today), option=orjson.OPT_SORT_KEYS)
+    raw = (
+        f"{settings.APP_VERSION}:{user_id}:{today.isoformat()}:"
+        f"{mastery_store.instance_id}:{mastery_store.version(user_id)}:"
+    ).encode() + missions
+    return f'W/"{hashlib.sha1(raw).hexdigest()[:20]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, lists and * allowed)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    weak = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (tag[2:] if tag.startswith("W/") else tag) == weak for tag in candidates
+    )
+
+
+def _part_ready_score(topics: Dict[str, Dict[str, Any]], part: int) -> Optional[int]:
+    """
+    ReadyScore for one exam part from topic proficiency
+
+    Unpracticed blueprint topics count as zero proficiency, so breadth
+    matters as much as accuracy. None until the part has enough attempts
+    to say anything.
+    """
+    blueprint = EXAM_PARTS[part]["topics"]
+    attempts = sum(topics[t]["attempts"] for t in blueprint if t in topics)
+    if attempts < settings.WEAK_AREA_MIN_ATTEMPTS:
+        return None
+
+    proficiency = sum(
+        topics[t]["proficiency"] * topics[t]["confidence"] for t in blueprint if t in topics
+    ) / len(blueprint)
+    span = settings.READY_SCORE_MAX - settings.READY_SCORE_MIN
+    return int(round(settings.READY_SCORE_MIN + span * proficiency))
+
+
+async def _stats(topics: Dict[str, Dict[str, Any]]):
+    answered = sum(t["attempts"] for t in topics.values())
+    correct = sum(t["correct"] for t in topics.values())
+    return {
+        "questions_answered": answered,
+        "accuracy": round(correct / answered, 3) if answered else None,
+        "study_minutes": int(sum(t["time_spent_seconds"] for t in topics.values()) // 60),
+        "topics_practiced": len(topics),
+    }
+
+
+async def _ready_score(topics: Dict[str, Dict[str, Any]]):
+    by_part = {part: _part_ready_score(topics, part) for part in EXAM_PARTS}
+    scored = [score for score in by_part.values() if score is not None]
+    return {
+        "score": int(round(sum(scored) / len(scored))) if scored else None,
+        "questions_answered": sum(t["attempts"] for t in topics.values()),
+        "by_part": by_part,
+    }
+
+
+async def _streak(user_id: str, mastery_store: MasteryStore, today: date):
+    last_active = mastery_store.last_active(user_id)
+    return {
+        "days": mastery_store.streak_days(user_id, today),
+        "active_today": last_active == today,
+    }
+
+
+async def _focus_areas(user_id: str, mastery_store: MasteryStore):
+    return mastery_store.weak_areas(user_id, k=3)
+
+
+async def _daily_missions(user_id: str, mission_store: MissionStore, today: date):
+    return mission_store.get(user_id, today)
+
+
+async def _exam_parts(topics: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    parts = []
+    for part, config in EXAM_PARTS.items():
+        practiced = [t for t in config["topics"] if t in topics]
+        ready_score = _part_ready_score(topics, part)
+        if ready_score is not None and ready_score >= config["passing_score"]:
+            status = "ready"
+        elif practiced:
+            status = "in_progress"
+        else:
+            status = "not_started"
+        parts.append({
+            "part": part,
+            "name": config["name"],
+            "topics": config["topics"],
+            "topics_practiced": len(practiced),
+            "progress": round(len(practiced) / len(config["topics"]), 3),
+            "ready_score": ready_score,
+            "passing_score": config["passing_score"],
+            "status": status,
+        })
+    return parts
+
+
+async def build_dashboard(
+    user_id: str,
+    mastery_store: MasteryStore,
+    mission_store: MissionStore,
+    today: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    All dashboard sections for one user
+
+    Sections are built concurrently; each reads the shared per-topic
+    snapshot instead of re-querying the stores.
+    """
+    today = today or date.today()
+    topics = mastery_store.user_topics(user_id)
+
+    stats, ready_score, streak, focus_areas, missions, exam_parts = await asyncio.gather(
+        _stats(topics),
+        _ready_score(topics),
+        _streak(user_id, mastery_store, today),
+        _focus_areas(user_id, mastery_store),
+        _daily_missions(user_id, mission_store, today),
+        _exam_parts(topics),
+    )
+    stats["study_streak_days"] = streak["days"]
+
+    return {
+        "user_id": user_id,
+        "date": today.isoformat(),
+        "stats": stats,
+        "ready_score": ready_score,
+        "streak": streak,
+        "focus_areas": focus_areas,
+        "daily_missions": missions,
+        "exam_parts": exam_parts,
+    }
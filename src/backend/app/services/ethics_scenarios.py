@@ -0,0 +1,450 @@
+"""
+Ethics Scenario Engine
+Precomputed Circular 230 roleplay trees with O(1) turns and cached
+free-text rulings
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+from app.config import settings, EXAM_PARTS
+from app.schemas.ethics import EthicsVerdict
+import asyncio
+import json
+import os
+import re
+import numpy as np
+
+
+END = -1  # choice_next for a choice that ends the scenario
+
+_WORD = re.compile(r"[a-z0-9§.]+")
+
+
+def normalize_answer(text: str) -> str:
+    """Cache key for a free-text answer: lowercase words, punctuation and spacing dropped"""
+    words = (word.strip(".") for word in _WORD.findall(text.lower()))
+    return " ".join(word for word in words if word)
+
+
+class ScenarioStore:
+    """
+    Branching scenario trees compiled into flat, index-addressed columns
+
+    Nodes and choices of every scenario share one set of arrays. A node
+    owns the contiguous choice range [node_first[n], node_first[n] +
+    node_choices[n]), and choice_next holds the node a choice leads to
+    (END when the scenario is over), so a turn is two array reads.
+    Narrative text lives in parallel lists, numbers in numpy columns that
+    grow by doubling.
+
+    Free-text answers learned at runtime become extra choices outside any
+    node's authored range, reachable through `_answers`, keyed by
+    (node, normalized answer). At most ETHICS_MAX_LEARNED_PER_NODE answers
+    are learned per node, so arbitrary free text can't grow the tree
+    without bound.
+    """
+
+    def __init__(self, scenarios: Optional[Iterable[Dict[str, Any]]] = None):
+        self.scenarios: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, int] = {}
+        self._by_topic: Dict[str, List[int]] = {}
+
+        # Node columns
+        self.node_scenario = np.zeros(64, dtype=np.int32)
+        self.node_first = np.zeros(64, dtype=np.int32)
+        self.node_choices = np.zeros(64, dtype=np.int16)
+        self.node_name: List[str] = []
+        self.node_text: List[Tuple[str, str]] = []  # (situation, prompt)
+
+        # Choice columns
+        self.choice_next = np.zeros(256, dtype=np.int32)
+        self.choice_impact = np.zeros(256, dtype=np.int16)
+        self.choice_ethical = np.zeros(256, dtype=np.bool_)
+        self.choice_text: List[str] = []
+        self.choice_outcome: List[str] = []
+        self.choice_reference: List[str] = []
+
+        self._answers: Dict[Tuple[int, str], int] = {}
+        self._learned: Dict[int, int] = {}  # node -> answers learned from rulings
+
+        if scenarios:
+            self.add_many(scenarios)
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _grown(array: np.ndarray, size: int) -> np.ndarray:
+        if size <= len(array):
+            return array
+        capacity = len(array)
+        while capacity < size:
+            capacity *= 2
+        grown = np.zeros(capacity, dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    def _reserve(self, nodes: int, choices: int) -> None:
+        node_size = len(self.node_name) + nodes
+        choice_size = len(self.choice_text) + choices
+        self.node_scenario = self._grown(self.node_scenario, node_size)
+        self.node_first = self._grown(self.node_first, node_size)
+        self.node_choices = self._grown(self.node_choices, node_size)
+        self.choice_next = self._grown(self.choice_next, choice_size)
+        self.choice_impact = self._grown(self.choice_impact, choice_size)
+        self.choice_ethical = self._grown(self.choice_ethical, choice_size)
+
+    def _append_choice(self, choice: Dict[str, Any], next_node: int) -> int:
+        index = len(self.choice_text)
+        self._reserve(0, 1)
+        self.choice_next[index] = next_node
+        self.choice_impact[index] = int(choice.get("practice_rights_impact", 0))
+        self.choice_ethical[index] = bool(choice.get("is_ethical", False))
+        self.choice_text.append(choice["text"])
+        self.choice_outcome.append(choice.get("outcome", ""))
+        self.choice_reference.append(choice.get("reference", ""))
+        return index
+
+    @staticmethod
+    def _reachable(scenario: Dict[str, Any]) -> Optional[List[str]]:
+        """Node names in breadth-first order from the root, or None if the tree is malformed"""
+        nodes = scenario.get("nodes") or {}
+        root = scenario.get("root")
+        if root not in nodes:
+            return None
+
+        order, seen = [root], {root}
+        for name in order:
+            node = nodes[name]
+            if not node.get("situation") and not node.get("prompt"):
+                return None
+            for choice in node.get("choices", []):
+                if not choice.get("text"):
+                    return None
+                next_name = choice.get("next")
+                if next_name is None:
+                    continue
+                if next_name not in nodes:
+                    return None
+                if next_name not in seen:
+                    seen.add(next_name)
+                    order.append(next_name)
+        return order
+
+    def add(self, scenario: Dict[str, Any]) -> Optional[int]:
+        """
+        Compile one scenario tree; returns its index or None if rejected
+        (duplicate id, topic outside Part 3, dangling or missing nodes)
+
+        Input format: {"id", "topic", "title", "client_name", "client_avatar",
+        "root": name, "nodes": {name: {"situation", "prompt", "choices": [
+        {"text", "is_ethical", "reference", "outcome", "practice_rights_impact",
+        "next": name | null}]}}}
+        """
+        scenario_id = scenario.get("id")
+        if not scenario_id or scenario_id in self._by_id:
+            return None
+        if scenario.get("topic") not in EXAM_PARTS[3]["topics"]:
+            return None
+        order = self._reachable(scenario)
+        if order is None:
+            return None
+
+        nodes = scenario["nodes"]
+        base = len(self.node_name)
+        index_of = {name: base + i for i, name in enumerate(order)}
+        self._reserve(len(order), sum(len(nodes[name].get("choices", [])) for name in order))
+
+        scenario_index = len(self.scenarios)
+        for name in order:
+            node = nodes[name]
+            n = len(self.node_name)
+            self.node_scenario[n] = scenario_index
+            self.node_first[n] = len(self.choice_text)
+            self.node_choices[n] = len(node.get("choices", []))
+            self.node_name.append(name)
+            self.node_text.append((node.get("situation", ""), node.get("prompt", "")))
+            for choice in node.get("choices", []):
+                next_name = choice.get("next")
+                self._append_choice(choice, END if next_name is None else index_of[next_name])
+
+        self.scenarios.append({
+            "id": scenario_id,
+            "topic": scenario["topic"],
+            "title": scenario.get("title", ""),
+            "client_name": scenario.get("client_name", ""),
+            "client_avatar": scenario.get("client_avatar", ""),
+            "root": base,
+            "nodes": len(order),
+        })
+        self._by_id[scenario_id] = scenario_index
+        self._by_topic.setdefault(scenario["topic"], []).append(scenario_index)
+        return scenario_index
+
+    def add_many(self, scenarios: Iterable[Dict[str, Any]]) -> int:
+        """Bulk add; returns number of scenarios accepted"""
+        return sum(1 for s in scenarios if self.add(s) is not None)
+
+    @classmethod
+    def load_jsonl(cls, path: str) -> "ScenarioStore":
+        """Load scenario trees from a JSONL file (one scenario per line)"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    # ------------------------------------------------------------------
+    # Turns
+    # ------------------------------------------------------------------
+
+    def get(self, scenario_id: str) -> Optional[Dict[str, Any]]:
+        index = self._by_id.get(scenario_id)
+        return self.scenarios[index] if index is not None else None
+
+    def list(self, topic: Optional[str] = None) -> List[Dict[str, Any]]:
+        if topic is None:
+            return list(self.scenarios)
+        return [self.scenarios[i] for i in self._by_topic.get(topic, [])]
+
+    def node_of(self, scenario_id: str, node: int) -> Optional[int]:
+        """`node` if it belongs to the scenario, else None"""
+        index = self._by_id.get(scenario_id)
+        if index is None or not 0 <= node < len(self.node_name) or self.node_scenario[node] != index:
+            return None
+        return node
+
+    def node(self, node: int) -> Dict[str, Any]:
+        """What the client sees at a node (choice outcomes stay hidden)"""
+        situation, prompt = self.node_text[node]
+        first = int(self.node_first[node])
+        count = int(self.node_choices[node])
+        return {
+            "node": node,
+            "situation": situation,
+            "prompt": prompt,
+            "choices": [{"index": i, "text": self.choice_text[first + i]} for i in range(count)],
+            "final": count == 0,
+        }
+
+    def choice_index(self, node: int, choice: int) -> Optional[int]:
+        """Global index of a node's authored choice, or None if out of range"""
+        if not 0 <= choice < self.node_choices[node]:
+            return None
+        return int(self.node_first[node]) + choice
+
+    def outcome(self, choice: int) -> Dict[str, Any]:
+        """Result of taking a choice, plus the next node (None when the scenario ends)"""
+        next_node = int(self.choice_next[choice])
+        return {
+            "outcome": {
+                "text": self.choice_text[choice],
+                "is_ethical": bool(self.choice_ethical[choice]),
+                "reference": self.choice_reference[choice],
+                "outcome": self.choice_outcome[choice],
+                "practice_rights_impact": int(self.choice_impact[choice]),
+            },
+            "next": self.node(next_node) if next_node != END else None,
+        }
+
+    def ruling_outcome(self, node: int, answer: str, verdict: Dict[str, Any]) -> Dict[str, Any]:
+        """`outcome` for a ruling that isn't stored in the tree"""
+        matched = self._matched_choice(node, verdict)
+        if matched is not None:
+            return self.outcome(matched)
+        next_node = self._next_for(node, verdict["is_ethical"])
+        return {
+            "outcome": {
+                "text": answer,
+                "is_ethical": verdict["is_ethical"],
+                "reference": verdict["reference"],
+                "outcome": verdict["outcome"],
+                "practice_rights_impact": verdict["practice_rights_impact"],
+            },
+            "next": self.node(next_node) if next_node != END else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Free-text answers
+    # ------------------------------------------------------------------
+
+    def match_answer(self, node: int, key: str) -> Optional[Tuple[int, str]]:
+        """
+        Resolve a normalized free-text answer without an LLM
+
+        Only an answer already ruled on, or one that is a scripted choice
+        word for word, is resolved here. Near matches are not: "I will not
+        sign the return" overlaps almost entirely with "I will sign the
+        return" and means the opposite, so anything else goes to the judge.
+
+        Returns:
+            (choice index, "cache" | "matched"), or None if it needs a ruling
+        """
+        cached = self._answers.get((node, key))
+        if cached is not None:
+            return cached, "cache"
+
+        first = int(self.node_first[node])
+        for choice in range(first, first + int(self.node_choices[node])):
+            if normalize_answer(self.choice_text[choice]) == key:
+                self._answers[(node, key)] = choice
+                return choice, "matched"
+        return None
+
+    def _matched_choice(self, node: int, verdict: Dict[str, Any]) -> Optional[int]:
+        matched = verdict["matches_choice"]
+        if matched is not None and 0 <= matched < self.node_choices[node]:
+            return int(self.node_first[node]) + matched
+        return None
+
+    def _next_for(self, node: int, is_ethical: bool) -> int:
+        """Where the node's first authored choice of the same kind (ethical or not) leads"""
+        first = int(self.node_first[node])
+        return next(
+            (int(self.choice_next[c]) for c in range(first, first + int(self.node_choices[node]))
+             if bool(self.choice_ethical[c]) == is_ethical),
+            END
+        )
+
+    def can_learn(self, node: int) -> bool:
+        return self._learned.get(node, 0) < settings.ETHICS_MAX_LEARNED_PER_NODE
+
+    def learn_answer(self, node: int, key: str, answer: str, verdict: Dict[str, Any]) -> int:
+        """
+        Cache a validated LLM ruling (EthicsVerdict) on a free-text answer
+        into the tree; check `can_learn` first
+
+        A ruling that maps the answer onto an authored choice reuses it;
+        otherwise the answer becomes a new choice that continues where the
+        node's first authored choice of the same kind goes.
+
+        Returns:
+            Choice index now cached for (node, key)
+        """
+        choice = self._matched_choice(node, verdict)
+        if choice is None:
+            choice = self._append_choice(
+                dict(verdict, text=answer), self._next_for(node, verdict["is_ethical"])
+            )
+
+        self._answers[(node, key)] = choice
+        self._learned[node] = self._learned.get(node, 0) + 1
+        return choice
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "scenarios": len(self.scenarios),
+            "nodes": len(self.node_name),
+            "choices": len(self.choice_text),
+            "learned_answers": sum(self._learned.values()),
+            "by_topic": {topic: len(ids) for topic, ids in self._by_topic.items()},
+        }
+
+    def __len__(self) -> int:
+        return len(self.scenarios)
+
+
+class FreeTextJudge:
+    """
+    Free-text turns: cache, then an exact scripted choice, then one LLM ruling
+
+    Concurrent identical answers at the same node share one LLM call.
+    Rulings are appended to a JSONL log and replayed at startup, so each
+    worker pays for an answer at most once across restarts (workers do
+    not see each other's rulings until they restart). Once a node has
+    learned its quota of answers, further rulings there are served but
+    neither cached nor logged.
+    """
+
+    def __init__(self, store: ScenarioStore, agent, log_path: Optional[str] = None):
+        self.store = store
+        self.agent = agent
+        self.log_path = log_path
+        self._pending: Dict[Tuple[int, str], asyncio.Future] = {}
+        self.stats = {"cache": 0, "matched": 0, "llm": 0, "llm_uncached": 0, "llm_failed": 0}
+
+    def replay(self) -> int:
+        """Load rulings logged by earlier runs; returns the number applied"""
+        if not self.log_path or not os.path.exists(self.log_path):
+            return 0
+        applied = 0
+        with open(self.log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                    verdict = EthicsVerdict.model_validate(entry["verdict"]).model_dump()
+                except (ValueError, KeyError, TypeError):
+                    continue  # Torn last line, or a hand-edited entry
+                node = self._node_by_name(entry["scenario_id"], entry["node"])
+                if (
+                    node is not None
+                    and (node, entry["key"]) not in self.store._answers
+                    and self.store.can_learn(node)
+                ):
+                    self.store.learn_answer(node, entry["key"], entry["answer"], verdict)
+                    applied += 1
+        return applied
+
+    def _node_by_name(self, scenario_id: str, name: str) -> Optional[int]:
+        scenario = self.store.get(scenario_id)
+        if scenario is None:
+            return None
+        root = scenario["root"]
+        for node in range(root, root + scenario["nodes"]):
+            if self.store.node_name[node] == name:
+                return node
+        return None
+
+    def _log(self, node: int, key: str, answer: str, verdict: Dict[str, Any]) -> None:
+        if not self.log_path:
+            return
+        scenario_id = self.store.scenarios[int(self.store.node_scenario[node])]["id"]
+        entry = {
+            "scenario_id": scenario_id,
+            "node": self.store.node_name[node],
+            "key": key,
+            "answer": answer,
+            "verdict": {k: verdict[k] for k in EthicsVerdict.model_fields},
+        }
+        os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    async def answer(self, node: int, answer: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Returns:
+            (`ScenarioStore.outcome` payload, source: "cache" | "matched" | "llm")
+        """
+        key = normalize_answer(answer)
+        resolved = self.store.match_answer(node, key)
+        if resolved is not None:
+            self.stats[resolved[1]] += 1
+            return self.store.outcome(resolved[0]), resolved[1]
+
+        pending = self._pending.get((node, key))
+        if pending is not None:
+            self.stats["cache"] += 1
+            return await asyncio.shield(pending), "cache"
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[(node, key)] = future
+        try:
+            verdict = await self.agent.process(answer, {"node": self.store.node(node)})
+            if self.store.can_learn(node):
+                result = self.store.outcome(self.store.learn_answer(node, key, answer, verdict))
+                self._log(node, key, answer, verdict)
+                self.stats["llm"] += 1
+            else:
+                result = self.store.ruling_outcome(node, answer, verdict)
+                self.stats["llm_uncached"] += 1
+            future.set_result(result)
+            return result, "llm"
+        except BaseException as e:
+            self.stats["llm_failed"] += 1
+            future.set_exception(e)
+            future.exception()  # Waiters (if any) re-raise it; don't warn when there are none
+            raise
+        finally:
+            del self._pending[(node, key)]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.store.get_metrics(), "free_text": dict(self.stats)}
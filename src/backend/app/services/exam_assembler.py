@@ -0,0 +1,222 @@
+"""
+Exam Assembly Engine
+Blueprint-stratified fixed exams and computerized-adaptive exams from the question bank
+"""
+
+from typing import Dict, Any, Optional, List, Sequence
+from app.config import settings, EXAM_PARTS
+from app.services.question_bank import QuestionBank, DIFFICULTIES
+import numpy as np
+import random
+import uuid
+
+
+# Share of each difficulty level within a topic's quota
+DEFAULT_DIFFICULTY_MIX = {"easy": 0.3, "medium": 0.5, "hard": 0.2}
+
+# Fields never sent to the client while an exam is in progress
+ANSWER_FIELDS = ("correct_answer", "explanation", "common_trap", "irs_citation")
+
+
+def public_question(question: Dict[str, Any]) -> Dict[str, Any]:
+    """Question as shown during an exam (answer key removed)"""
+    return {k: v for k, v in question.items() if k not in ANSWER_FIELDS}
+
+
+def _allocate(total: int, weights: Sequence[float]) -> List[int]:
+    """Split `total` into integer quotas proportional to weights (largest remainder)"""
+    if not weights:
+        return []
+
+    weight_sum = float(sum(weights))
+    raw = [total * w / weight_sum for w in weights]
+    quotas = [int(r) for r in raw]
+    remainders = sorted(range(len(raw)), key=lambda i: raw[i] - quotas[i], reverse=True)
+    for i in remainders[: total - sum(quotas)]:
+        quotas[i] += 1
+    return quotas
+
+
+def assemble_exam(
+    bank: QuestionBank,
+    exam_part: int,
+    num_questions: Optional[int] = None,
+    difficulty_mix: Optional[Dict[str, float]] = None,
+    seed: Optional[int] = None,
+    include_answers: bool = False
+) -> Dict[str, Any]:
+    """
+    Assemble a fixed-form exam by stratified sampling
+
+    Quotas are split evenly across the part's topics, then by difficulty
+    mix within each topic. Buckets that run short are backfilled from the
+    rest of the part so the exam always reaches `num_questions` when the
+    bank is large enough.
+    """
+    part_config = EXAM_PARTS[exam_part]
+    num_questions = num_questions or part_config["questions"]
+    difficulty_mix = difficulty_mix or DEFAULT_DIFFICULTY_MIX
+    rng = random.Random(seed)
+
+    topics = bank.topics(exam_part)
+    mix_weights = [difficulty_mix.get(d, 0.0) for d in DIFFICULTIES]
+
+    selected: List[int] = []
+    for topic, topic_quota in zip(topics, _allocate(num_questions, [1.0] * len(topics))):
+        for difficulty, quota in zip(DIFFICULTIES, _allocate(topic_quota, mix_weights)):
+            bucket = bank.bucket(exam_part, topic, difficulty)
+            selected.extend(rng.sample(bucket, min(quota, len(bucket))))
+
+    shortfall = num_questions - len(selected)
+    if shortfall > 0:
+        chosen = set(selected)
+        remaining = [p for p in bank.part_positions(exam_part) if p not in chosen]
+        selected.extend(rng.sample(remaining, min(shortfall, len(remaining))))
+
+    rng.shuffle(selected)
+    questions = [bank.questions[p] for p in selected]
+    if not include_answers:
+        questions = [public_question(q) for q in questions]
+
+    return {
+        "exam_id": str(uuid.uuid4()),
+        "exam_part": exam_part,
+        "name": part_config["name"],
+        "time_minutes": part_config["time_minutes"],
+        "num_questions": len(questions),
+        "questions": questions,
+    }
+
+
+def fisher_information(
+    theta: float,
+    a: np.ndarray,
+    b: np.ndarray,
+    c: np.ndarray
+) -> np.ndarray:
+    """3PL item information at ability theta, for every item at once"""
+    p = c + (1.0 - c) / (1.0 + np.exp(-a * (theta - b)))
+    return (a ** 2) * ((p - c) ** 2 / (1.0 - c) ** 2) * ((1.0 - p) / p)
+
+
+class AdaptiveExamSession:
+    """
+    Computerized-adaptive exam for one user
+
+    Ability is tracked as a posterior over a fixed theta grid (EAP). The next
+    item is the unused one with maximum Fisher information at the current
+    estimate, restricted to the topic furthest behind its blueprint share.
+    """
+
+    THETA_GRID = np.linspace(-4.0, 4.0, 81)
+
+    def __init__(
+        self,
+        bank: QuestionBank,
+        exam_part: int,
+        max_items: Optional[int] = None,
+        se_target: Optional[float] = None
+    ):
+        self.session_id = str(uuid.uuid4())
+        self.bank = bank
+        self.exam_part = exam_part
+        self.se_target = se_target if se_target is not None else settings.ADAPTIVE_EXAM_SE_TARGET
+
+        self._arrays = bank.part_arrays(exam_part)
+        n_items = len(self._arrays["positions"])
+        self.max_items = min(max_items or EXAM_PARTS[exam_part]["questions"], n_items)
+
+        self._administered = np.zeros(n_items, dtype=bool)
+        self._topic_counts = np.zeros(len(bank.topics(exam_part)), dtype=np.int32)
+        self._item_by_id = {
+            bank.questions[p]["id"]: i for i, p in enumerate(self._arrays["positions"])
+        }
+        self._pending: Optional[int] = None
+
+        # Standard normal prior
+        self._log_posterior = -0.5 * self.THETA_GRID ** 2
+        self.theta = 0.0
+        self.standard_error = 1.0
+        self.responses: List[Dict[str, Any]] = []
+
+    @property
+    def finished(self) -> bool:
+        answered = len(self.responses)
+        return (
+            answered >= self.max_items
+            or (answered > 0 and self.standard_error < self.se_target)
+        )
+
+    def next_question(self) -> Optional[Dict[str, Any]]:
+        """Select and return the next item (answer key removed)"""
+        if self.finished:
+            return None
+        if self._pending is not None:
+            return public_question(self.bank.questions[self._arrays["positions"][self._pending]])
+
+        available = ~self._administered
+        topic_ids = self._arrays["topic_ids"]
+
+        # Content balancing: the least-covered topic that still has items
+        open_topics = np.unique(topic_ids[available])
+        topic = open_topics[np.argmin(self._topic_counts[open_topics])]
+        candidates = available & (topic_ids == topic)
+
+        info = fisher_information(self.theta, self._arrays["a"], self._arrays["b"], self._arrays["c"])
+        info[~candidates] = -np.inf
+        item = int(np.argmax(info))
+
+        self._administered[item] = True
+        self._topic_counts[topic] += 1
+        self._pending = item
+
+        return public_question(self.bank.questions[self._arrays["positions"][item]])
+
+    def record_response(self, question_id: str, answer: int) -> Dict[str, Any]:
+        """
+        Score the pending item and update the ability estimate
+
+        Raises:
+            ValueError: if `question_id` is not the item that was served
+        """
+        item = self._item_by_id.get(question_id)
+        if item is None or item != self._pending:
+            raise ValueError(f"Question {question_id} is not the current item")
+
+        question = self.bank.questions[self._arrays["positions"][item]]
+        is_correct = answer == question.get("correct_answer")
+
+        a = self._arrays["a"][item]
+        b = self._arrays["b"][item]
+        c = self._arrays["c"][item]
+        p = c + (1.0 - c) / (1.0 + np.exp(-a * (self.THETA_GRID - b)))
+        self._log_posterior += np.log(p if is_correct else 1.0 - p)
+
+        posterior = np.exp(self._log_posterior - self._log_posterior.max())
+        posterior /= posterior.sum()
+        self.theta = float(np.dot(posterior, self.THETA_GRID))
+        self.standard_error = float(np.sqrt(np.dot(posterior, (self.THETA_GRID - self.theta) ** 2)))
+
+        self._pending = None
+        self.responses.append({
+            "question_id": question_id,
+            "answer": answer,
+            "is_correct": is_correct,
+        })
+
+        return {
+            "is_correct": is_correct,
+            "correct_answer": question.get("correct_answer"),
+            "explanation": question.get("explanation", ""),
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "exam_part": self.exam_part,
+            "answered": len(self.responses),
+            "correct": sum(1 for r in self.responses if r["is_correct"]),
+            "theta": round(self.theta, 3),
+            "standard_error": round(self.standard_error, 3),
+            "finished": self.finished,
+        }
@@ -0,0 +1,180 @@
+"""
+Exam Session Store
+Adaptive exam sessions shared by every worker, bounded by idle time
+"""
+
+from typing import Any, Optional, List, Tuple
+from collections import OrderedDict
+from app.config import settings
+from app.services.exam_assembler import AdaptiveExamSession
+from app.services.question_bank import QuestionBank
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ExamSessionStore:
+    """
+    Adaptive exam sessions that any worker can continue
+
+    Item selection has no randomness, so a session is fully determined by
+    its part, item limit and the (question_id, answer) log so far. That log
+    is the shared state: one SQLite row per session, in WAL mode like the
+    embedding cache, so a request may land on any gunicorn worker. Each
+    worker keeps its most recently used sessions live (LRU of `cache_size`)
+    and rebuilds one by replaying the log when its copy is missing or
+    behind. Sessions idle for `ttl_seconds` are treated as gone and are
+    deleted whenever a new session starts.
+
+    Saves are compare-and-set on the number of answers, so two concurrent
+    answers to the same item cannot both be recorded. SQLite runs in a
+    worker thread, never on the event loop.
+    """
+
+    def __init__(
+        self,
+        bank: QuestionBank,
+        path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        cache_size: Optional[int] = None
+    ):
+        self.bank = bank
+        self.path = path or settings.EXAM_SESSION_PATH
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.EXAM_SESSION_TTL_SECONDS
+        self.cache_size = cache_size if cache_size is not None else settings.EXAM_SESSION_CACHE_SIZE
+
+        self._live: "OrderedDict[str, AdaptiveExamSession]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._conn_lock = threading.Lock()
+
+    def _db(self) -> sqlite3.Connection:
+        """Connection for this process (callers hold `_conn_lock`)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS exam_sessions ("
+                " session_id TEXT PRIMARY KEY,"
+                " exam_part INTEGER NOT NULL,"
+                " max_items INTEGER NOT NULL,"
+                " responses TEXT NOT NULL,"
+                " answered INTEGER NOT NULL,"
+                " updated_at REAL NOT NULL"
+                ")"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS exam_sessions_updated_at ON exam_sessions (updated_at)")
+            conn.commit()
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _execute(self, sql: str, params: Tuple[Any, ...]) -> Tuple[List[tuple], int]:
+        """(rows, rowcount) of one statement in its own transaction"""
+        with self._conn_lock:
+            db = self._db()
+            with db:
+                cursor = db.execute(sql, params)
+                return cursor.fetchall(), cursor.rowcount
+
+    def _remember(self, session: AdaptiveExamSession) -> None:
+        self._live[session.session_id] = session
+        self._live.move_to_end(session.session_id)
+        while len(self._live) > self.cache_size:
+            self._live.popitem(last=False)
+
+    def _replay(
+        self,
+        session_id: str,
+        exam_part: int,
+        max_items: int,
+        responses: List[List[Any]]
+    ) -> Optional[AdaptiveExamSession]:
+        session = AdaptiveExamSession(self.bank, exam_part, max_items=max_items)
+        session.session_id = session_id
+        try:
+            for question_id, answer in responses:
+                session.next_question()
+                session.record_response(question_id, answer)
+        except ValueError as e:
+            print(f"Exam session {session_id} could not be replayed: {e}")
+            return None
+        session.next_question()  # Serve the pending item again
+        return session
+
+    async def add(self, session: AdaptiveExamSession) -> None:
+        """Store a new session (no answers yet) and drop expired ones"""
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM exam_sessions WHERE updated_at < ?", (now - self.ttl_seconds,)
+        )
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO exam_sessions (session_id, exam_part, max_items, responses, answered, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (session.session_id, session.exam_part, session.max_items, "[]", 0, now)
+        )
+        self._remember(session)
+
+    async def get(self, session_id: str) -> Optional[AdaptiveExamSession]:
+        """The session as last saved by any worker, or None if unknown or expired"""
+        rows, _ = await asyncio.to_thread(
+            self._execute,
+            "SELECT exam_part, max_items, responses, answered FROM exam_sessions"
+            " WHERE session_id = ? AND updated_at >= ?",
+            (session_id, time.time() - self.ttl_seconds)
+        )
+        if not rows:
+            self._live.pop(session_id, None)
+            return None
+
+        exam_part, max_items, responses, answered = rows[0]
+        session = self._live.get(session_id)
+        if session is None or len(session.responses) != answered:
+            session = self._replay(session_id, exam_part, max_items, json.loads(responses))
+            if session is None:
+                self._live.pop(session_id, None)
+                return None
+        self._remember(session)
+        return session
+
+    async def save(self, session: AdaptiveExamSession, answered_before: int) -> bool:
+        """
+        Record the session's answers, unless another request has saved an
+        answer since it was loaded with `answered_before` answers
+
+        Returns:
+            False on such a conflict; the local copy is dropped so the next
+            `get` sees the saved state
+        """
+        responses = json.dumps([[r["question_id"], r["answer"]] for r in session.responses])
+        _, updated = await asyncio.to_thread(
+            self._execute,
+            "UPDATE exam_sessions SET responses = ?, answered = ?, updated_at = ?"
+            " WHERE session_id = ? AND answered = ?",
+            (responses, len(session.responses), time.time(), session.session_id, answered_before)
+        )
+        if updated != 1:
+            self._live.pop(session.session_id, None)
+            return False
+        return True
+
+    async def discard(self, session_id: str) -> None:
+        self._live.pop(session_id, None)
+        await asyncio.to_thread(self._execute, "DELETE FROM exam_sessions WHERE session_id = ?", (session_id,))
+
+    def close(self) -> None:
+        with self._conn_lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def __len__(self) -> int:
+        rows, _ = self._execute("SELECT COUNT(*) FROM exam_sessions", ())
+        return rows[0][0]
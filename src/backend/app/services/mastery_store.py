@@ -0,0 +1,276 @@
+"""
+Mastery Aggregate Store
+Streaming per-(user, topic) counters for weak-area ranking
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import date, datetime, timedelta
+from app.config import settings
+import numpy as np
+import uuid
+
+
+AttemptArgs = Tuple[str, str, bool, float, Optional[date]]
+
+
+def parse_attempt(attempt: Dict[str, Any]) -> AttemptArgs:
+    """
+    `question_attempts` row -> (user_id, topic, is_correct, time_spent_seconds, attempted_on)
+
+    Raises:
+        KeyError, TypeError, ValueError: malformed row
+    """
+    user_id, topic, is_correct = attempt["user_id"], attempt["question_topic"], attempt["is_correct"]
+    if not isinstance(user_id, str) or not isinstance(topic, str) or not isinstance(is_correct, bool):
+        raise TypeError("user_id and question_topic must be strings, is_correct a boolean")
+    time_spent = float(attempt.get("time_spent_seconds") or 0.0)
+    if time_spent < 0:
+        raise ValueError("time_spent_seconds must not be negative")
+    attempted_at = attempt.get("attempted_at")
+    attempted_on = datetime.fromisoformat(attempted_at).date() if attempted_at else None
+    return user_id, topic, is_correct, time_spent, attempted_on
+
+
+class MasteryStore:
+    """
+    In-memory mastery aggregates updated as attempts stream in
+
+    Each stat is a dense (users x topics) array; users and topics are
+    mapped to row/column indexes on first sight and arrays grow by
+    doubling. Weak-area queries only read one row, never raw attempts.
+
+    In the API the store is a per-worker view of the shared AttemptLog;
+    pass the log's id as `history_id` so equal versions on two workers
+    mean the same attempts were applied.
+    """
+
+    def __init__(
+        self,
+        decay_alpha: Optional[float] = None,
+        min_attempts: Optional[int] = None,
+        initial_users: int = 1024,
+        initial_topics: int = 32,
+        history_id: Optional[str] = None
+    ):
+        self.decay_alpha = decay_alpha if decay_alpha is not None else settings.MASTERY_DECAY_ALPHA
+        self.min_attempts = min_attempts if min_attempts is not None else settings.WEAK_AREA_MIN_ATTEMPTS
+
+        self._user_index: Dict[str, int] = {}
+        self._topic_index: Dict[str, int] = {}
+        self._topics: List[str] = []
+
+        shape = (initial_users, initial_topics)
+        self.attempts = np.zeros(shape, dtype=np.int32)
+        self.correct = np.zeros(shape, dtype=np.int32)
+        self.time_spent = np.zeros(shape, dtype=np.float32)  # seconds
+        self.decayed_accuracy = np.zeros(shape, dtype=np.float32)
+
+        # Per-user scalars: attempt counter (dashboard ETags) and study streak.
+        # Counters only compare within one attempt history, so ETags also carry its id
+        self.instance_id = history_id or uuid.uuid4().hex
+        self._versions: Dict[str, int] = {}
+        self._streaks: Dict[str, Tuple[date, int]] = {}  # user -> (last active day, streak days)
+
+    # ------------------------------------------------------------------
+    # Index management
+    # ------------------------------------------------------------------
+
+    def _grow(self, rows: int, cols: int) -> None:
+        old_rows, old_cols = self.attempts.shape
+        new_rows = old_rows
+        while new_rows < rows:
+            new_rows *= 2
+        new_cols = old_cols
+        while new_cols < cols:
+            new_cols *= 2
+        if (new_rows, new_cols) == (old_rows, old_cols):
+            return
+
+        for name in ("attempts", "correct", "time_spent", "decayed_accuracy"):
+            old = getattr(self, name)
+            new = np.zeros((new_rows, new_cols), dtype=old.dtype)
+            new[:old_rows, :old_cols] = old
+            setattr(self, name, new)
+
+    def _user_row(self, user_id: str) -> int:
+        row = self._user_index.get(user_id)
+        if row is None:
+            row = len(self._user_index)
+            self._user_index[user_id] = row
+            self._grow(row + 1, self.attempts.shape[1])
+        return row
+
+    def _topic_col(self, topic: str) -> int:
+        col = self._topic_index.get(topic)
+        if col is None:
+            col = len(self._topics)
+            self._topic_index[topic] = col
+            self._topics.append(topic)
+            self._grow(self.attempts.shape[0], col + 1)
+        return col
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def record_attempt(
+        self,
+        user_id: str,
+        topic: str,
+        is_correct: bool,
+        time_spent_seconds: float = 0.0,
+        attempted_on: Optional[date] = None
+    ) -> None:
+        """Fold one question attempt into the aggregates"""
+        outcome = 1.0 if is_correct else 0.0
+        time_spent_seconds = float(time_spent_seconds)
+        day = attempted_on or date.today()
+
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+        self._update_streak(user_id, day)
+
+        row = self._user_row(user_id)
+        col = self._topic_col(topic)
+
+        if self.attempts[row, col] == 0:
+            self.decayed_accuracy[row, col] = outcome
+        else:
+            self.decayed_accuracy[row, col] += self.decay_alpha * (
+                outcome - self.decayed_accuracy[row, col]
+            )
+
+        self.attempts[row, col] += 1
+        self.correct[row, col] += int(outcome)
+        self.time_spent[row, col] += time_spent_seconds
+
+    def _update_streak(self, user_id: str, day: date) -> None:
+        last_day, streak = self._streaks.get(user_id, (None, 0))
+        if last_day is not None and day <= last_day:
+            return  # Same day, or a late-arriving older attempt
+        streak = streak + 1 if last_day == day - timedelta(days=1) else 1
+        self._streaks[user_id] = (day, streak)
+
+    def record_attempts(self, attempts: List[Dict[str, Any]]) -> int:
+        """
+        Bulk ingest rows shaped like `question_attempts`
+        (user_id, question_topic, is_correct, time_spent_seconds, attempted_at)
+
+        Every row is parsed before any is applied, so a malformed row
+        rejects the whole batch and leaves the aggregates untouched.
+        """
+        rows = [parse_attempt(attempt) for attempt in attempts]
+        for row in rows:
+            self.record_attempt(*row)
+        return len(rows)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _confidence(self, attempts: np.ndarray) -> np.ndarray:
+        """How much to trust a proficiency estimate; approaches 1.0 with more attempts"""
+        return attempts / (attempts + self.min_attempts * 2.0)
+
+    def weak_areas(self, user_id: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        The k weakest topics for a user, weakest first
+
+        Only topics with at least `min_attempts` attempts are ranked.
+        """
+        row = self._user_index.get(user_id)
+        if row is None or k <= 0:
+            return []
+
+        n_topics = len(self._topics)
+        attempts = self.attempts[row, :n_topics]
+        eligible = np.flatnonzero(attempts >= self.min_attempts)
+        if eligible.size == 0:
+            return []
+
+        proficiency = self.decayed_accuracy[row, eligible]
+        if eligible.size > k:
+            top = np.argpartition(proficiency, k)[:k]
+        else:
+            top = np.arange(eligible.size)
+        top = top[np.argsort(proficiency[top], kind="stable")]
+
+        cols = eligible[top]
+        confidence = self._confidence(attempts[cols].astype(np.float32))
+
+        return [
+            {
+                "topic": self._topics[col],
+                "proficiency": round(float(self.decayed_accuracy[row, col]), 3),
+                "confidence": round(float(conf), 3),
+                "attempts": int(self.attempts[row, col]),
+                "accuracy": round(float(self.correct[row, col]) / float(self.attempts[row, col]), 3),
+                "avg_time_seconds": round(
+                    float(self.time_spent[row, col]) / float(self.attempts[row, col]), 1
+                ),
+            }
+            for col, conf in zip(cols, confidence)
+        ]
+
+    def weak_area_names(self, user_id: str, k: int = 3) -> List[str]:
+        """Topic names only, for routing, prompts and missions"""
+        return [area["topic"] for area in self.weak_areas(user_id, k)]
+
+    def topic_stats(self, user_id: str, topic: str) -> Optional[Dict[str, Any]]:
+        """Raw counters for one (user, topic) pair"""
+        row = self._user_index.get(user_id)
+        col = self._topic_index.get(topic)
+        if row is None or col is None or self.attempts[row, col] == 0:
+            return None
+
+        return {
+            "attempts": int(self.attempts[row, col]),
+            "correct": int(self.correct[row, col]),
+            "time_spent_seconds": float(self.time_spent[row, col]),
+            "decayed_accuracy": float(self.decayed_accuracy[row, col]),
+        }
+
+    def user_topics(self, user_id: str) -> Dict[str, Dict[str, Any]]:
+        """Counters for every topic the user has attempted"""
+        row = self._user_index.get(user_id)
+        if row is None:
+            return {}
+
+        n_topics = len(self._topics)
+        attempts = self.attempts[row, :n_topics]
+        return {
+            self._topics[col]: {
+                "attempts": int(attempts[col]),
+                "correct": int(self.correct[row, col]),
+                "time_spent_seconds": float(self.time_spent[row, col]),
+                "proficiency": round(float(self.decayed_accuracy[row, col]), 3),
+                "confidence": round(float(self._confidence(np.float32(attempts[col]))), 3),
+            }
+            for col in np.flatnonzero(attempts)
+        }
+
+    def streak_days(self, user_id: str, today: Optional[date] = None) -> int:
+        """Consecutive study days, still alive if the user studied today or yesterday"""
+        last_day, streak = self._streaks.get(user_id, (None, 0))
+        today = today or date.today()
+        if last_day is None or last_day < today - timedelta(days=1):
+            return 0
+        return streak
+
+    def last_active(self, user_id: str) -> Optional[date]:
+        last_day, _ = self._streaks.get(user_id, (None, 0))
+        return last_day
+
+    def version(self, user_id: str) -> int:
+        """Attempts recorded for the user; changes whenever their aggregates do"""
+        return self._versions.get(user_id, 0)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Store size metrics"""
+        return {
+            "users": len(self._user_index),
+            "topics": len(self._topics),
+            "memory_bytes": int(
+                self.attempts.nbytes + self.correct.nbytes
+                + self.time_spent.nbytes + self.decayed_accuracy.nbytes
+            ),
+        }
@@ -0,0 +1,419 @@
+"""
+Mission Generator Service
+Precomputes daily missions for every active user in a nightly batch
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from app.config import settings
+import asyncio
+import json
+import os
+import time
+import uuid
+
+
+# Stable namespace so re-running a night produces the same mission ids (idempotent upserts)
+MISSION_NAMESPACE = uuid.UUID("6f1c2a52-3d1e-4c55-9a59-3b7f0d7e2a10")
+
+# Streak multiplier stops compounding after this many days
+STREAK_BONUS_CAP_DAYS = 7
+
+
+def _mission_id(user_id: str, assigned_date: str, slot: int) -> str:
+    """Deterministic mission id for (user, day, slot)"""
+    return str(uuid.uuid5(MISSION_NAMESPACE, f"{user_id}:{assigned_date}:{slot}"))
+
+
+def xp_reward(base: int, streak_days: int, xp_base: int, xp_multiplier: float) -> int:
+    """Scale a template's XP by the user's streak (capped)"""
+    streak_bonus = xp_multiplier ** min(streak_days, STREAK_BONUS_CAP_DAYS)
+    return int(round(base * (xp_base / 100) * streak_bonus))
+
+
+def _weak_area_mission(user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    weak_areas = user.get("weak_areas") or []
+    if not weak_areas:
+        return None
+
+    topic = weak_areas[0]
+    return {
+        "mission_type": "sprint_mode",
+        "title": f"Master {topic}",
+        "description": f"Complete 15 targeted practice questions on {topic}.",
+        "target_topic": topic,
+        "difficulty": "medium",
+        "estimated_minutes": 20,
+        "target_questions": 15,
+        "base_xp": 300,
+        "icon": "target",
+        "generated_reason": f"{topic} is currently your weakest area.",
+    }
+
+
+def _review_mission(user: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    due_reviews = user.get("due_reviews") or []
+    if not due_reviews:
+        return None
+
+    topics = due_reviews[:3]
+    return {
+        "mission_type": "spaced_review",
+        "title": "Spaced Repetition Review",
+        "description": f"Review {len(due_reviews)} due topic(s): {', '.join(topics)}.",
+        "target_topic": topics[0],
+        "difficulty": "easy",
+        "estimated_minutes": 10,
+        "target_questions": min(5 * len(due_reviews), 20),
+        "base_xp": 200,
+        "icon": "book",
+        "generated_reason": "These topics are due for review based on your SM-2 schedule.",
+    }
+
+
+def _readiness_mission(user: Dict[str, Any]) -> Dict[str, Any]:
+    ready_score = user.get("ready_score")
+    if ready_score is None:
+        ready_score = settings.READY_SCORE_MIN
+    exam_part = user.get("exam_part")
+
+    if ready_score < 90:
+        return {
+            "mission_type": "concept_review",
+            "title": "Foundational Concepts Review",
+            "description": "Strengthen basics with beginner-level content to build confidence.",
+            "target_topic": None,
+            "difficulty": "easy",
+            "estimated_minutes": 20,
+            "target_questions": 10,
+            "base_xp": 200,
+            "icon": "book",
+            "generated_reason": f"ReadyScore of {ready_score} indicates gaps in fundamentals.",
+        }
+    if ready_score < settings.READY_SCORE_TARGET:
+        return {
+            "mission_type": "sprint_mode",
+            "title": "Intermediate Problem Solving",
+            "description": "Tackle multi-step problems combining 2-3 tax concepts.",
+            "target_topic": None,
+            "difficulty": "medium",
+            "estimated_minutes": 25,
+            "target_questions": 10,
+            "base_xp": 250,
+            "icon": "calculator",
+            "generated_reason": f"ReadyScore of {ready_score} shows you're ready for intermediate challenges.",
+        }
+    return {
+        "mission_type": "exam_simulation",
+        "title": "Exam-Level Simulation",
+        "description": (
+            f"Practice Part {exam_part} with Prometric-style questions at exam difficulty."
+            if exam_part else
+            "Practice with Prometric-style questions at exam difficulty."
+        ),
+        "target_topic": None,
+        "difficulty": "hard",
+        "estimated_minutes": 45,
+        "target_questions": 25,
+        "base_xp": 350,
+        "icon": "target",
+        "generated_reason": f"ReadyScore of {ready_score} is exam-ready; full simulations keep you sharp.",
+    }
+
+
+def _streak_mission(user: Dict[str, Any]) -> Dict[str, Any]:
+    streak = user.get("study_streak_days") or 0
+
+    if streak >= 7:
+        return {
+            "mission_type": "streak",
+            "title": "Momentum Builder",
+            "description": f"{streak}-day streak! Quick 5-min review to keep it alive.",
+            "target_topic": None,
+            "difficulty": "easy",
+            "estimated_minutes": 5,
+            "target_questions": 5,
+            "base_xp": 150,
+            "icon": "trending",
+            "generated_reason": f"A low-effort mission to protect your {streak}-day streak.",
+        }
+    return {
+        "mission_type": "streak",
+        "title": "Consistency Challenge",
+        "description": "Complete 30 minutes today to build your study habit.",
+        "target_topic": None,
+        "difficulty": "easy",
+        "estimated_minutes": 30,
+        "target_questions": 10,
+        "base_xp": 200,
+        "icon": "trending",
+        "generated_reason": "Daily practice builds the habit that carries you through all three parts.",
+    }
+
+
+# Templates in priority order; the first MISSIONS_PER_DAY that apply are used
+MISSION_TEMPLATES: List[Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]] = [
+    _weak_area_mission,
+    _review_mission,
+    _readiness_mission,
+    _streak_mission,
+]
+
+
+def build_missions(
+    user: Dict[str, Any],
+    assigned_date: date,
+    missions_per_day: Optional[int] = None,
+    xp_base: Optional[int] = None,
+    xp_multiplier: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build one user's missions from deterministic templates
+
+    Args:
+        user: Snapshot with user_id, ready_score, exam_part, weak_areas,
+              due_reviews and study_streak_days
+        assigned_date: Day the missions are for
+
+    Returns:
+        Rows matching the `daily_missions` schema
+    """
+    missions_per_day = missions_per_day if missions_per_day is not None else settings.MISSIONS_PER_DAY
+    xp_base = xp_base if xp_base is not None else settings.XP_BASE_REWARD
+    xp_multiplier = xp_multiplier if xp_multiplier is not None else settings.XP_MULTIPLIER_STREAK
+
+    user_id = user["user_id"]
+    day = assigned_date.isoformat()
+    expires_at = (assigned_date + timedelta(days=1)).isoformat()
+    streak = user.get("study_streak_days") or 0
+
+    missions = []
+    for template in MISSION_TEMPLATES:
+        if len(missions) >= missions_per_day:
+            break
+
+        mission = template(user)
+        if mission is None:
+            continue
+
+        slot = len(missions)
+        base_xp = mission.pop("base_xp")
+        mission.update({
+            "id": _mission_id(user_id, day, slot),
+            "user_id": user_id,
+            "xp_reward": xp_reward(base_xp, streak, xp_base, xp_multiplier),
+            "status": "pending",
+            "assigned_date": day,
+            "expires_at": expires_at,
+        })
+        missions.append(mission)
+
+    return missions
+
+
+def _build_chunk(
+    args: Tuple[List[Dict[str, Any]], str, int, int, float]
+) -> List[Dict[str, Any]]:
+    """Process-pool entry point: build missions for a chunk of users"""
+    users, day, missions_per_day, xp_base, xp_multiplier = args
+    assigned_date = date.fromisoformat(day)
+
+    rows = []
+    for user in users:
+        rows.extend(
+            build_missions(user, assigned_date, missions_per_day, xp_base, xp_multiplier)
+        )
+    return rows
+
+
+def _chunked(items: Iterable[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def generate_missions_batch(
+    users: Iterable[Dict[str, Any]],
+    assigned_date: date,
+    write_rows: Callable[[List[Dict[str, Any]]], None],
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate missions for all users across a process pool
+
+    Users are split into chunks, each chunk is built in a worker process,
+    and finished chunks are handed to `write_rows` for bulk writes as they
+    complete.
+
+    Returns:
+        Throughput report
+    """
+    workers = workers if workers is not None else settings.MISSION_BATCH_WORKERS
+    chunk_size = chunk_size if chunk_size is not None else settings.MISSION_BATCH_CHUNK_SIZE
+    day = assigned_date.isoformat()
+
+    start_time = time.time()
+    total_users = 0
+    total_missions = 0
+    total_chunks = 0
+    write_seconds = 0.0
+
+    def _jobs():
+        nonlocal total_users
+        for chunk in _chunked(users, chunk_size):
+            total_users += len(chunk)
+            yield (
+                chunk,
+                day,
+                settings.MISSIONS_PER_DAY,
+                settings.XP_BASE_REWARD,
+                settings.XP_MULTIPLIER_STREAK,
+            )
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for rows in pool.map(_build_chunk, _jobs()):
+            write_start = time.time()
+            write_rows(rows)
+            write_seconds += time.time() - write_start
+
+            total_missions += len(rows)
+            total_chunks += 1
+
+    elapsed = time.time() - start_time
+
+    return {
+        "assigned_date": day,
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "chunks": total_chunks,
+        "users": total_users,
+        "missions": total_missions,
+        "elapsed_seconds": round(elapsed, 3),
+        "write_seconds": round(write_seconds, 3),
+        "users_per_second": round(total_users / elapsed, 1) if elapsed > 0 else 0.0,
+        "missions_per_second": round(total_missions / elapsed, 1) if elapsed > 0 else 0.0,
+    }
+
+
+class MissionStore:
+    """
+    Request-time mission lookup keyed by (user_id, assigned_date)
+
+    Loaded from the nightly batch output at `path`. `refresh` reloads it
+    whenever the file changes (mtime or size) or the day rolls over, so a
+    long-running worker picks up each night's batch without a restart;
+    days before today are dropped on reload.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.DAILY_MISSIONS_PATH
+        self._missions: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}  # key -> mission id -> row
+        self._versions: Dict[str, int] = {}
+        self._loaded: Optional[Tuple[Tuple[int, int], str]] = None  # (file stamp, day) of the last load
+        self._reload_lock = asyncio.Lock()
+
+    def put_rows(self, rows: List[Dict[str, Any]]) -> None:
+        """
+        Bulk upsert mission rows by id within each (user_id, assigned_date)
+
+        Reloading the same batch output is a no-op, so it doesn't bump versions.
+        """
+        for row in rows:
+            missions = self._missions.setdefault((row["user_id"], row["assigned_date"]), {})
+            if missions.get(row["id"]) == row:
+                continue
+            missions[row["id"]] = row
+            self._versions[row["user_id"]] = self._versions.get(row["user_id"], 0) + 1
+
+    def version(self, user_id: str) -> int:
+        """Mission rows written for the user; changes whenever their missions do"""
+        return self._versions.get(user_id, 0)
+
+    def get(self, user_id: str, assigned_date: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Missions for a user on a day (today by default)"""
+        day = (assigned_date or date.today()).isoformat()
+        return list(self._missions.get((user_id, day), {}).values())
+
+    @staticmethod
+    def read_jsonl(path: str) -> List[Dict[str, Any]]:
+        """Rows of a batch output file"""
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def load_jsonl(self, path: str) -> int:
+        """Load batch output; returns number of rows loaded"""
+        rows = self.read_jsonl(path)
+        self.put_rows(rows)
+        return len(rows)
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def refresh(self, today: Optional[date] = None) -> int:
+        """
+        Reload `path` if it changed or the day rolled over since the last load
+
+        The file is read in a worker thread. Returns rows loaded (0 when
+        already current or when there is no file yet).
+        """
+        day = (today or date.today()).isoformat()
+        if self._loaded == (self._stamp(), day):
+            return 0
+        async with self._reload_lock:
+            stamp = self._stamp()
+            if stamp is None or self._loaded == (stamp, day):
+                return 0
+            rows = await asyncio.to_thread(self.read_jsonl, self.path)
+            for key in [key for key in self._missions if key[1] < day]:
+                del self._missions[key]
+            self.put_rows(rows)
+            self._loaded = (stamp, day)
+            return len(rows)
+
+    def __len__(self) -> int:
+        return len(self._missions)
+
+
+async def add_flavor_text(
+    missions: List[Dict[str, Any]],
+    agent,
+    max_concurrency: int = 8
+) -> int:
+    """
+    Optionally rewrite mission descriptions with an LLM
+
+    Templates stay the source of truth; a failed call keeps the template text.
+    Returns the number of missions that were flavored.
+    """
+    import asyncio
+    from app.agents.llm_scheduler import llm_priority, PRIORITY_BATCH
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    flavored = 0
+
+    async def _flavor(mission: Dict[str, Any]) -> None:
+        nonlocal flavored
+        async with semaphore:
+            try:
+                result = await agent.process(mission["description"], {"mission": mission})
+            except Exception as e:
+                print(f"Mission flavor text failed for {mission['id']}: {e}")
+                return
+        if result.get("content"):
+            mission["description"] = result["content"].strip()
+            flavored += 1
+
+    with llm_priority(PRIORITY_BATCH):
+        await asyncio.gather(*(_flavor(m) for m in missions))
+    return flavored
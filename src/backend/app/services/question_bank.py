@@ -0,0 +1,153 @@
+"""
+Question Bank
+Indexed store of practice questions bucketed by exam part, topic and difficulty
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+from app.config import EXAM_PARTS
+import json
+import numpy as np
+
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+# Default IRT difficulty (b, logit scale) when an item has not been calibrated
+DEFAULT_IRT_DIFFICULTY = {"easy": -1.0, "medium": 0.0, "hard": 1.0}
+DEFAULT_IRT_DISCRIMINATION = 1.0
+DEFAULT_IRT_GUESSING = 0.25  # Four answer choices
+
+
+class QuestionBank:
+    """
+    Read-mostly question store
+
+    Questions live in one list; buckets hold integer positions into it so
+    lookups by (part, topic, difficulty) never scan the bank. Per-part IRT
+    parameter arrays are built lazily for vectorized adaptive selection.
+    """
+
+    def __init__(self, questions: Optional[Iterable[Dict[str, Any]]] = None):
+        self.questions: List[Dict[str, Any]] = []
+        self._by_id: Dict[str, int] = {}
+        self._buckets: Dict[Tuple[int, str, str], List[int]] = {}
+        self._part_arrays: Dict[int, Dict[str, np.ndarray]] = {}
+
+        if questions:
+            self.add_many(questions)
+
+    @staticmethod
+    def _exam_part_for_topic(topic: str) -> Optional[int]:
+        for part, config in EXAM_PARTS.items():
+            if topic in config["topics"]:
+                return part
+        return None
+
+    def add(self, question: Dict[str, Any]) -> Optional[int]:
+        """
+        Add one question; returns its position or None if it was rejected
+        (duplicate id, missing topic or unknown exam part)
+        """
+        question_id = question.get("id")
+        if question_id is not None and question_id in self._by_id:
+            return None
+
+        topic = question.get("topic")
+        if not topic:
+            return None
+
+        exam_part = question.get("exam_part") or self._exam_part_for_topic(topic)
+        if exam_part not in EXAM_PARTS:
+            return None
+
+        difficulty = question.get("difficulty", "medium")
+        if difficulty not in DIFFICULTIES:
+            difficulty = "medium"
+
+        position = len(self.questions)
+        if question_id is None:
+            question_id = f"q{position}"
+
+        question = dict(question, id=question_id, exam_part=exam_part, difficulty=difficulty)
+        self.questions.append(question)
+        self._by_id[question_id] = position
+        self._buckets.setdefault((exam_part, topic, difficulty), []).append(position)
+        self._part_arrays.pop(exam_part, None)  # Rebuilt on next adaptive read
+
+        return position
+
+    def add_many(self, questions: Iterable[Dict[str, Any]]) -> int:
+        """Bulk add; returns number of questions accepted"""
+        return sum(1 for q in questions if self.add(q) is not None)
+
+    @classmethod
+    def load_jsonl(cls, path: str) -> "QuestionBank":
+        """Load a bank from a JSONL file (one question per line)"""
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    def get(self, question_id: str) -> Optional[Dict[str, Any]]:
+        position = self._by_id.get(question_id)
+        return self.questions[position] if position is not None else None
+
+    def bucket(self, exam_part: int, topic: str, difficulty: str) -> List[int]:
+        """Positions of questions in one bucket"""
+        return self._buckets.get((exam_part, topic, difficulty), [])
+
+    def topics(self, exam_part: int) -> List[str]:
+        """Topics with at least one question in a part, blueprint topics first"""
+        present = {topic for (part, topic, _) in self._buckets if part == exam_part}
+        blueprint = [t for t in EXAM_PARTS[exam_part]["topics"] if t in present]
+        extra = sorted(present - set(blueprint))
+        return blueprint + extra
+
+    def part_positions(self, exam_part: int) -> List[int]:
+        """All question positions in a part"""
+        return [
+            position
+            for (part, _, _), positions in self._buckets.items() if part == exam_part
+            for position in positions
+        ]
+
+    def part_arrays(self, exam_part: int) -> Dict[str, np.ndarray]:
+        """
+        IRT parameter arrays for every item in a part (3PL: a, b, c),
+        plus each item's index into `topics(exam_part)`. Cached until the
+        part changes
+        """
+        arrays = self._part_arrays.get(exam_part)
+        if arrays is not None:
+            return arrays
+
+        positions = np.array(self.part_positions(exam_part), dtype=np.int64)
+        items = [self.questions[p] for p in positions]
+        topic_ids = {topic: i for i, topic in enumerate(self.topics(exam_part))}
+        arrays = {
+            "positions": positions,
+            "topic_ids": np.array([topic_ids[q["topic"]] for q in items], dtype=np.int32),
+            "a": np.array(
+                [q.get("irt_discrimination", DEFAULT_IRT_DISCRIMINATION) for q in items],
+                dtype=np.float64
+            ),
+            "b": np.array(
+                [q.get("irt_difficulty", DEFAULT_IRT_DIFFICULTY[q["difficulty"]]) for q in items],
+                dtype=np.float64
+            ),
+            "c": np.array(
+                [q.get("irt_guessing", DEFAULT_IRT_GUESSING) for q in items],
+                dtype=np.float64
+            ),
+        }
+        self._part_arrays[exam_part] = arrays
+        return arrays
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "questions": len(self.questions),
+            "buckets": len(self._buckets),
+            "by_part": {
+                part: len(self.part_positions(part)) for part in EXAM_PARTS
+            },
+        }
+
+    def __len__(self) -> int:
+        return len(self.questions)
@@ -0,0 +1,156 @@
+"""
+Question Deduplication
+MinHash signatures with LSH banding for near-duplicate practice questions
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from app.config import settings
+import hashlib
+import re
+import numpy as np
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+_WORD_RE = re.compile(r"[a-z0-9#$%]+")
+_NUMBER_RE = re.compile(r"\d[\d,]*(\.\d+)?")
+
+
+def question_text(question: Dict[str, Any]) -> str:
+    """Text that identifies a question: stem plus answer options"""
+    options = question.get("options") or []
+    return " ".join([question.get("question", "")] + [str(o) for o in options])
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """
+    Word n-gram shingles
+
+    Numbers are collapsed to '#' so the same scenario with different
+    dollar amounts still counts as a repeat.
+    """
+    words = _WORD_RE.findall(_NUMBER_RE.sub("#", text.lower()))
+    if len(words) < size:
+        return [" ".join(words)] if words else []
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+class MinHasher:
+    """Vectorized MinHash over 32-bit shingle hashes"""
+
+    def __init__(self, num_perm: Optional[int] = None, seed: int = 1):
+        num_perm = num_perm if num_perm is not None else settings.DEDUP_NUM_PERM
+        self.num_perm = num_perm
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+        self._b = rng.randint(0, np.iinfo(np.int64).max, size=num_perm, dtype=np.int64).astype(np.uint64) % _MERSENNE_PRIME
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature (uint32, length num_perm)"""
+        grams = shingles(text)
+        if not grams:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+
+        hashes = np.fromiter(
+            (
+                int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=4).digest(), "little")
+                for g in set(grams)
+            ),
+            dtype=np.uint64
+        )
+        # (a * x + b) mod p, one row per shingle; uint64 overflow wraps like datasketch
+        with np.errstate(over="ignore"):
+            permuted = ((hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME) & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures
+
+    Signatures are split into `bands` bands; items sharing any band bucket
+    become candidates, and candidates are confirmed by estimated Jaccard
+    similarity. Insert and lookup touch only the matching buckets.
+    """
+
+    def __init__(
+        self,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None,
+        threshold: Optional[float] = None
+    ):
+        num_perm = num_perm if num_perm is not None else settings.DEDUP_NUM_PERM
+        bands = bands if bands is not None else settings.DEDUP_BANDS
+        threshold = threshold if threshold is not None else settings.DEDUP_THRESHOLD
+
+        if num_perm % bands != 0:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+
+        self._tables: List[Dict[bytes, List[str]]] = [{} for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[i * self.rows:(i + 1) * self.rows].tobytes()
+            for i in range(self.bands)
+        ]
+
+    def query_signature(self, signature: np.ndarray) -> List[Tuple[str, float]]:
+        """Existing items similar to a signature, most similar first"""
+        candidates = set()
+        for table, key in zip(self._tables, self._band_keys(signature)):
+            candidates.update(table.get(key, ()))
+
+        matches = []
+        for item_id in candidates:
+            similarity = float(np.mean(self._signatures[item_id] == signature))
+            if similarity >= self.threshold:
+                matches.append((item_id, round(similarity, 3)))
+
+        matches.sort(key=lambda m: m[1], reverse=True)
+        return matches
+
+    def find_duplicates(self, question: Dict[str, Any]) -> List[Tuple[str, float]]:
+        """Indexed questions that are near-duplicates of `question`"""
+        return self.query_signature(self.hasher.signature(question_text(question)))
+
+    def insert_signature(self, item_id: str, signature: np.ndarray) -> None:
+        if item_id in self._signatures:
+            return
+        self._signatures[item_id] = signature
+        for table, key in zip(self._tables, self._band_keys(signature)):
+            table.setdefault(key, []).append(item_id)
+
+    def insert(self, item_id: str, question: Dict[str, Any]) -> None:
+        self.insert_signature(item_id, self.hasher.signature(question_text(question)))
+
+    def check_and_insert(self, item_id: str, question: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+        """
+        Insert a question unless it duplicates an indexed one
+
+        Returns:
+            (duplicate_id, similarity) of the closest match, or None if inserted
+        """
+        signature = self.hasher.signature(question_text(question))
+        matches = self.query_signature(signature)
+        if matches:
+            return matches[0]
+        self.insert_signature(item_id, signature)
+        return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "indexed": len(self._signatures),
+            "bands": self.bands,
+            "rows_per_band": self.rows,
+            "threshold": self.threshold,
+        }
+
+    def __len__(self) -> int:
+        return len(self._signatures)
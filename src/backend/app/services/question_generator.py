@@ -0,0 +1,391 @@
+"""
+Bulk Question Generation
+Offline, checkpointed generation of the practice question bank
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+from app.config import settings, EXAM_PARTS
+from app.agents.llm_scheduler import llm_priority, PRIORITY_BATCH
+from app.schemas.questions import PracticeQuestion
+from app.services.question_bank import DIFFICULTIES
+from pydantic import ValidationError
+import asyncio
+import json
+import os
+import random
+import re
+import time
+import uuid
+
+
+Quota = Dict[Tuple[str, str], int]  # (topic, difficulty) -> questions wanted
+
+_TOPIC_PARTS = {
+    topic: part
+    for part, config in EXAM_PARTS.items()
+    for topic in config["topics"]
+}
+
+
+def plan_quotas(
+    per_topic: int,
+    exam_parts: Optional[Iterable[int]] = None,
+    difficulties: Iterable[str] = DIFFICULTIES,
+    overrides: Optional[Dict[str, int]] = None
+) -> Quota:
+    """
+    Split each topic's quota evenly across difficulties
+
+    Args:
+        per_topic: Questions per blueprint topic
+        exam_parts: Parts to cover (default all)
+        overrides: topic -> questions, replacing `per_topic` for that topic
+    """
+    difficulties = list(difficulties)
+    overrides = overrides or {}
+    quotas: Quota = {}
+
+    for part in exam_parts or EXAM_PARTS.keys():
+        for topic in EXAM_PARTS[part]["topics"]:
+            total = overrides.get(topic, per_topic)
+            share, extra = divmod(total, len(difficulties))
+            for i, difficulty in enumerate(difficulties):
+                count = share + (1 if i < extra else 0)
+                if count:
+                    quotas[(topic, difficulty)] = count
+
+    return quotas
+
+
+def validate_question(question: Dict[str, Any]) -> Optional[str]:
+    """
+    Check a generated question before it goes into the bank
+
+    Returns:
+        None if valid, otherwise the reason it was rejected
+    """
+    try:
+        item = PracticeQuestion.model_validate(question)
+    except ValidationError as e:
+        return f"schema: {e.errors()[0]['loc']} {e.errors()[0]['msg']}"
+
+    if not item.question.strip():
+        return "empty question"
+    if len(item.options) != 4:
+        return f"expected 4 options, got {len(item.options)}"
+    if item.correct_answer is None or not 0 <= item.correct_answer < len(item.options):
+        return f"correct_answer out of range: {item.correct_answer}"
+    if not item.explanation.strip():
+        return "missing explanation"
+    if item.topic not in _TOPIC_PARTS or item.difficulty not in DIFFICULTIES:
+        return f"unknown topic/difficulty: {item.topic}/{item.difficulty}"
+    return None
+
+
+def read_progress(
+    output_path: str,
+    repair: bool = False
+) -> Tuple[Dict[Tuple[str, str], int], List[Dict[str, Any]]]:
+    """
+    Questions already written by an earlier (possibly interrupted) run
+
+    The output file is the source of truth for resume. Reading stops at a
+    torn last line from a crash mid-write; with `repair` it is truncated away.
+
+    Returns:
+        ((topic, difficulty) -> count, questions)
+    """
+    counts: Dict[Tuple[str, str], int] = {}
+    questions: List[Dict[str, Any]] = []
+    if not os.path.exists(output_path):
+        return counts, questions
+
+    good_bytes = 0
+    with open(output_path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                question = json.loads(line)
+            except ValueError:
+                break
+            good_bytes += len(line)
+            key = (question.get("topic"), question.get("difficulty"))
+            counts[key] = counts.get(key, 0) + 1
+            questions.append(question)
+
+    if repair and good_bytes != os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(good_bytes)
+
+    return counts, questions
+
+
+class Checkpoint:
+    """Cumulative run counters persisted next to the output file"""
+
+    FIELDS = ("generated", "invalid", "duplicates", "errors", "tokens", "cost", "elapsed_seconds")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state: Dict[str, float] = {field: 0 for field in self.FIELDS}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.state.update(json.load(f))
+
+    def save(self) -> None:
+        """Atomic write so a crash never leaves a half-written checkpoint"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+
+def _interleave(remaining: Quota) -> List[Tuple[str, str]]:
+    """Round-robin job order, so an interrupted run still covers every topic"""
+    jobs = []
+    pending = dict(remaining)
+    while pending:
+        for key in list(pending):
+            jobs.append(key)
+            pending[key] -= 1
+            if not pending[key]:
+                del pending[key]
+    return jobs
+
+
+async def generate_question_bank(
+    agent: Any,
+    quotas: Quota,
+    output_path: str,
+    concurrency: Optional[int] = None,
+    max_attempts: Optional[int] = None,
+    checkpoint_every: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Fill `quotas` with generated questions, appending to `output_path`
+
+    Up to `concurrency` generation calls run at once. Each accepted
+    question is written (and flushed) as one JSONL line as soon as it
+    validates; counters are checkpointed every `checkpoint_every` questions
+    and on exit, so a rerun after a crash only generates what is missing.
+
+    Every attempt is one LLM call: the agent's own duplicate retries are
+    turned off, and a duplicate, invalid or failed question uses up one of
+    the slot's `max_attempts`. A slot therefore costs at most
+    `max_attempts` calls.
+
+    Args:
+        agent: TaxSpecialistAgent (or anything with `generate_practice_question`,
+               `remember_question` and `total_calls` / `total_tokens` /
+               `total_cost` counters)
+
+    Returns:
+        Throughput and cost report, cumulative across resumed runs
+    """
+    concurrency = concurrency if concurrency is not None else settings.QUESTION_GEN_CONCURRENCY
+    max_attempts = max_attempts if max_attempts is not None else settings.QUESTION_GEN_MAX_ATTEMPTS
+    checkpoint_every = checkpoint_every if checkpoint_every is not None else settings.QUESTION_GEN_CHECKPOINT_EVERY
+
+    done, _ = read_progress(output_path, repair=True)
+    remaining = {
+        key: wanted - done.get(key, 0)
+        for key, wanted in quotas.items()
+        if wanted > done.get(key, 0)
+    }
+    jobs = _interleave(remaining)
+    next_job = 0
+
+    checkpoint = Checkpoint(f"{output_path}.checkpoint.json")
+    state = checkpoint.state
+    run = {"generated": 0, "invalid": 0, "duplicates": 0, "errors": 0, "unfilled": 0}
+    rejections: Dict[str, int] = {}
+
+    start_time = time.time()
+    start_calls, start_tokens, start_cost = agent.total_calls, agent.total_tokens, agent.total_cost
+
+    # What this run has already added to the checkpoint
+    saved = {field: 0 for field in run}
+    saved.update(tokens=start_tokens, cost=start_cost, time=start_time)
+
+    def _save_checkpoint():
+        for field in ("generated", "invalid", "duplicates", "errors"):
+            state[field] += run[field] - saved[field]
+            saved[field] = run[field]
+        now = time.time()
+        state["tokens"] += agent.total_tokens - saved["tokens"]
+        state["cost"] += agent.total_cost - saved["cost"]
+        state["elapsed_seconds"] += now - saved["time"]
+        saved.update(tokens=agent.total_tokens, cost=agent.total_cost, time=now)
+        checkpoint.save()
+
+    async def _worker(out):
+        nonlocal next_job
+        while next_job < len(jobs):
+            topic, difficulty = jobs[next_job]
+            next_job += 1
+
+            for _ in range(max_attempts):
+                try:
+                    question = await agent.generate_practice_question(topic, difficulty, dedup_retries=0)
+                except Exception:
+                    run["errors"] += 1
+                    continue
+
+                if question.get("duplicate_of"):
+                    run["duplicates"] += 1
+                    continue
+
+                reason = validate_question(question)
+                if reason:
+                    run["invalid"] += 1
+                    kind = reason.split(":")[0].split(",")[0]
+                    rejections[kind] = rejections.get(kind, 0) + 1
+                    continue
+
+                question.setdefault("id", str(uuid.uuid4()))
+                question["exam_part"] = _TOPIC_PARTS[topic]
+                out.write(json.dumps(question) + "\n")
+                out.flush()
+                agent.remember_question(question)
+
+                run["generated"] += 1
+                if run["generated"] % checkpoint_every == 0:
+                    _save_checkpoint()
+                break
+            else:
+                run["unfilled"] += 1  # Left for the next run
+
+    # Batch priority: interactive chat keeps its share of the LLM rate limit
+    with open(output_path, "a", encoding="utf-8") as out, llm_priority(PRIORITY_BATCH):
+        try:
+            await asyncio.gather(*[_worker(out) for _ in range(min(concurrency, len(jobs)))])
+        finally:
+            _save_checkpoint()
+
+    elapsed = time.time() - start_time
+    run_cost = agent.total_cost - start_cost
+    total_questions = sum(done.values()) + run["generated"]
+
+    return {
+        "requested": sum(quotas.values()),
+        "already_present": sum(done.values()),
+        "generated": run["generated"],
+        "unfilled": run["unfilled"],
+        "complete": total_questions >= sum(quotas.values()) and run["unfilled"] == 0,
+        "rejected": {
+            "invalid": run["invalid"],
+            "duplicates": run["duplicates"],
+            "errors": run["errors"],
+            "invalid_reasons": rejections,
+        },
+        "concurrency": concurrency,
+        "elapsed_seconds": round(elapsed, 3),
+        "questions_per_second": round(run["generated"] / elapsed, 2) if elapsed > 0 else 0.0,
+        "llm_calls": agent.total_calls - start_calls,
+        "max_llm_calls": len(jobs) * max_attempts,
+        "tokens": agent.total_tokens - start_tokens,
+        "cost": round(run_cost, 4),
+        "cost_per_question": round(run_cost / run["generated"], 5) if run["generated"] else 0.0,
+        "cumulative": {
+            "generated": int(state["generated"]),
+            "tokens": int(state["tokens"]),
+            "cost": round(state["cost"], 4),
+            "elapsed_seconds": round(state["elapsed_seconds"], 3),
+        },
+    }
+
+
+class FakeQuestionLLM:
+    """
+    Local stand-in for `BaseAgent.call_openai` when generating questions
+
+    Answers the practice-question prompt with varied, schema-valid JSON
+    after a simulated latency, occasionally returning a broken item so the
+    validation path is exercised. Usage is estimated and charged to the
+    agent's counters at its model's price, like a real call.
+
+        agent.call_openai = FakeQuestionLLM(agent, latency_ms=800)
+    """
+
+    _PROMPT_RE = re.compile(r"practice question on: (.+?)\n+Difficulty: (\w+)", re.IGNORECASE)
+
+    _NAMES = ["Maria", "James", "Aisha", "Tom", "Priya", "Carlos", "Mei", "Daniel", "Fatima", "Owen"]
+    _ENTITIES = ["sole proprietorship", "partnership", "S corporation", "C corporation",
+                 "single-member LLC", "simple trust", "estate", "household"]
+    _EVENTS = ["sold a rental property", "received a K-1 distribution", "placed equipment in service",
+               "contributed land with a built-in gain", "paid estimated taxes late",
+               "converted a traditional IRA", "took an early retirement distribution",
+               "received a gift of appreciated stock", "claimed a dependent care credit",
+               "deducted home office expenses"]
+    _ASKS = ["the taxable amount", "the adjusted basis", "the allowable deduction",
+             "the character of the gain", "the amount reported", "the penalty owed"]
+    _CITATIONS = ["Pub 17", "Pub 541", "Pub 946", "Pub 544", "Pub 590-B", "Pub 535", "Pub 551"]
+
+    def __init__(
+        self,
+        agent: Any,
+        latency_ms: int = 0,
+        invalid_rate: float = 0.02,
+        seed: Optional[int] = None
+    ):
+        self.agent = agent
+        self.latency_ms = latency_ms
+        self.invalid_rate = invalid_rate
+        self.rng = random.Random(seed)
+
+    async def __call__(self, messages: List[Dict[str, str]], **kwargs) -> Dict[str, Any]:
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000 * self.rng.uniform(0.5, 1.5))
+
+        match = self._PROMPT_RE.search(messages[-1]["content"])
+        topic, difficulty = match.groups() if match else ("General", "medium")
+        content = json.dumps(self._question(topic, difficulty))
+
+        prompt_tokens = sum(len(m["content"]) for m in messages) // 4
+        completion_tokens = len(content) // 4
+        model = kwargs.get("model") or self.agent.model
+        cost = self.agent._calculate_cost(prompt_tokens, completion_tokens, model)
+
+        self.agent.total_calls += 1
+        self.agent.total_tokens += prompt_tokens + completion_tokens
+        self.agent.total_cost += cost
+
+        return {
+            "content": content,
+            "tokens_used": prompt_tokens + completion_tokens,
+            "cost": cost,
+            "latency_ms": self.latency_ms,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        }
+
+    def _question(self, topic: str, difficulty: str) -> Dict[str, Any]:
+        rng = self.rng
+        name, entity, event, ask = (
+            rng.choice(self._NAMES), rng.choice(self._ENTITIES),
+            rng.choice(self._EVENTS), rng.choice(self._ASKS)
+        )
+        amount = rng.randrange(1_000, 500_000, 250)
+        year = rng.randrange(2019, 2025)
+        correct = rng.randrange(4)
+        values = sorted({amount, amount // 2, amount * 2, amount - amount // 4})
+        while len(values) < 4:
+            values.append(values[-1] + 1000)
+        rng.shuffle(values)
+
+        question = {
+            "question": f"In {year}, {name}'s {entity} {event} involving ${amount:,}. "
+                        f"Considering {topic.lower()} rules, what is {ask}?",
+            "options": [f"{letter}) ${value:,}" for letter, value in zip("ABCD", values)],
+            "correct_answer": correct,
+            "explanation": f"For a {entity}, {ask} follows the {topic.lower()} rules; "
+                           f"the correct figure is {'ABCD'[correct]}.",
+            "irs_citation": f"{rng.choice(self._CITATIONS)}, page {rng.randrange(2, 120)}",
+            "common_trap": f"Students often ignore how the {entity} changes {ask}.",
+        }
+
+        if rng.random() < self.invalid_rate:
+            question["options"] = question["options"][:rng.randrange(4)]
+        return question
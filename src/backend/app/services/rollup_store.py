@@ -0,0 +1,318 @@
+"""
+Rollup Store
+Per-(user, topic, time bucket) attempt counters for the knowledge heatmap
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import date
+from app.config import settings
+from app.services.mastery_store import parse_attempt
+import numpy as np
+
+
+GRANULARITIES = ("day", "week", "month")
+
+
+def bucket_of(day: date, granularity: str) -> int:
+    """
+    Bucket number of a date: ordinal day, Monday-aligned week, or month
+
+    Consecutive buckets have consecutive numbers, so a range of buckets is
+    a contiguous slice of a series.
+    """
+    if granularity == "day":
+        return day.toordinal()
+    if granularity == "week":
+        return (day.toordinal() - 1) // 7  # date.min (ordinal 1) is a Monday
+    if granularity == "month":
+        return day.year * 12 + day.month - 1
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def bucket_start(bucket: int, granularity: str) -> date:
+    """First day of a bucket"""
+    if granularity == "day":
+        return date.fromordinal(bucket)
+    if granularity == "week":
+        return date.fromordinal(bucket * 7 + 1)
+    return date(bucket // 12, bucket % 12 + 1, 1)
+
+
+def _retention(granularity: str) -> Optional[int]:
+    """Buckets kept per granularity (None = forever)"""
+    return {
+        "day": settings.ROLLUP_DAY_RETENTION,
+        "week": settings.ROLLUP_WEEK_RETENTION,
+        "month": None,
+    }[granularity]
+
+
+class _Series:
+    """
+    One user's counters at one granularity: (topics x buckets) arrays
+
+    Column 0 is bucket `origin`. A bucket outside the window grows it just
+    enough to cover that bucket plus `_MAX_SLACK` spare columns at most, on
+    the side it grew, so in-order and shuffled ingest both stay close to the
+    span of buckets actually used. `compact` drops columns that fell out of
+    retention on the left and unused columns on the right.
+    """
+
+    _FIELDS = ("attempts", "correct", "time_spent")
+    _MAX_SLACK = 32
+
+    def __init__(self, origin: int, topics: int, width: int = 8):
+        self.origin = origin
+        self.attempts = np.zeros((topics, width), dtype=np.int32)
+        self.correct = np.zeros((topics, width), dtype=np.int32)
+        self.time_spent = np.zeros((topics, width), dtype=np.float32)  # seconds
+
+    @property
+    def width(self) -> int:
+        return self.attempts.shape[1]
+
+    def _resize(self, topics: int, origin: int, width: int) -> None:
+        """Reallocate to cover [origin, origin + width), keeping overlapping cells"""
+        old_topics = self.attempts.shape[0]
+        lo = max(origin, self.origin)
+        hi = min(origin + width, self.origin + self.width)
+        for name in self._FIELDS:
+            old = getattr(self, name)
+            new = np.zeros((topics, width), dtype=old.dtype)
+            if hi > lo:
+                new[:old_topics, lo - origin:hi - origin] = old[:, lo - self.origin:hi - self.origin]
+            setattr(self, name, new)
+        self.origin = origin
+
+    def add(self, col: int, bucket: int, is_correct: bool, time_spent_seconds: float) -> None:
+        topics = self.attempts.shape[0]
+        if col >= topics or bucket < self.origin or bucket >= self.origin + self.width:
+            while topics <= col:
+                topics *= 2
+            origin, end = self.origin, self.origin + self.width
+            if bucket < origin:
+                origin = bucket - min(end - bucket, self._MAX_SLACK)
+            elif bucket >= end:
+                end = bucket + 1 + min(bucket + 1 - origin, self._MAX_SLACK)
+            self._resize(topics, origin, end - origin)
+
+        i = bucket - self.origin
+        self.attempts[col, i] += 1
+        self.correct[col, i] += int(is_correct)
+        self.time_spent[col, i] += time_spent_seconds
+
+    def compact(self, floor: int) -> int:
+        """Drop buckets before `floor` and empty buckets after the last used one; returns cells freed"""
+        origin = max(floor, self.origin)
+        used = np.flatnonzero(self.attempts[:, origin - self.origin:].any(axis=0))
+        width = int(used[-1]) + 1 if used.size else 1
+        if origin == self.origin and width == self.width:
+            return 0
+        topics = self.attempts.shape[0]
+        freed = (self.width - width) * topics
+        self._resize(topics, origin, width)
+        return freed
+
+    def window(self, first: int, last: int, topics: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Counters for buckets first..last inclusive; zeros outside the stored window"""
+        n = last - first + 1
+        out = [np.zeros((topics, n), dtype=getattr(self, name).dtype) for name in self._FIELDS]
+        lo = max(first, self.origin)
+        hi = min(last + 1, self.origin + self.width)
+        rows = min(topics, self.attempts.shape[0])
+        if hi > lo:
+            for dst, name in zip(out, self._FIELDS):
+                dst[:rows, lo - first:hi - first] = getattr(self, name)[:rows, lo - self.origin:hi - self.origin]
+        return tuple(out)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self._FIELDS)
+
+
+class RollupStore:
+    """
+    Incrementally maintained topic x time attempt counters
+
+    Every attempt increments one day, one week and one month bucket, so
+    the coarser rollups are always current and a heatmap query is a slice
+    of one series: O(topics x buckets), independent of how many attempts
+    the user has. Day buckets are kept for ROLLUP_DAY_RETENTION days and
+    week buckets for ROLLUP_WEEK_RETENTION weeks; older history survives
+    in the coarser granularities. Month buckets are kept forever.
+    """
+
+    def __init__(self):
+        self._topic_index: Dict[str, int] = {}
+        self._topics: List[str] = []
+        self._series: Dict[str, Dict[str, _Series]] = {}  # user -> granularity -> series
+
+    def _topic_col(self, topic: str) -> int:
+        col = self._topic_index.get(topic)
+        if col is None:
+            col = len(self._topics)
+            self._topic_index[topic] = col
+            self._topics.append(topic)
+        return col
+
+    @staticmethod
+    def _floor(granularity: str, today: date) -> Optional[int]:
+        """Oldest bucket still within retention"""
+        retention = _retention(granularity)
+        if retention is None:
+            return None
+        return bucket_of(today, granularity) - retention + 1
+
+    # ------------------------------------------------------------------
+    # Ingest
+    # ------------------------------------------------------------------
+
+    def record_attempt(
+        self,
+        user_id: str,
+        topic: str,
+        is_correct: bool,
+        time_spent_seconds: float = 0.0,
+        attempted_on: Optional[date] = None,
+        today: Optional[date] = None
+    ) -> None:
+        """Fold one attempt into its day, week and month buckets"""
+        today = today or date.today()
+        attempted_on = attempted_on or today
+        col = self._topic_col(topic)
+        series = self._series.setdefault(user_id, {})
+
+        for granularity in GRANULARITIES:
+            bucket = bucket_of(attempted_on, granularity)
+            floor = self._floor(granularity, today)
+            if floor is not None and bucket < floor:
+                continue  # Backfilled history: only the coarser rollups keep it
+
+            level = series.get(granularity)
+            if level is None:
+                level = series[granularity] = _Series(bucket, max(len(self._topics), 8))
+            level.add(col, bucket, is_correct, time_spent_seconds)
+
+            # Amortized compaction: the window can reach twice the retention
+            if floor is not None and level.width > 2 * _retention(granularity):
+                level.compact(floor)
+
+    def record_attempts(self, attempts: List[Dict[str, Any]], today: Optional[date] = None) -> int:
+        """
+        Bulk ingest rows shaped like `question_attempts`
+        (user_id, question_topic, is_correct, time_spent_seconds, attempted_at);
+        all rows are parsed before any is applied
+        """
+        rows = [parse_attempt(attempt) for attempt in attempts]
+        for row in rows:
+            self.record_attempt(*row, today)
+        return len(rows)
+
+    def compact(self, today: Optional[date] = None) -> int:
+        """Drop every bucket past retention (e.g. nightly); returns cells freed"""
+        today = today or date.today()
+        freed = 0
+        for series in self._series.values():
+            for granularity, level in series.items():
+                floor = self._floor(granularity, today)
+                if floor is not None:
+                    freed += level.compact(floor)
+        return freed
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _pick_granularity(self, start: date, end: date, today: date) -> str:
+        """Finest granularity that still covers `start` within HEATMAP_MAX_BUCKETS columns"""
+        for granularity in GRANULARITIES:
+            floor = self._floor(granularity, today)
+            first, last = bucket_of(start, granularity), bucket_of(end, granularity)
+            if (floor is None or first >= floor) and last - first + 1 <= settings.HEATMAP_MAX_BUCKETS:
+                return granularity
+        return "month"
+
+    @staticmethod
+    def _mastery_levels(attempts: np.ndarray, accuracy: np.ndarray) -> np.ndarray:
+        """Heatmap tile levels, matching KnowledgeHeatmap's high/medium/low/none"""
+        return np.select(
+            [attempts == 0, accuracy >= settings.HEATMAP_HIGH_ACCURACY, accuracy >= settings.HEATMAP_MEDIUM_ACCURACY],
+            ["none", "high", "medium"],
+            default="low"
+        )
+
+    def heatmap(
+        self,
+        user_id: str,
+        start: date,
+        end: date,
+        granularity: Optional[str] = None,
+        today: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        Topic x bucket mastery grid for a date range
+
+        Args:
+            granularity: "day", "week" or "month" (None = pick automatically)
+
+        Only topics the user attempted in the range get a row.
+
+        Raises:
+            ValueError: Unknown granularity, reversed range, or a range that
+                reaches past that granularity's retention
+        """
+        today = today or date.today()
+        if end < start:
+            raise ValueError("end is before start")
+        granularity = granularity or self._pick_granularity(start, end, today)
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unknown granularity: {granularity}")
+
+        first, last = bucket_of(start, granularity), bucket_of(end, granularity)
+        floor = self._floor(granularity, today)
+        if floor is not None and first < floor:
+            raise ValueError(
+                f"{granularity} buckets are only kept from {bucket_start(floor, granularity).isoformat()}"
+            )
+        if last - first + 1 > settings.HEATMAP_MAX_BUCKETS:
+            raise ValueError(f"Range spans more than {settings.HEATMAP_MAX_BUCKETS} {granularity} buckets")
+
+        buckets = [bucket_start(b, granularity).isoformat() for b in range(first, last + 1)]
+        level = self._series.get(user_id, {}).get(granularity)
+        if level is None:
+            return {"granularity": granularity, "buckets": buckets, "topics": []}
+
+        attempts, correct, time_spent = level.window(first, last, len(self._topics))
+        rows = np.flatnonzero(attempts.sum(axis=1))
+        attempts, correct, time_spent = attempts[rows], correct[rows], time_spent[rows]
+        accuracy = np.round(correct / np.maximum(attempts, 1), 3)
+        mastery = self._mastery_levels(attempts, accuracy)
+
+        # Empty cells have no accuracy
+        accuracy = accuracy.astype(object)
+        accuracy[attempts == 0] = None
+
+        return {
+            "granularity": granularity,
+            "buckets": buckets,
+            "topics": [
+                {
+                    "topic": self._topics[col],
+                    "attempts": attempts[i].tolist(),
+                    "accuracy": accuracy[i].tolist(),
+                    "mastery": mastery[i].tolist(),
+                    "time_spent_seconds": np.round(time_spent[i], 1).tolist(),
+                }
+                for i, col in enumerate(rows)
+            ],
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Store size metrics"""
+        levels = [level for series in self._series.values() for level in series.values()]
+        return {
+            "users": len(self._series),
+            "topics": len(self._topics),
+            "cells": int(sum(level.attempts.size for level in levels)),
+            "memory_bytes": int(sum(level.nbytes for level in levels)),
+        }
@@ -0,0 +1,227 @@
+"""
+Sprint Grader
+Grades batched Sprint Mode / mission answers and awards XP from shared state
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime
+from app.config import settings
+from app.services.answer_key import AnswerKey
+from app.services.mission_generator import xp_reward
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+
+
+class SprintGrader:
+    """
+    Lookup-only grading for timed practice
+
+    Each answer is one AnswerKey lookup. The user's answer streak
+    (consecutive correct answers), XP total and recently answered
+    questions live in one SQLite file (WAL) shared by every worker, and a
+    batch is applied in a single write transaction, so the totals in the
+    response are the user's real ones whichever worker graded it, and
+    survive restarts. A correct answer earns SPRINT_XP_PER_CORRECT, scaled
+    by XP_MULTIPLIER_STREAK per streak step with the same cap as missions.
+
+    The response includes each correct answer, so a question the user
+    has answered within the last `dedup_window_seconds` (on any worker) is
+    reported as a duplicate: no XP, no streak change, no attempt row. That
+    covers retried batches as well as replaying a known answer to farm XP.
+    Grading returns `question_attempts` rows for the caller to ingest
+    downstream. SQLite runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        answer_key: AnswerKey,
+        xp_per_correct: Optional[int] = None,
+        xp_base: Optional[int] = None,
+        xp_multiplier: Optional[float] = None,
+        dedup_window_seconds: Optional[float] = None,
+        path: Optional[str] = None
+    ):
+        self.answer_key = answer_key
+        self.xp_per_correct = xp_per_correct if xp_per_correct is not None else settings.SPRINT_XP_PER_CORRECT
+        self.xp_base = xp_base if xp_base is not None else settings.XP_BASE_REWARD
+        self.xp_multiplier = xp_multiplier if xp_multiplier is not None else settings.XP_MULTIPLIER_STREAK
+        self.dedup_window_seconds = (
+            dedup_window_seconds if dedup_window_seconds is not None else settings.SPRINT_DEDUP_WINDOW_SECONDS
+        )
+        self.path = path or settings.SPRINT_STATE_PATH
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_pid: Optional[int] = None
+        self._conn_lock = threading.Lock()
+        self._purged_at = 0.0
+
+        self.graded = 0
+        self.duplicates = 0
+        self.unknown = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """Connection for this process (callers hold `_conn_lock`)"""
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sprint_users ("
+                " user_id TEXT PRIMARY KEY,"
+                " streak INTEGER NOT NULL,"
+                " best_streak INTEGER NOT NULL,"
+                " xp INTEGER NOT NULL"
+                ")"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sprint_answers ("
+                " user_id TEXT NOT NULL,"
+                " question_id TEXT NOT NULL,"
+                " graded_at REAL NOT NULL,"
+                " PRIMARY KEY (user_id, question_id)"
+                ") WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS sprint_answers_graded_at ON sprint_answers (graded_at)")
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    def _apply(
+        self,
+        user_id: str,
+        keyed: List[Tuple[Dict[str, Any], int]],
+        now: float
+    ) -> Tuple[List[Tuple[bool, int]], int, int, int]:
+        """
+        Score (submission, correct answer) pairs against the user's shared
+        state in one transaction
+
+        Returns:
+            ([(first answer in the window, xp)], streak, best streak, total xp)
+        """
+        cutoff = now - self.dedup_window_seconds
+        scored = []
+        with self._conn_lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")  # Serializes a user's batches across workers
+            try:
+                row = db.execute(
+                    "SELECT streak, best_streak, xp FROM sprint_users WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                streak, best_streak, total_xp = row or (0, 0, 0)
+
+                for submission, correct_answer in keyed:
+                    first = db.execute(
+                        "INSERT INTO sprint_answers (user_id, question_id, graded_at) VALUES (?, ?, ?)"
+                        " ON CONFLICT (user_id, question_id) DO UPDATE SET graded_at = excluded.graded_at"
+                        " WHERE sprint_answers.graded_at <= ?",
+                        (user_id, submission["question_id"], now, cutoff)
+                    ).rowcount == 1
+                    xp = 0
+                    if first and submission["answer"] == correct_answer:
+                        streak += 1
+                        best_streak = max(best_streak, streak)
+                        xp = xp_reward(self.xp_per_correct, streak - 1, self.xp_base, self.xp_multiplier)
+                        total_xp += xp
+                    elif first:
+                        streak = 0
+                    scored.append((first, xp))
+
+                db.execute(
+                    "INSERT OR REPLACE INTO sprint_users (user_id, streak, best_streak, xp) VALUES (?, ?, ?, ?)",
+                    (user_id, streak, best_streak, total_xp)
+                )
+                if now - self._purged_at > 3600:
+                    db.execute("DELETE FROM sprint_answers WHERE graded_at < ?", (cutoff,))
+                    self._purged_at = now
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        return scored, streak, best_streak, total_xp
+
+    async def grade(
+        self,
+        user_id: str,
+        submissions: List[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Grade a batch of answers in submission order
+
+        Args:
+            submissions: [{"question_id", "answer", "time_spent_seconds",
+                           "answered_at" (datetime, optional)}]
+
+        Returns:
+            (response payload, attempt rows for downstream ingest)
+        """
+        keys = [self.answer_key.lookup(submission["question_id"]) for submission in submissions]
+        keyed = [(submission, key[0]) for submission, key in zip(submissions, keys) if key is not None]
+        scored, streak, best_streak, total_xp = await asyncio.to_thread(
+            self._apply, user_id, keyed, time.time()
+        )
+
+        results = []
+        attempts = []
+        scored_iter = iter(scored)
+        for submission, key in zip(submissions, keys):
+            question_id = submission["question_id"]
+            if key is None:
+                self.unknown += 1
+                results.append({"question_id": question_id, "status": "unknown_question"})
+                continue
+
+            correct_answer, topic = key
+            first, xp = next(scored_iter)
+            is_correct = submission["answer"] == correct_answer
+            results.append({
+                "question_id": question_id,
+                "status": "graded" if first else "duplicate",
+                "is_correct": is_correct,
+                "correct_answer": correct_answer,
+                "xp": xp,
+            })
+            if not first:
+                self.duplicates += 1
+                continue
+
+            answered_at = submission.get("answered_at") or datetime.now()
+            attempts.append({
+                "user_id": user_id,
+                "question_id": question_id,
+                "question_topic": topic,
+                "is_correct": is_correct,
+                "time_spent_seconds": submission.get("time_spent_seconds") or 0.0,
+                "attempted_at": answered_at.isoformat(),
+            })
+
+        self.graded += len(attempts)
+
+        return {
+            "results": results,
+            "correct": sum(1 for a in attempts if a["is_correct"]),
+            "graded": len(attempts),
+            "streak": streak,
+            "best_streak": best_streak,
+            "xp_earned": sum(xp for _, xp in scored),
+            "total_xp": total_xp,
+        }, attempts
+
+    def close(self) -> None:
+        with self._conn_lock:
+            if self._conn is not None and self._conn_pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "graded": self.graded,
+            "duplicates": self.duplicates,
+            "unknown_questions": self.unknown,
+            "answer_key": self.answer_key.get_metrics(),
+        }
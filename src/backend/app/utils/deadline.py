@@ -0,0 +1,117 @@
+"""
+Request Deadlines
+Per-request time budget checked by each stage, and cancellation on client disconnect
+"""
+
+from typing import Any, Awaitable, Optional, TypeVar
+import asyncio
+import time
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """The request ran out of time budget before `stage` could start"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Deadline exceeded before {stage}")
+        self.stage = stage
+
+
+class ClientDisconnected(Exception):
+    """The client went away while the request was in flight"""
+
+
+class Deadline:
+    """
+    Absolute expiry for one request
+
+    Created once by the handler and passed to each stage through the
+    agent `context` dict (key "deadline"). Stages ask how much budget is
+    left and degrade (skip AI routing, shrink RAG / max_tokens) instead
+    of starting work they cannot finish. `hard_ms` is when the handler
+    cancels the request outright (defaults to the soft budget); calls
+    that run past the soft budget are sized to end before it.
+    """
+
+    def __init__(self, budget_ms: int, hard_ms: Optional[int] = None):
+        self.budget_ms = budget_ms
+        self.started = time.monotonic()
+        self.expires_at = self.started + budget_ms / 1000
+        self.hard_expires_at = self.started + (hard_ms if hard_ms is not None else budget_ms) / 1000
+
+    def remaining(self) -> float:
+        """Seconds left (never negative)"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def hard_remaining(self) -> float:
+        """Seconds until the request is cancelled (never negative)"""
+        return max(self.hard_expires_at - time.monotonic(), 0.0)
+
+    def remaining_ms(self) -> int:
+        return int(self.remaining() * 1000)
+
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.started) * 1000)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str) -> None:
+        """
+        Raises:
+            DeadlineExceeded: if there is no budget left for `stage`
+        """
+        if self.expired:
+            raise DeadlineExceeded(stage)
+
+
+def get_deadline(context: Optional[dict]) -> Optional[Deadline]:
+    """The request deadline carried in an agent context, if any"""
+    return (context or {}).get("deadline")
+
+
+async def run_until_disconnect(
+    request: Any,
+    work: Awaitable[T],
+    timeout: Optional[float] = None,
+    poll_interval: float = 0.1
+) -> T:
+    """
+    Await `work`, cancelling it if the client disconnects or `timeout` passes
+
+    Cancelling the task cancels any in-flight OpenAI call inside it, so an
+    abandoned request stops consuming tokens and a concurrency slot.
+
+    Args:
+        request: Starlette request (anything with async `is_disconnected()`)
+        timeout: Hard cap in seconds (the soft budget is the request Deadline)
+
+    Raises:
+        ClientDisconnected: the client went away first
+        DeadlineExceeded: `timeout` passed first ("request" stage)
+    """
+    hard_deadline = Deadline(int(timeout * 1000)) if timeout is not None else None
+    task = asyncio.ensure_future(work)
+    try:
+        while True:
+            wait = poll_interval
+            if hard_deadline is not None:
+                wait = min(wait, hard_deadline.remaining())
+
+            done, _ = await asyncio.wait({task}, timeout=wait)
+            if done:
+                return task.result()
+
+            if await request.is_disconnected():
+                raise ClientDisconnected()
+            if hard_deadline is not None and hard_deadline.expired:
+                raise DeadlineExceeded("request")
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
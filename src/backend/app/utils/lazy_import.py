@@ -0,0 +1,46 @@
+"""
+Lazy Imports
+Defers loading heavy modules until an attribute is first used
+"""
+
+import importlib
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return a module that is only executed on first attribute access
+
+    Used for openai (agents, embedder) and tiktoken (prompt token counts),
+    which are only needed once an agent is built or an asset is loaded.
+    numpy, FastAPI and the app's own services are imported eagerly by
+    app.main: every worker uses them, and with gunicorn's preload_app they
+    are imported once in the master anyway.
+
+        openai = lazy_import("openai")
+        ...
+        client = openai.AsyncOpenAI(api_key=key)  # import happens here
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named '{name}'")
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def is_loaded(name: str) -> bool:
+    """Whether a module has actually been executed (not just lazily registered)"""
+    module = sys.modules.get(name)
+    if module is None:
+        return False
+    return not isinstance(module, importlib.util._LazyModule)
@@ -0,0 +1,309 @@
+"""
+Profiling Hooks
+On-demand CPU sampling and allocation tracking for a live worker, as
+collapsed stacks (flamegraph.pl / speedscope / inferno input)
+"""
+
+from typing import Dict, Any, Optional, List, Iterable, Set
+from collections import Counter, OrderedDict
+from app.config import settings
+import asyncio
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+
+# Leaf frames of a thread with nothing to do: an event loop waiting on
+# I/O, or a pool worker blocked on its queue
+_IDLE_LEAVES = {("selectors.py", "select"), ("threading.py", "wait")}
+
+_frame_labels: Dict[Any, str] = {}
+
+
+def _short_path(path: str) -> str:
+    for marker in ("site-packages" + os.sep, "lib" + os.sep + "python"):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    try:
+        return os.path.relpath(path)
+    except ValueError:
+        return path
+
+
+def _label(code) -> str:
+    """`function (file:first line)`, one flamegraph node per function"""
+    label = _frame_labels.get(code)
+    if label is None:
+        label = f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+        _frame_labels[code] = label
+    return label
+
+
+def collapse_frame(frame) -> List[str]:
+    """Stack of a frame, outermost first"""
+    stack = []
+    while frame is not None:
+        stack.append(_label(frame.f_code))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def to_collapsed(counts: Dict[str, int]) -> str:
+    """`a;b;c <count>` lines, heaviest first"""
+    return "".join(
+        f"{stack} {count}\n"
+        for stack, count in sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    )
+
+
+class SamplingProfiler:
+    """
+    Wall-clock stack sampler on a background thread
+
+    Every `interval_ms` the sampler snapshots the stacks of the target
+    threads (sys._current_frames) and counts each distinct stack. Nothing
+    is hooked into the interpreter, so the profiled code runs unmodified
+    and there is no cost at all when no profiler is running.
+
+    Threads parked in selectors.select (an idle event loop) or
+    threading wait (an idle pool worker) are dropped unless `include_idle`,
+    so the output is where the worker spends CPU.
+    """
+
+    def __init__(
+        self,
+        interval_ms: Optional[float] = None,
+        thread_ids: Optional[Iterable[int]] = None,
+        include_idle: bool = False
+    ):
+        self.interval = (interval_ms if interval_ms is not None else settings.PROFILE_SAMPLE_INTERVAL_MS) / 1000
+        self.thread_ids: Optional[Set[int]] = set(thread_ids) if thread_ids is not None else None
+        self.include_idle = include_idle
+
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.started_at: Optional[float] = None
+        self.stopped_at: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self.started_at = time.time()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> "SamplingProfiler":
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.stopped_at = time.time()
+        return self
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                code = frame.f_code
+                if not self.include_idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                    self.idle_samples += 1
+                    continue
+                if thread_id not in names:
+                    names = {thread.ident: thread.name for thread in threading.enumerate()}
+                stack = [names.get(thread_id, str(thread_id))] + collapse_frame(frame)
+                self.counts[";".join(stack)] += 1
+                self.samples += 1
+
+    def collapsed(self) -> str:
+        return to_collapsed(self.counts)
+
+    def summary(self) -> Dict[str, Any]:
+        end = self.stopped_at or time.time()
+        return {
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "stacks": len(self.counts),
+            "interval_ms": round(self.interval * 1000, 2),
+            "seconds": round(end - (self.started_at or end), 3),
+        }
+
+
+class AllocationProfiler:
+    """
+    Net memory allocated during a window, by allocating stack (tracemalloc)
+
+    tracemalloc slows every allocation while it is tracing, so it is only
+    on for the profiling window and stopped afterwards (unless something
+    else had already started it). `start` and `stop` take snapshots of
+    every live trace and block for as long; run them in a worker thread.
+    """
+
+    def __init__(self, frames: Optional[int] = None):
+        self.frames = frames if frames is not None else settings.PROFILE_TRACEMALLOC_FRAMES
+        self._owns_tracing = False
+        self._start: Optional[tracemalloc.Snapshot] = None
+        self.counts: Counter = Counter()
+        self.allocated_bytes = 0
+        self.peak_bytes = 0
+
+    def start(self) -> "AllocationProfiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        tracemalloc.reset_peak()
+        self._start = tracemalloc.take_snapshot()
+        return self
+
+    def stop(self) -> "AllocationProfiler":
+        end = tracemalloc.take_snapshot()
+        self.peak_bytes = tracemalloc.get_traced_memory()[1]
+        if self._owns_tracing:
+            tracemalloc.stop()
+
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        end = end.filter_traces(filters)
+        start = self._start.filter_traces(filters)
+        for stat in end.compare_to(start, "traceback"):
+            if stat.size_diff <= 0:
+                continue
+            stack = ";".join(
+                f"{_short_path(frame.filename)}:{frame.lineno}" for frame in stat.traceback
+            )  # tracemalloc tracebacks are outermost first
+            self.counts[stack] += stat.size_diff
+            self.allocated_bytes += stat.size_diff
+        return self
+
+    def collapsed(self) -> str:
+        """Collapsed stacks weighted by bytes"""
+        return to_collapsed(self.counts)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "net_allocated_bytes": self.allocated_bytes,
+            "peak_traced_bytes": self.peak_bytes,
+            "stacks": len(self.counts),
+            "frames": self.frames,
+        }
+
+
+class RequestProfiles:
+    """Most recent per-request CPU profiles, oldest evicted first"""
+
+    def __init__(self, max_profiles: Optional[int] = None):
+        self.max_profiles = max_profiles  # Default PROFILE_REQUEST_HISTORY
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def add(
+        self,
+        profile_id: str,
+        method: str,
+        path: str,
+        profiler: SamplingProfiler,
+        reason: str
+    ) -> None:
+        self._profiles[profile_id] = {
+            "id": profile_id,
+            "method": method,
+            "path": path,
+            "reason": reason,
+            "started_at": profiler.started_at,
+            **profiler.summary(),
+            "collapsed": profiler.collapsed(),
+        }
+        limit = self.max_profiles if self.max_profiles is not None else settings.PROFILE_REQUEST_HISTORY
+        while len(self._profiles) > limit:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {key: value for key, value in profile.items() if key != "collapsed"}
+            for profile in reversed(self._profiles.values())
+        ]
+
+
+request_profiles = RequestProfiles()
+
+
+class ProfilingMiddleware:
+    """
+    Per-request CPU profiles (pure ASGI, so streaming and disconnect
+    detection pass through untouched)
+
+    A request is profiled when it sends `X-Profile: 1` with a valid
+    `X-Admin-Token` (the response then carries `X-Profile-Id`), or when
+    it is drawn by PROFILE_REQUEST_SAMPLE_RATE. Either way the profile
+    is kept in `request_profiles`. Requests that are neither cost one
+    header scan and, with a non-zero sample rate, one random draw.
+
+    The sampler follows the event loop thread for the duration of the
+    request, so other requests interleaved on the same loop show up too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    @staticmethod
+    def _requested(scope) -> bool:
+        profile = token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                profile = value
+            elif name == b"x-admin-token":
+                token = value.decode("latin-1")
+        return profile is not None and profile != b"0" and is_admin_token(token)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        requested = self._requested(scope)
+        sampled = not requested and settings.PROFILE_REQUEST_SAMPLE_RATE > 0 and (
+            random.random() < settings.PROFILE_REQUEST_SAMPLE_RATE
+        )
+        if not (requested or sampled):
+            return await self.app(scope, receive, send)
+
+        profile_id = uuid.uuid4().hex[:12]
+        profiler = SamplingProfiler(
+            interval_ms=settings.PROFILE_REQUEST_INTERVAL_MS,
+            thread_ids=[threading.get_ident()]
+        ).start()
+
+        async def send_with_id(message):
+            if requested and message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode())
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profiler.stop()
+            request_profiles.add(
+                profile_id, scope["method"], scope["path"], profiler,
+                "header" if requested else "sampled"
+            )
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Constant-time check against ADMIN_API_TOKEN (admin endpoints are off when it is unset)"""
+    expected = settings.ADMIN_API_TOKEN
+    return bool(expected and token) and hmac.compare_digest(token.encode(), expected.encode())
+
+
+# One CPU or allocation session per worker at a time
+profile_lock = asyncio.Lock()
@@ -0,0 +1,167 @@
+"""
+Practice Question Parser
+Pulls structured multiple-choice questions out of free-text agent answers
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from bisect import bisect_left
+import json
+import re
+
+
+# Spans mentioning "question" tried as JSON per answer; bounds the work on brace-heavy text
+_MAX_JSON_CANDIDATES = 16
+_JSON_TOKEN_RE = re.compile(r'"(?:[^"\\]|\\.)*"|[{}]', re.DOTALL)
+
+
+_SECTION_RE = re.compile(
+    r"^[#>\s]*\**\s*practice question\s*\d*\s*:?\s*\**\s*:?\s*",
+    re.IGNORECASE | re.MULTILINE
+)
+_OPTION_RE = re.compile(r"^\s*(?:[-*]\s*)?\**\(?([A-Da-d])[\).:]\**\s+(.+?)\s*$")
+_ANSWER_RE = re.compile(
+    r"^\s*[-*]?\s*\**\s*(?:correct\s+)?answer\s*(?:is)?\s*\**\s*[:\-]?\s*\**\s*\(?([A-Da-d])\b",
+    re.IGNORECASE
+)
+_EXPLANATION_RE = re.compile(r"^\s*[-*]?\s*\**\s*explanation\s*\**\s*:?\s*\**\s*(.*)$", re.IGNORECASE)
+_HEADING_RE = re.compile(r"^\s*(#{1,6}\s|\*\*[^*]+\*\*\s*$|\*\*[^*]+:\*\*)")
+
+
+def _strip_markdown(text: str) -> str:
+    return re.sub(r"\*\*|__", "", text).strip()
+
+
+def _json_object_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    (start, end) of every balanced {...} span, outermost first in text order
+
+    One pass: outside braces it jumps between '{' characters, inside them
+    between braces and whole string literals (so braces in strings don't
+    count).
+    """
+    spans = []
+    starts: List[int] = []
+    pos = text.find("{")
+    while pos != -1:
+        if not starts:
+            starts.append(pos)
+            pos += 1
+        token = _JSON_TOKEN_RE.search(text, pos)
+        if token is None:
+            break
+        pos = token.end()
+        if token.group() == "{":
+            starts.append(token.start())
+        elif token.group() == "}":
+            spans.append((starts.pop(), pos))
+            if not starts:
+                pos = text.find("{", pos)
+    spans.sort()
+    return spans
+
+
+def _extract_json_question(text: str) -> Optional[Dict[str, Any]]:
+    """A JSON object with question/options embedded in the answer, if any"""
+    keys = [m.start() for m in re.finditer('"question"', text)]
+    if not keys:
+        return None
+
+    attempts = 0
+    for start, end in _json_object_spans(text):
+        i = bisect_left(keys, start)
+        if i == len(keys) or keys[i] >= end:
+            continue  # No "question" key inside
+        try:
+            candidate = json.loads(text[start:end])
+        except ValueError:
+            candidate = None
+        if isinstance(candidate, dict) and "question" in candidate and "options" in candidate:
+            return candidate
+        attempts += 1
+        if attempts >= _MAX_JSON_CANDIDATES:
+            break
+    return None
+
+
+def extract_practice_question(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract a practice question from a specialist answer
+
+    Handles an embedded JSON object, or a markdown section such as:
+
+        **Practice Question:** A taxpayer ...
+        A) $1,000
+        B) $2,000
+        ...
+        **Correct Answer:** B
+        **Explanation:** ...
+
+    Returns:
+        {"question", "options", "correct_answer" (0-based index or None),
+         "explanation"} or None if no question is present
+    """
+    embedded = _extract_json_question(text)
+    if embedded:
+        return {
+            "question": embedded.get("question", ""),
+            "options": embedded.get("options", []),
+            "correct_answer": embedded.get("correct_answer"),
+            "explanation": embedded.get("explanation", ""),
+        }
+
+    match = _SECTION_RE.search(text)
+    if not match:
+        return None
+
+    stem_lines: List[str] = []
+    options: List[str] = []
+    letters: List[str] = []
+    explanation_lines: List[str] = []
+    correct_answer = None
+    in_explanation = False
+
+    for line in text[match.end():].splitlines():
+        if in_explanation:
+            if _HEADING_RE.match(line) and not _ANSWER_RE.match(line):
+                break
+            explanation_lines.append(line)
+            continue
+
+        answer = _ANSWER_RE.match(line)
+        if answer:
+            letter = answer.group(1).upper()
+            correct_answer = letters.index(letter) if letter in letters else "ABCD".index(letter)
+            continue
+
+        explanation = _EXPLANATION_RE.match(line)
+        if explanation:
+            in_explanation = True
+            if explanation.group(1):
+                explanation_lines.append(explanation.group(1))
+            continue
+
+        option = _OPTION_RE.match(line)
+        if option:
+            letter = option.group(1).upper()
+            letters.append(letter)
+            options.append(f"{letter}) {_strip_markdown(option.group(2))}")
+            continue
+
+        if options:
+            # Text after the options that isn't an answer/explanation ends the question
+            if line.strip() and _HEADING_RE.match(line):
+                break
+            continue
+
+        stem_lines.append(line)
+
+    question = _strip_markdown(" ".join(l.strip() for l in stem_lines if l.strip()))
+    if not question:
+        return None
+
+    return {
+        "question": question,
+        "options": options,
+        "correct_answer": correct_answer,
+        "explanation": _strip_markdown("\n".join(explanation_lines)),
+    }
@@ -0,0 +1,28 @@
+"""
+Fast JSON Responses
+orjson-backed response class and pre-serialized constant fragments
+"""
+
+from typing import Any
+from fastapi.responses import JSONResponse
+import orjson
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    Accepts `orjson.Fragment` values anywhere in the content, so constant
+    payloads serialized once at import are spliced in as raw bytes.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def fragment(value: Any) -> orjson.Fragment:
+    """Serialize a constant once; embed the result in any FastJSONResponse"""
+    return orjson.Fragment(orjson.dumps(value, option=ORJSON_OPTIONS))
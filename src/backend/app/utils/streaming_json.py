@@ -0,0 +1,130 @@
+"""
+Streaming JSON Parser
+Emits top-level fields of a JSON object as soon as each value is complete
+"""
+
+from typing import Dict, Any, List, Tuple
+import json
+
+
+_WHITESPACE = " \t\r\n"
+
+
+class StreamingJSONObjectParser:
+    """
+    Incremental parser for one top-level JSON object
+
+    Feed completion chunks as they arrive; each call returns the
+    (key, value) pairs whose values finished in that chunk. Strings,
+    objects and arrays are emitted on their closing character; numbers,
+    booleans and null on the following ',' or '}'. Every character is
+    scanned once, so total work is linear in the completion length.
+    """
+
+    def __init__(self):
+        self.result: Dict[str, Any] = {}
+        self.done = False
+
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._state = "start"  # start, key, colon, value_start, value, after_value
+        self._key_start = 0
+        self._value_start = 0
+        self._key = None
+
+    def _emit(self, end: int) -> Tuple[str, Any]:
+        raw = self._buffer[self._value_start:end].strip()
+        value = json.loads(raw)
+        self.result[self._key] = value
+        self._state = "after_value"
+        return self._key, value
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        Consume a chunk of the completion
+
+        Raises:
+            ValueError: if the stream is not a JSON object
+        """
+        if self.done:
+            return []
+
+        self._buffer += chunk
+        emitted = []
+        buffer = self._buffer
+
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._state == "key":
+                        self._key = json.loads(buffer[self._key_start:i + 1])
+                        self._state = "colon"
+                    elif self._depth == 1 and self._state == "value":
+                        emitted.append(self._emit(i + 1))
+                continue
+
+            if self._state == "start":
+                # Anything before the opening brace (prose, a ``` fence) is skipped
+                if char == "{":
+                    self._depth = 1
+                    self._state = "key"
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1 and self._state == "key":
+                    self._key_start = i
+                elif self._depth == 1 and self._state == "value_start":
+                    self._value_start = i
+                    self._state = "value"
+            elif char in "{[":
+                if self._depth == 1 and self._state == "value_start":
+                    self._value_start = i
+                    self._state = "value"
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 1:
+                    if char != "}":
+                        raise ValueError(f"Unexpected '{char}' at top level")
+                    if self._state == "value":
+                        emitted.append(self._emit(i))
+                    self.done = True
+                    self._pos = i + 1
+                    return emitted
+                self._depth -= 1
+                if self._depth == 1 and self._state == "value":
+                    emitted.append(self._emit(i + 1))
+            elif self._depth == 1:
+                if char == ":" and self._state == "colon":
+                    self._state = "value_start"
+                elif char == ",":
+                    if self._state == "value":
+                        emitted.append(self._emit(i))
+                    self._state = "key"
+                elif char not in _WHITESPACE and self._state == "value_start":
+                    self._value_start = i
+                    self._state = "value"
+
+        self._pos = len(buffer)
+        return emitted
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Finish the stream and return the full object
+
+        Raises:
+            ValueError: if the object never closed
+        """
+        if not self.done:
+            raise ValueError("Incomplete JSON object in stream")
+        return self.result
@@ -0,0 +1,139 @@
+"""
+ANN Benchmark
+Recall@k and latency of the IVF index against exact (brute-force) search
+
+Usage:
+    python scripts/benchmark_ann.py
+    python scripts/benchmark_ann.py --chunks 500000 --dim 1536 --nprobe 4 8 16 32 64
+    python scripts/benchmark_ann.py --vectors data/vector_store/pub_17/vectors.npy
+
+Without --vectors, a synthetic corpus is drawn from a mixture of Gaussian
+clusters (real embeddings are clustered by topic; uniform random vectors
+are the worst case for any ANN index). Queries are perturbed corpus
+vectors, so every query has near neighbours.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.rag.vector_store import VectorStore  # noqa: E402
+
+
+def synthetic_corpus(chunks: int, dim: int, clusters: int, seed: int) -> np.ndarray:
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(clusters, dim).astype(np.float32)
+    labels = rng.randint(clusters, size=chunks)
+    vectors = np.empty((chunks, dim), dtype=np.float32)
+    for start in range(0, chunks, 50000):
+        block = labels[start:start + 50000]
+        vectors[start:start + len(block)] = (
+            centers[block] + 1.5 * rng.randn(len(block), dim).astype(np.float32)
+        )
+    return vectors
+
+
+def _timed(fn, queries):
+    results, latencies = [], []
+    for query in queries:
+        start_time = time.perf_counter()
+        results.append(fn(query))
+        latencies.append((time.perf_counter() - start_time) * 1000)
+    latencies.sort()
+    return results, {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "mean_ms": round(statistics.mean(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark IVF recall/latency vs brute force")
+    parser.add_argument("--vectors", help=".npy matrix of real embeddings to index")
+    parser.add_argument("--chunks", type=int, default=200000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=2000, help="Synthetic topic clusters")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--nlist", type=int, help="IVF cells (default ~4*sqrt(chunks))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.vectors:
+        raw = np.load(args.vectors, mmap_mode="r")
+    else:
+        raw = synthetic_corpus(args.chunks, args.dim, args.clusters, args.seed)
+
+    store = VectorStore()
+    store.add("corpus", [{"id": i} for i in range(len(raw))], raw)
+    vectors = store.partitions["corpus"].vectors
+
+    rng = np.random.RandomState(args.seed + 1)
+    picks = rng.choice(len(vectors), args.queries, replace=False)
+    noise = rng.randn(args.queries, vectors.shape[1]).astype(np.float32)
+    queries = vectors[picks] + 0.3 * noise / np.sqrt(vectors.shape[1])
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    def exact(query):
+        return [c["id"] for c in store.search(query, args.top_k)]
+
+    truth, exact_latency = _timed(exact, queries)
+
+    start_time = time.perf_counter()
+    indexed = store.build_index(min_chunks=1, nlist=args.nlist)
+    build_seconds = time.perf_counter() - start_time
+    index = store.partitions["corpus"].index
+
+    report = {
+        "chunks": len(vectors),
+        "dim": int(vectors.shape[1]),
+        "top_k": args.top_k,
+        "queries": args.queries,
+        "exact": exact_latency,
+        "ivf": {
+            "indexed": indexed,
+            "nlist": index.nlist,
+            "build_seconds": round(build_seconds, 2),
+            "runs": [],
+        },
+    }
+
+    for nprobe in args.nprobe:
+        def approximate(query, nprobe=nprobe):
+            return [c["id"] for c in store.search(query, args.top_k, nprobe=nprobe)]
+
+        found, latency = _timed(approximate, queries)
+        recall = statistics.mean(
+            len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)
+        )
+        report["ivf"]["runs"].append({
+            "nprobe": nprobe,
+            f"recall@{args.top_k}": round(recall, 4),
+            **latency,
+            "speedup_p50": round(exact_latency["p50_ms"] / latency["p50_ms"], 1),
+        })
+
+    # Incremental insert: index 10% more vectors without retraining
+    extra = synthetic_corpus(len(vectors) // 10, vectors.shape[1], args.clusters, args.seed) \
+        if not args.vectors else np.asarray(raw[:len(vectors) // 10])
+    start_time = time.perf_counter()
+    store.add("corpus", [{"id": len(vectors) + i} for i in range(len(extra))], extra)
+    report["ivf"]["incremental_insert"] = {
+        "vectors": len(extra),
+        "seconds": round(time.perf_counter() - start_time, 3),
+        "index": index.get_metrics(),
+    }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
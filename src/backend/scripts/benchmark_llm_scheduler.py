@@ -0,0 +1,162 @@
+"""
+LLM Scheduler Benchmark
+Interactive latency under a background flood, with and without the scheduler
+
+Usage:
+    python scripts/benchmark_llm_scheduler.py
+    python scripts/benchmark_llm_scheduler.py --capacity 32 --batch-workers 96 --seconds 20
+
+A simulated provider serves `--capacity` concurrent calls and answers
+429 beyond that; latency per token rises as it nears capacity. Batch
+workers call it in a tight loop while interactive calls arrive at
+`--interactive-rate` per second. Callers retry a 429 after a short
+backoff, like the OpenAI client does.
+
+    - unscheduled: calls go straight to the provider (the old call path)
+    - scheduled:   calls go through BaseAgent.call_openai and the LLM scheduler
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for _name in ("OPENAI_API_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_JWT_SECRET", "SECRET_KEY"):
+    os.environ.setdefault(_name, "benchmark")
+
+from app.agents.base_agent import BaseAgent  # noqa: E402
+from app.agents.llm_scheduler import (  # noqa: E402
+    llm_scheduler, llm_priority, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class SimulatedProvider:
+    """Stand-in for `client.chat.completions.create` with a hard concurrency cap"""
+
+    def __init__(self, capacity: int, ms_per_token: float, seed: int):
+        self.capacity = capacity
+        self.ms_per_token = ms_per_token
+        self.in_flight = 0
+        self.rate_limited = 0
+        self.rng = random.Random(seed)
+
+    async def create(self, **kwargs):
+        if self.in_flight >= self.capacity:
+            self.rate_limited += 1
+            await asyncio.sleep(0.005)
+            raise RateLimited("429 Too Many Requests")
+
+        self.in_flight += 1
+        try:
+            # Latency climbs once the provider is more than half busy
+            load = max(0.0, self.in_flight / self.capacity - 0.5) * 4
+            tokens = self.rng.randint(50, 300)
+            await asyncio.sleep((tokens + 32) * self.ms_per_token * (1 + load) / 1000)
+        finally:
+            self.in_flight -= 1
+
+        usage = type("Usage", (), {
+            "prompt_tokens": 200, "completion_tokens": tokens, "total_tokens": 200 + tokens
+        })()
+        message = type("Message", (), {"content": "ok"})()
+        choice = type("Choice", (), {"message": message})()
+        return type("Response", (), {"choices": [choice], "usage": usage})()
+
+
+class _BenchAgent(BaseAgent):
+    async def process(self, user_message, context=None):
+        return {}
+
+
+async def _with_retries(call, backoff_s: float):
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            if "429" not in str(e):
+                raise
+            await asyncio.sleep(backoff_s)
+
+
+async def _run(args, scheduled: bool):
+    provider = SimulatedProvider(args.capacity, args.ms_per_token, args.seed)
+    agent = _BenchAgent("bench", "bench-model", 0.0, 300, "")
+    agent.client = type("Client", (), {})()
+    agent.client.chat = type("Chat", (), {})()
+    agent.client.chat.completions = provider
+
+    messages = [{"role": "user", "content": "benchmark"}]
+    if scheduled:
+        call = lambda: agent.call_openai(messages)  # noqa: E731
+    else:
+        call = lambda: provider.create(model="bench-model", messages=messages)  # noqa: E731
+
+    stop_at = time.monotonic() + args.seconds
+    batch_done = 0
+    interactive_ms = []
+
+    async def batch_worker():
+        nonlocal batch_done
+        with llm_priority(PRIORITY_BATCH):
+            while time.monotonic() < stop_at:
+                await _with_retries(call, args.backoff_ms / 1000)
+                batch_done += 1
+
+    async def interactive_call():
+        with llm_priority(PRIORITY_INTERACTIVE):
+            start_time = time.monotonic()
+            await _with_retries(call, args.backoff_ms / 1000)
+            interactive_ms.append((time.monotonic() - start_time) * 1000)
+
+    async def interactive_arrivals():
+        rng = random.Random(args.seed + 1)
+        calls = []
+        while time.monotonic() < stop_at:
+            calls.append(asyncio.ensure_future(interactive_call()))
+            await asyncio.sleep(rng.expovariate(args.interactive_rate))
+        await asyncio.gather(*calls)
+
+    await asyncio.gather(interactive_arrivals(), *[batch_worker() for _ in range(args.batch_workers)])
+
+    interactive_ms.sort()
+    report = {
+        "interactive_calls": len(interactive_ms),
+        "interactive_p50_ms": round(statistics.median(interactive_ms), 1),
+        "interactive_p95_ms": round(interactive_ms[int(len(interactive_ms) * 0.95) - 1], 1),
+        "batch_calls_per_second": round(batch_done / args.seconds, 1),
+        "provider_429s": provider.rate_limited,
+    }
+    if scheduled:
+        report["scheduler"] = llm_scheduler.get_metrics()["bench-model"]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM scheduler against a rate-limited provider")
+    parser.add_argument("--capacity", type=int, default=24, help="Provider concurrency before 429s")
+    parser.add_argument("--ms-per-token", type=float, default=0.3)
+    parser.add_argument("--batch-workers", type=int, default=64)
+    parser.add_argument("--interactive-rate", type=float, default=20.0, help="Interactive calls per second")
+    parser.add_argument("--backoff-ms", type=float, default=100.0, help="Retry delay after a 429")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "unscheduled": asyncio.run(_run(args, scheduled=False)),
+        "scheduled": asyncio.run(_run(args, scheduled=True)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
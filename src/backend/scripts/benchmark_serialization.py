@@ -0,0 +1,123 @@
+"""
+Serialization Benchmark
+Compares per-request JSON CPU cost of the old dict path against the typed/orjson path
+
+Usage:
+    python scripts/benchmark_serialization.py
+    python scripts/benchmark_serialization.py --iterations 50000
+
+Both paths decode a representative /api/chat request body and encode a
+representative response:
+    - dict:  json.loads + manual checks, jsonable_encoder + JSONResponse (stdlib json)
+    - typed: ChatRequest.model_validate_json + FastJSONResponse (orjson) with the
+             pre-serialized follow_up_suggestions fragment
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from app.schemas.chat import ChatRequest  # noqa: E402
+from app.utils.responses import FastJSONResponse, fragment  # noqa: E402
+
+
+REQUEST_BODY = json.dumps({
+    "user_id": "7f8a3c1e-5b2d-4e6f-9a0b-1c2d3e4f5a6b",
+    "message": "Explain how a partner's outside basis changes when the partnership takes on debt",
+    "context": {
+        "ready_score": 87,
+        "exam_part": 2,
+        "weak_areas": ["Partnerships", "Basis", "Depreciation"],
+        "conversation_history": [
+            {"role": "user", "content": "What is outside basis?"},
+            {"role": "assistant", "content": "Outside basis is the partner's basis in the partnership interest. " * 8},
+        ],
+    },
+}).encode()
+
+SUGGESTIONS = [
+    "Can you explain this with an example?",
+    "What are common exam traps for this topic?",
+    "Generate a practice question on this",
+]
+SUGGESTIONS_FRAGMENT = fragment(SUGGESTIONS)
+
+
+def _response(follow_ups):
+    return {
+        "success": True,
+        "routing": {
+            "agent": "TAX_SPECIALIST",
+            "confidence": 0.83,
+            "reasoning": "Keyword analysis matched 3 patterns for TAX_SPECIALIST",
+            "should_use_rag": True,
+            "routing_method": "keyword",
+        },
+        "response": "When a partnership incurs a liability, each partner's share is treated as a "
+                    "contribution of money under IRC §752(a), increasing outside basis. " * 20,
+        "citations": [
+            {"source": "Pub 541", "page": 23 + i, "text": "Partner's share of liabilities... " * 5,
+             "relevance_score": 0.91 - i * 0.05}
+            for i in range(3)
+        ],
+        "follow_up_suggestions": follow_ups,
+        "metadata": {"tokens_used": 1432, "latency_ms": 2210, "cost": 0.0387},
+    }
+
+
+def dict_path() -> bytes:
+    request = json.loads(REQUEST_BODY)
+    if not request.get("message"):
+        raise ValueError("Message is required")
+    context = request.get("context", {})  # noqa: F841
+    return JSONResponse(jsonable_encoder(_response(list(SUGGESTIONS)))).body
+
+
+def typed_path() -> bytes:
+    request = ChatRequest.model_validate_json(REQUEST_BODY)
+    context = request.context.model_dump(exclude_none=True)  # noqa: F841
+    return FastJSONResponse(_response(SUGGESTIONS_FRAGMENT)).body
+
+
+def measure(fn, iterations: int) -> dict:
+    for _ in range(min(1000, iterations)):
+        fn()
+
+    start_cpu = time.process_time()
+    for _ in range(iterations):
+        fn()
+    cpu = time.process_time() - start_cpu
+
+    return {
+        "iterations": iterations,
+        "cpu_us_per_request": round(cpu / iterations * 1e6, 2),
+        "response_bytes": len(fn()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark request/response JSON CPU cost")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    assert json.loads(dict_path()) == json.loads(typed_path()), "paths must produce the same JSON"
+
+    baseline = measure(dict_path, args.iterations)
+    typed = measure(typed_path, args.iterations)
+
+    print(json.dumps({
+        "dict_stdlib": baseline,
+        "typed_orjson": typed,
+        "speedup": round(baseline["cpu_us_per_request"] / typed["cpu_us_per_request"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
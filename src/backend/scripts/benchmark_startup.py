@@ -0,0 +1,136 @@
+"""
+Startup Benchmark
+Measures import time of app.main and worker boot time with and without preloading
+
+Usage:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 10 --top 25
+
+Reports:
+    - wall-clock `import app.main` in a fresh interpreter (median of N runs)
+    - the slowest modules by cumulative import time (python -X importtime)
+    - per-asset preload time
+    - worker startup (lifespan) time cold vs. forked from a preloaded parent
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def measure_import(runs: int) -> dict:
+    """Median wall time of `import app.main` in a fresh interpreter"""
+    code = (
+        "import time; t = time.perf_counter(); import app.main; "
+        "print(time.perf_counter() - t)"
+    )
+    samples = [float(_run_python(code).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return {
+        "runs": runs,
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def slowest_imports(top: int) -> list:
+    """Top modules by cumulative import time"""
+    stderr = _run_python("import app.main", "-X", "importtime").stderr
+
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, module = [
+            part.strip() for part in line[len("import time:"):].split("|")
+        ]
+        rows.append((int(cumulative_us), int(self_us), module))
+
+    rows.sort(reverse=True)
+    return [
+        {"module": module, "cumulative_ms": round(cum / 1000, 1), "self_ms": round(own / 1000, 1)}
+        for cum, own, module in rows[:top]
+    ]
+
+
+async def _lifespan_seconds() -> float:
+    import app.main as main
+
+    start_time = time.perf_counter()
+    async with main.lifespan(main.app):
+        elapsed = time.perf_counter() - start_time
+    return elapsed
+
+
+def measure_worker_startup() -> dict:
+    """Worker boot cold vs. forked from a parent that already preloaded"""
+    cold_code = (
+        "import asyncio, sys; sys.path.insert(0, 'scripts'); "
+        "from benchmark_startup import _lifespan_seconds; "
+        "print(asyncio.run(_lifespan_seconds()))"
+    )
+    cold = float(_run_python(cold_code).stdout.strip().splitlines()[-1])
+
+    from app import preload
+    import app.main  # noqa: F401  (the gunicorn master imports the app before forking)
+
+    preload_timings = preload.preload_all()
+
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        with open(os.devnull, "w") as devnull:
+            sys.stdout = devnull
+            elapsed = asyncio.run(_lifespan_seconds())
+        os.write(write_fd, str(elapsed).encode())
+        os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        forked = float(pipe.read())
+    os.waitpid(pid, 0)
+
+    return {
+        "preload_ms": {name: round(s * 1000, 1) for name, s in preload_timings.items()},
+        "cold_worker_startup_ms": round(cold * 1000, 1),
+        "forked_worker_startup_ms": round(forked * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark API import and worker startup time")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-interpreter import runs")
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    report = {
+        "import_app_main": measure_import(args.runs),
+        "slowest_imports": slowest_imports(args.top),
+    }
+    if hasattr(os, "fork"):
+        report["worker_startup"] = measure_worker_startup()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Vector Store Build
+Embeds IRS publication chunks and writes one partition per publication
+
+Usage:
+    python scripts/build_vector_store.py data/processed/chunks.jsonl
+    python scripts/build_vector_store.py chunks.jsonl --output data/vector_store --publications pub_541 circular_230
+
+Each input line is a chunk:
+    {"publication": "pub_541", "page": 23, "text": "...", "source": "Pub 541"}
+
+Embeddings go through the content-addressed cache, so rebuilding after a
+publication update only pays for chunks whose text changed. Partitions
+with at least RAG_ANN_MIN_CHUNKS chunks also get an IVF index.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings, IRS_PUBLICATIONS  # noqa: E402
+from app.rag.embeddings import Embedder  # noqa: E402
+from app.rag.vector_store import VectorStore  # noqa: E402
+
+
+def _read_chunks(path: str):
+    by_publication = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                chunk = json.loads(line)
+                by_publication.setdefault(chunk.pop("publication"), []).append(chunk)
+    return by_publication
+
+
+async def _build(by_publication, embedder: Embedder) -> VectorStore:
+    store = VectorStore()
+    for publication, chunks in by_publication.items():
+        vectors = await embedder.embed_many([chunk["text"] for chunk in chunks])
+        store.add(publication, chunks, vectors)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the partitioned RAG vector store")
+    parser.add_argument("chunks", help="JSONL file of publication chunks")
+    parser.add_argument("--output", help="Store directory (default VECTOR_STORE_DIR)")
+    parser.add_argument("--publications", nargs="+", help="Only (re)build these partitions")
+    parser.add_argument("--ann-min-chunks", type=int, help="Index partitions at least this large")
+    parser.add_argument("--nlist", type=int, help="IVF cells (default ~4*sqrt(chunks))")
+    args = parser.parse_args()
+
+    by_publication = _read_chunks(args.chunks)
+    if args.publications:
+        by_publication = {p: c for p, c in by_publication.items() if p in args.publications}
+
+    unknown = sorted(set(by_publication) - set(IRS_PUBLICATIONS))
+    if unknown:
+        print(f"Warning: not in IRS_PUBLICATIONS (never matched by exam-part filters): {unknown}")
+
+    embedder = Embedder()
+    start_time = time.time()
+    store = asyncio.run(_build(by_publication, embedder))
+    embedder.cache.close()
+    store.build_index(min_chunks=args.ann_min_chunks, nlist=args.nlist)
+    store.save(args.output or settings.VECTOR_STORE_DIR)
+
+    print(json.dumps({
+        **store.get_metrics(),
+        "elapsed_seconds": round(time.time() - start_time, 3),
+        "embeddings": embedder.get_metrics(),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Question Bank Deduplication
+Removes near-duplicate questions from an existing bank using MinHash/LSH
+
+Usage:
+    python scripts/dedup_question_bank.py data/question_bank.jsonl data/question_bank.dedup.jsonl
+    python scripts/dedup_question_bank.py bank.jsonl out.jsonl --duplicates dups.jsonl --threshold 0.85
+
+The first occurrence of each near-duplicate cluster is kept.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings  # noqa: E402
+from app.services.question_dedup import NearDuplicateIndex  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove near-duplicate questions from a bank")
+    parser.add_argument("input", help="Question bank JSONL")
+    parser.add_argument("output", help="Deduplicated JSONL to write")
+    parser.add_argument("--duplicates", help="Optional JSONL of dropped questions with their match")
+    parser.add_argument("--threshold", type=float, default=settings.DEDUP_THRESHOLD)
+    parser.add_argument("--bands", type=int, default=settings.DEDUP_BANDS)
+    args = parser.parse_args()
+
+    index = NearDuplicateIndex(bands=args.bands, threshold=args.threshold)
+    start_time = time.time()
+    total = kept = 0
+
+    dup_file = open(args.duplicates, "w", encoding="utf-8") if args.duplicates else None
+    try:
+        with open(args.input, "r", encoding="utf-8") as src, \
+                open(args.output, "w", encoding="utf-8") as out:
+            for line in src:
+                if not line.strip():
+                    continue
+                question = json.loads(line)
+                question_id = question.get("id") or f"line{total}"
+                total += 1
+
+                duplicate = index.check_and_insert(question_id, question)
+                if duplicate is None:
+                    out.write(line if line.endswith("\n") else line + "\n")
+                    kept += 1
+                elif dup_file:
+                    dup_file.write(json.dumps({
+                        "id": question_id,
+                        "duplicate_of": duplicate[0],
+                        "similarity": duplicate[1],
+                        "question": question.get("question", ""),
+                    }) + "\n")
+    finally:
+        if dup_file:
+            dup_file.close()
+
+    elapsed = time.time() - start_time
+    print(json.dumps({
+        "total": total,
+        "kept": kept,
+        "removed": total - kept,
+        "elapsed_seconds": round(elapsed, 3),
+        "questions_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Ethics Scenario Generation
+Drafts branching Circular 230 roleplay trees for every Part 3 topic
+
+Usage:
+    python scripts/generate_ethics_scenarios.py data/ethics_scenarios.jsonl --per-topic 5
+    python scripts/generate_ethics_scenarios.py scenarios.jsonl --topics "Power of Attorney" --depth 4 --branching 3
+
+Every draft is compiled with ScenarioStore before it is written, so the
+output only holds trees the API can serve; a rejected draft is retried
+up to --max-attempts times. Rerunning with the same output file resumes:
+scenarios already written count toward each topic's quota.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings, EXAM_PARTS  # noqa: E402
+from app.agents.ethics_judge import EthicsJudgeAgent  # noqa: E402
+from app.agents.llm_scheduler import llm_priority, PRIORITY_BATCH  # noqa: E402
+from app.services.ethics_scenarios import ScenarioStore  # noqa: E402
+
+
+def _written_per_topic(path: str):
+    counts = {}
+    if not os.path.exists(path):
+        return counts
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                topic = json.loads(line)["topic"]
+            except (ValueError, KeyError):
+                continue  # Torn last line from an interrupted run
+            counts[topic] = counts.get(topic, 0) + 1
+    return counts
+
+
+async def _generate(args, agent: EthicsJudgeAgent):
+    written = _written_per_topic(args.output)
+    slots = [
+        topic
+        for topic in args.topics
+        for _ in range(max(0, args.per_topic - written.get(topic, 0)))
+    ]
+    concurrency = args.concurrency if args.concurrency is not None else settings.ETHICS_GEN_CONCURRENCY
+    semaphore = asyncio.Semaphore(concurrency)
+    stats = {"written": 0, "rejected": 0, "failed": 0, "skipped": sum(written.values())}
+
+    with open(args.output, "a", encoding="utf-8") as out:
+        async def fill(topic: str):
+            async with semaphore:
+                for _ in range(args.max_attempts):
+                    try:
+                        scenario = await agent.draft_scenario(topic, args.depth, args.branching)
+                    except Exception:
+                        stats["failed"] += 1
+                        continue
+                    scenario["id"] = f"eth-{uuid.uuid4().hex[:10]}"
+                    if ScenarioStore().add(scenario) is None:
+                        stats["rejected"] += 1
+                        continue
+                    out.write(json.dumps(scenario) + "\n")
+                    out.flush()
+                    stats["written"] += 1
+                    return
+
+        with llm_priority(PRIORITY_BATCH):
+            await asyncio.gather(*[fill(topic) for topic in slots])
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate ethics roleplay scenario trees")
+    parser.add_argument("output", help="JSONL file to append scenarios to (resumed if it exists)")
+    parser.add_argument("--per-topic", type=int, default=5, help="Scenarios per Part 3 topic")
+    parser.add_argument("--topics", nargs="+", default=EXAM_PARTS[3]["topics"], choices=EXAM_PARTS[3]["topics"])
+    parser.add_argument("--depth", type=int, default=3, help="Decisions along the ethical path")
+    parser.add_argument("--branching", type=int, default=3, help="Choices per decision")
+    parser.add_argument("--concurrency", type=int, help="Drafting calls in flight")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Drafts per slot before giving up")
+    args = parser.parse_args()
+
+    agent = EthicsJudgeAgent()
+    stats = asyncio.run(_generate(args, agent))
+
+    print(json.dumps({**stats, "agent": agent.get_metrics()}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Nightly Mission Generation
+Precomputes every active user's daily missions and writes them in bulk
+
+Usage:
+    python scripts/generate_missions.py users.jsonl missions.jsonl
+    python scripts/generate_missions.py users.jsonl missions.jsonl --date 2025-01-15 --workers 8
+    python scripts/generate_missions.py users.jsonl missions.jsonl --flavor
+
+Each input line is a user snapshot:
+    {"user_id": "...", "ready_score": 87, "exam_part": 2,
+     "weak_areas": ["Partnerships"], "due_reviews": ["Basis"], "study_streak_days": 4}
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.mission_generator import generate_missions_batch, add_flavor_text  # noqa: E402
+
+
+def _read_users(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate daily missions for all active users")
+    parser.add_argument("users", help="JSONL file of user snapshots")
+    parser.add_argument("output", help="JSONL file to write daily_missions rows to")
+    parser.add_argument("--date", help="Assigned date (YYYY-MM-DD), defaults to tomorrow")
+    parser.add_argument("--workers", type=int, help="Process pool size")
+    parser.add_argument("--chunk-size", type=int, help="Users per worker task")
+    parser.add_argument("--flavor", action="store_true", help="Add LLM flavor text to descriptions")
+    args = parser.parse_args()
+
+    assigned_date = (
+        date.fromisoformat(args.date) if args.date else date.today() + timedelta(days=1)
+    )
+
+    with open(args.output, "w", encoding="utf-8") as out:
+        buffered = []
+
+        def write_rows(rows):
+            if args.flavor:
+                buffered.extend(rows)
+                return
+            out.write("".join(json.dumps(row) + "\n" for row in rows))
+
+        report = generate_missions_batch(
+            _read_users(args.users),
+            assigned_date,
+            write_rows,
+            workers=args.workers,
+            chunk_size=args.chunk_size
+        )
+
+        if args.flavor:
+            from app.agents.mission_flavor import MissionFlavorAgent
+
+            agent = MissionFlavorAgent()
+            report["flavored"] = asyncio.run(add_flavor_text(buffered, agent))
+            report["flavor_cost"] = round(agent.total_cost, 4)
+            out.write("".join(json.dumps(row) + "\n" for row in buffered))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
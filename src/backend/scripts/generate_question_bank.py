@@ -0,0 +1,116 @@
+"""
+Bulk Question Bank Generation
+Seeds the exam simulator with generated practice questions for every blueprint topic
+
+Usage:
+    python scripts/generate_question_bank.py data/question_bank.jsonl --per-topic 500
+    python scripts/generate_question_bank.py bank.jsonl --parts 2 --quota Partnerships=900 --concurrency 32
+    python scripts/generate_question_bank.py /tmp/bank.jsonl --per-topic 60 --fake-llm --fake-latency-ms 800
+
+Rerunning with the same output file resumes: questions already written
+count toward the quotas, and only the missing ones are generated. Run
+counters (tokens, cost) are kept in <output>.checkpoint.json.
+
+Each question slot costs at most --max-attempts LLM calls (rejected
+duplicates and invalid items included), so a worst-case budget is
+slots x max-attempts calls; the report shows that bound (max_llm_calls)
+next to the calls actually made.
+
+--fake-llm answers from a local generator instead of OpenAI (no key or
+network needed), for testing throughput, validation and resume.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.question_bank import DIFFICULTIES  # noqa: E402
+from app.services.question_dedup import NearDuplicateIndex  # noqa: E402
+from app.services.question_generator import (  # noqa: E402
+    FakeQuestionLLM,
+    generate_question_bank,
+    plan_quotas,
+    read_progress,
+)
+
+
+def _parse_quota(value: str):
+    topic, _, count = value.rpartition("=")
+    if not topic or not count.isdigit():
+        raise argparse.ArgumentTypeError(f"expected TOPIC=COUNT, got {value!r}")
+    return topic, int(count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a practice question bank")
+    parser.add_argument("output", help="JSONL file to append questions to (resumed if it exists)")
+    parser.add_argument("--per-topic", type=int, default=100, help="Questions per topic")
+    parser.add_argument("--parts", type=int, nargs="+", help="Exam parts to cover (default all)")
+    parser.add_argument("--difficulties", nargs="+", default=list(DIFFICULTIES), choices=DIFFICULTIES)
+    parser.add_argument("--quota", type=_parse_quota, action="append", default=[],
+                        help="Per-topic override, e.g. Partnerships=900 (repeatable)")
+    parser.add_argument("--concurrency", type=int, help="Generation calls in flight")
+    parser.add_argument("--max-attempts", type=int, help="Tries (LLM calls) per question slot")
+    parser.add_argument("--checkpoint-every", type=int, help="Questions between checkpoints")
+    parser.add_argument("--existing-bank", help="JSONL bank whose questions must not be repeated")
+    parser.add_argument("--no-dedup", action="store_true", help="Skip near-duplicate rejection")
+    parser.add_argument("--fake-llm", action="store_true", help="Use the local fake LLM")
+    parser.add_argument("--fake-latency-ms", type=int, default=800)
+    parser.add_argument("--fake-invalid-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, help="Fake LLM seed")
+    args = parser.parse_args()
+
+    if args.fake_llm:
+        # The agent reads these at construction; nothing is sent anywhere
+        for name in ("OPENAI_API_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_JWT_SECRET"):
+            os.environ.setdefault(name, "fake")
+
+    from app.agents.tax_specialist import TaxSpecialistAgent
+
+    dedup_index = None
+    if not args.no_dedup:
+        dedup_index = NearDuplicateIndex()
+        _, written = read_progress(args.output)
+        for position, question in enumerate(written):
+            dedup_index.insert(question.get("id") or f"out{position}", question)
+        if args.existing_bank:
+            _, existing = read_progress(args.existing_bank)
+            for position, question in enumerate(existing):
+                dedup_index.insert(question.get("id") or f"bank{position}", question)
+
+    agent = TaxSpecialistAgent(rag_retriever=None, dedup_index=dedup_index)
+    if args.fake_llm:
+        agent.call_openai = FakeQuestionLLM(
+            agent,
+            latency_ms=args.fake_latency_ms,
+            invalid_rate=args.fake_invalid_rate,
+            seed=args.seed
+        )
+
+    quotas = plan_quotas(
+        args.per_topic,
+        exam_parts=args.parts,
+        difficulties=args.difficulties,
+        overrides=dict(args.quota)
+    )
+
+    report = asyncio.run(generate_question_bank(
+        agent,
+        quotas,
+        args.output,
+        concurrency=args.concurrency,
+        max_attempts=args.max_attempts,
+        checkpoint_every=args.checkpoint_every
+    ))
+    if dedup_index is not None:
+        report["dedup"] = dedup_index.get_metrics()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Shared test setup
+Settings requires secrets at first access; tests never talk to these services
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+for _name in ("OPENAI_API_KEY", "SUPABASE_URL", "SUPABASE_KEY", "SUPABASE_JWT_SECRET", "SECRET_KEY"):
+    os.environ.setdefault(_name, "test")
@@ -0,0 +1,60 @@
+"""
+API Schema Tests
+Endpoints serialized with orjson still return what their documented models describe
+"""
+
+from fastapi.testclient import TestClient
+
+from app import main
+from app.schemas.chat import ChatResponse
+from app.schemas.questions import QuestionGenerateResponse
+from app.services.answer_key import AnswerKey
+
+QUESTION = {
+    "question": "A partner contributes land with a basis of $10,000. What is the partner's outside basis?",
+    "options": ["A) $0", "B) $5,000", "C) $10,000", "D) $20,000"],
+    "correct_answer": 2,
+    "explanation": "Outside basis starts at the basis of contributed property.",
+    "irs_citation": "Pub 541",
+    "topic": "Partnerships",
+    "difficulty": "medium",
+}
+
+
+class _Orchestrator:
+    async def process(self, message, context):
+        return {"agent": "TAX_SPECIALIST", "confidence": 0.9, "routing_method": "keyword"}
+
+
+class _Specialist:
+    async def process(self, message, context):
+        return {
+            "content": "Per Pub 541, outside basis starts at $10,000.",
+            "citations": [{"source": "Pub 541", "page": 3, "text": "Basis of...", "relevance_score": 0.91}],
+            "tokens_used": 120, "latency_ms": 40, "cost": 0.002,
+        }
+
+    async def generate_practice_question(self, topic, difficulty, user_context=None):
+        return dict(QUESTION, topic=topic, difficulty=difficulty)
+
+    def remember_question(self, question):
+        pass
+
+
+def test_chat_and_generate_match_their_documented_models(monkeypatch):
+    monkeypatch.setattr(main, "orchestrator", _Orchestrator())
+    monkeypatch.setattr(main, "tax_specialist", _Specialist())
+    monkeypatch.setattr(main, "answer_key", AnswerKey())
+    client = TestClient(main.app)  # No lifespan: the agents above stand in
+
+    chat = client.post("/api/chat", json={"message": "What is my outside basis?"})
+    assert chat.status_code == 200
+    ChatResponse.model_validate(chat.json())
+
+    generated = client.post("/api/questions/generate", json={"topic": "Partnerships"})
+    assert generated.status_code == 200
+    QuestionGenerateResponse.model_validate(generated.json())
+
+    # The models still appear in the OpenAPI document
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    assert {"ChatResponse", "QuestionGenerateResponse"} <= set(schemas)
@@ -0,0 +1,51 @@
+"""
+Attempt Ingest Tests
+A malformed row must reject the whole batch without touching any aggregate
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from app.schemas.performance import AttemptBatchRequest
+from app.services.mastery_store import MasteryStore
+from app.services.rollup_store import RollupStore
+
+
+VALID = {
+    "user_id": "u1",
+    "question_topic": "Partnerships",
+    "is_correct": True,
+    "time_spent_seconds": 30,
+    "attempted_at": "2025-01-15T18:04:00",
+}
+
+
+@pytest.mark.parametrize("bad", [
+    {"user_id": "u1", "question_topic": "Partnerships", "is_correct": "false"},
+    {"user_id": "u1", "question_topic": "Partnerships"},
+    {"user_id": "u1", "question_topic": "Partnerships", "is_correct": False, "attempted_at": "yesterday"},
+])
+@pytest.mark.parametrize("store_class", [MasteryStore, RollupStore])
+def test_bad_row_leaves_store_untouched(store_class, bad):
+    store = store_class()
+
+    with pytest.raises((KeyError, TypeError, ValueError)):
+        store.record_attempts([VALID, bad])
+
+    assert store.get_metrics() == store_class().get_metrics()
+    if isinstance(store, MasteryStore):
+        assert store.version("u1") == 0
+        assert store.last_active("u1") is None
+
+
+def test_request_model_rejects_batch_with_bad_row():
+    with pytest.raises(ValidationError):
+        AttemptBatchRequest.model_validate({"attempts": [VALID, {"user_id": "u1", "is_correct": "maybe"}]})
+
+
+def test_request_model_rows_ingest():
+    request = AttemptBatchRequest.model_validate({"attempts": [VALID, dict(VALID, is_correct="false")]})
+    store = MasteryStore()
+
+    assert store.record_attempts([a.model_dump(mode="json") for a in request.attempts]) == 2
+    assert store.user_topics("u1")["Partnerships"]["attempts"] == 2
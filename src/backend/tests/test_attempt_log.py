@@ -0,0 +1,72 @@
+"""
+Attempt Log Tests
+Every worker's aggregates converge on the shared log, and a restart rebuilds them
+"""
+
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.services.attempt_log import AttemptLog
+from app.services.dashboard import dashboard_etag
+from app.services.mastery_store import MasteryStore
+from app.services.mission_generator import MissionStore
+from app.services.rollup_store import RollupStore
+
+
+def _attempts(n):
+    return [
+        {
+            "user_id": "u1",
+            "question_topic": ["Partnerships", "Penalties", "Basis"][i % 3],
+            "is_correct": i % 4 != 0,
+            "time_spent_seconds": 20 + i,
+            "attempted_at": f"2026-01-{1 + i % 5:02d}T10:00:00",
+        }
+        for i in range(n)
+    ]
+
+
+def _worker(path):
+    log = AttemptLog([], path=path)
+    mastery, rollups = MasteryStore(min_attempts=1, history_id=log.log_id), RollupStore()
+    log.sinks = [mastery.record_attempts, rollups.record_attempts]
+    return log, mastery, rollups
+
+
+def test_workers_converge_and_restart_rebuilds(tmp_path):
+    path = str(tmp_path / "attempts.sqlite3")
+    today = date(2026, 1, 5)
+
+    async def run():
+        log_a, mastery_a, rollups_a = _worker(path)
+        log_b, mastery_b, rollups_b = _worker(path)
+        await log_a.append(_attempts(30))
+        await log_b.append(_attempts(7))  # Applies worker A's rows first, in log order
+        await log_a.sync()
+
+        restarted = _worker(path)
+        await restarted[0].sync()
+        return (mastery_a, rollups_a), (mastery_b, rollups_b), restarted[1:]
+
+    workers = asyncio.run(run())
+    missions = MissionStore()
+    for mastery, rollups in workers:
+        assert mastery.version("u1") == 37
+        assert mastery.user_topics("u1") == workers[0][0].user_topics("u1")
+        assert mastery.weak_areas("u1") == workers[0][0].weak_areas("u1")
+        assert rollups.heatmap("u1", date(2026, 1, 1), today, "day", today=today) == \
+            workers[0][1].heatmap("u1", date(2026, 1, 1), today, "day", today=today)
+        assert dashboard_etag("u1", mastery, missions, today) == \
+            dashboard_etag("u1", workers[0][0], missions, today)
+
+
+def test_malformed_batch_is_not_logged(tmp_path):
+    log, mastery, _ = _worker(str(tmp_path / "attempts.sqlite3"))
+    bad = _attempts(2) + [{"user_id": "u1", "question_topic": "Basis", "is_correct": "yes"}]
+
+    with pytest.raises(TypeError):
+        asyncio.run(log.append(bad))
+    assert asyncio.run(log.sync()) == 0
+    assert mastery.version("u1") == 0
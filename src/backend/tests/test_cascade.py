@@ -0,0 +1,79 @@
+"""
+Cascade Tests
+Paraphrased fast answers pass the gate; failing ones escalate to the large model
+"""
+
+import asyncio
+
+from app.agents.cascade import answers_agree, quality_gate
+from app.agents.tax_specialist import TaxSpecialistAgent
+from app.config import settings
+
+
+def test_paraphrases_with_the_same_conclusion_agree():
+    first = (
+        "Under IRC Section 179 the business can expense the equipment. "
+        "Therefore, the deduction for 2024 is $1,160,000."
+    )
+    second = (
+        "Per Pub 946, qualifying property may be written off immediately instead of depreciated; "
+        "so the taxpayer deducts $1,160,000.00 this year."
+    )
+    assert answers_agree(first, second)
+    assert answers_agree("Yes, the expense is deductible under Pub 535.", "You can deduct it (Pub 535).")
+    assert answers_agree("The correct answer is B because ...", "Answer: B. The basis carries over.")
+
+
+def test_different_conclusions_disagree():
+    assert not answers_agree("Therefore, the deduction is $2,500.", "So you can deduct $3,000.")
+    assert not answers_agree("The expense is deductible.", "The expense is not deductible.")
+    assert not answers_agree("The correct answer is B.", "The correct answer is C.")
+
+
+def test_quality_gate_reasons():
+    cited = "Per Pub 17, the standard deduction is $14,600."
+    assert quality_gate(cited, require_citation=True) is None
+    assert quality_gate("The standard deduction is $14,600.", require_citation=True) == "missing_citation"
+    assert quality_gate(cited, require_citation=True, second_answer="Per Pub 17 it is $13,850.") == "inconsistent"
+
+
+def _specialist(answers):
+    specialist = TaxSpecialistAgent()
+    calls = []
+
+    async def call_openai(messages, model=None, **kwargs):
+        calls.append(model or specialist.model)
+        content = answers[model or specialist.model]
+        return {
+            "content": content, "tokens_used": 100, "prompt_tokens": 60, "completion_tokens": 40,
+            "cost": 0.01, "latency_ms": 50, "model": model or specialist.model,
+        }
+
+    specialist.call_openai = call_openai
+    return specialist, calls
+
+
+def test_failed_gate_escalates_to_the_large_model(monkeypatch):
+    monkeypatch.setattr(settings, "CASCADE_SELF_CONSISTENCY", True)
+    messages = [{"role": "user", "content": "What is the standard deduction?"}]
+
+    specialist, calls = _specialist({
+        settings.OPENAI_MODEL_SPECIALIST_FAST: "Per Pub 17 the standard deduction is $14,600.",
+        settings.OPENAI_MODEL_SPECIALIST: "Per Pub 17 it is $14,600 for single filers.",
+    })
+    result, cascade = asyncio.run(specialist._cascade_generate(messages, "standard deduction", [], None))
+    assert cascade["escalated"] is False
+    assert calls == [settings.OPENAI_MODEL_SPECIALIST_FAST] * 2
+    assert result["cost"] == 0.02
+
+    specialist, calls = _specialist({
+        settings.OPENAI_MODEL_SPECIALIST_FAST: "The standard deduction is $14,600.",
+        settings.OPENAI_MODEL_SPECIALIST: "Per Pub 17 it is $14,600 for single filers.",
+    })
+    result, cascade = asyncio.run(specialist._cascade_generate(messages, "standard deduction", [], None))
+    assert cascade == {"topic": cascade["topic"], "escalated": True, "reason": "missing_citation"}
+    assert calls[-1] == settings.OPENAI_MODEL_SPECIALIST
+    assert result["content"].startswith("Per Pub 17")
+    assert result["cost"] == 0.03  # Discarded fast answers are still paid for
+    metrics = specialist.cascade_stats.get_metrics()["by_topic"][cascade["topic"]]
+    assert metrics["escalation_reasons"] == {"missing_citation": 1}
@@ -0,0 +1,82 @@
+"""
+Dashboard Tests
+ETags agree across workers with the same history; mission reloads are upserts
+"""
+
+import asyncio
+import json
+import os
+from datetime import date
+
+from app.services.dashboard import dashboard_etag
+from app.services.mastery_store import MasteryStore
+from app.services.mission_generator import MissionStore, build_missions
+
+
+def test_etag_depends_on_history_not_on_store_instance():
+    today = date(2026, 1, 5)
+    worker_a = (MasteryStore(history_id="log-1"), MissionStore())
+    worker_b = (MasteryStore(history_id="log-1"), MissionStore())
+    other_log = (MasteryStore(history_id="log-2"), MissionStore())
+
+    etag_a = dashboard_etag("u1", *worker_a, today=today)
+    assert dashboard_etag("u1", *worker_b, today=today) == etag_a
+    assert dashboard_etag("u1", *other_log, today=today) != etag_a
+
+    mission = {"id": "m0", "user_id": "u1", "assigned_date": "2026-01-05", "title": "Mission 0"}
+    worker_b[1].put_rows([mission])
+    assert dashboard_etag("u1", *worker_b, today=today) != etag_a
+
+
+def test_reloading_missions_upserts_without_bumping_version():
+    rows = [
+        {"id": f"m{slot}", "user_id": "u1", "assigned_date": "2026-01-05", "title": f"Mission {slot}"}
+        for slot in range(3)
+    ]
+    store = MissionStore()
+    store.put_rows(rows)
+    version = store.version("u1")
+
+    store.put_rows([dict(row) for row in rows])
+    assert len(store.get("u1", date(2026, 1, 5))) == 3
+    assert store.version("u1") == version
+
+    store.put_rows([dict(rows[1], title="Rewritten")])
+    missions = store.get("u1", date(2026, 1, 5))
+    assert [m["title"] for m in missions] == ["Mission 0", "Rewritten", "Mission 2"]
+    assert store.version("u1") == version + 1
+
+
+def test_mission_file_is_reloaded_when_it_changes_or_the_day_rolls_over(tmp_path):
+    path = tmp_path / "daily_missions.jsonl"
+    monday, tuesday = date(2026, 1, 5), date(2026, 1, 6)
+
+    def write(day: date, title: str, mtime: int) -> None:
+        row = {"id": f"m-{day}", "user_id": "u1", "assigned_date": day.isoformat(), "title": title}
+        path.write_text(json.dumps(row) + "\n", encoding="utf-8")
+        os.utime(path, (mtime, mtime))
+
+    store = MissionStore(str(path))
+    assert asyncio.run(store.refresh(monday)) == 0  # No batch output yet
+
+    write(monday, "Monday", 1000)
+    assert asyncio.run(store.refresh(monday)) == 1
+    assert asyncio.run(store.refresh(monday)) == 0
+
+    write(monday, "Monday, rewritten", 2000)
+    asyncio.run(store.refresh(monday))
+    assert [m["title"] for m in store.get("u1", monday)] == ["Monday, rewritten"]
+
+    # Tonight's batch replaces yesterday's missions
+    write(tuesday, "Tuesday", 3000)
+    asyncio.run(store.refresh(tuesday))
+    assert [m["title"] for m in store.get("u1", tuesday)] == ["Tuesday"]
+    assert store.get("u1", monday) == []
+
+
+def test_missing_snapshot_fields_use_defaults():
+    user = {"user_id": "u1", "ready_score": None, "study_streak_days": None, "weak_areas": None}
+    missions = build_missions(user, date(2026, 1, 5))
+
+    assert missions[0]["title"] == "Foundational Concepts Review"
+    assert all(m["xp_reward"] > 0 for m in missions)
@@ -0,0 +1,64 @@
+"""
+Deadline Tests
+A slow routing call must leave the specialist budget to answer with
+"""
+
+import asyncio
+
+from app.agents.orchestrator import OrchestratorAgent
+from app.agents.tax_specialist import TaxSpecialistAgent
+from app.config import settings
+from app.utils.deadline import Deadline
+
+
+def test_slow_ai_routing_is_capped_and_falls_back():
+    orchestrator = OrchestratorAgent()
+    timeouts = []
+
+    async def hanging_call(messages, timeout=None, **kwargs):
+        timeouts.append(timeout)
+        await asyncio.sleep(timeout)
+        raise asyncio.TimeoutError()
+
+    orchestrator.call_openai = hanging_call
+    context = {"deadline": Deadline(settings.REQUEST_DEADLINE_MS)}
+
+    routing = asyncio.run(orchestrator.process("hello there", context))
+
+    assert timeouts == [settings.ORCHESTRATOR_AI_ROUTING_TIMEOUT_MS / 1000]
+    assert routing["routing_method"] == "keyword_default"
+
+    # Most of the budget is left for the specialist's answer
+    assert context["deadline"].remaining_ms() > settings.SPECIALIST_LOW_BUDGET_MS
+    assert TaxSpecialistAgent()._budget(context) == (settings.TOP_K_RESULTS, None)
+
+
+def test_low_budget_is_degraded():
+    context = {"deadline": Deadline(settings.SPECIALIST_LOW_BUDGET_MS // 2)}
+
+    top_k, max_tokens = TaxSpecialistAgent()._budget(context)
+    assert top_k == max(settings.TOP_K_RESULTS // 2, 1)
+    assert max_tokens == settings.SPECIALIST_LOW_BUDGET_MAX_TOKENS
+
+
+def test_full_budget_is_not_degraded():
+    context = {"deadline": Deadline(settings.REQUEST_DEADLINE_MS)}
+
+    assert TaxSpecialistAgent()._budget(context) == (settings.TOP_K_RESULTS, None)
+
+
+def test_specialist_call_fits_the_hard_limit():
+    specialist = TaxSpecialistAgent()
+    context = {"deadline": Deadline(settings.REQUEST_DEADLINE_MS, hard_ms=settings.REQUEST_TIMEOUT_MS)}
+
+    limits = specialist._call_limits(context)
+    margin = settings.SPECIALIST_TIMEOUT_MARGIN_MS / 1000
+    assert limits["timeout"] <= settings.REQUEST_TIMEOUT_MS / 1000 - margin
+    # Generating max_tokens at the assumed rate finishes within the timeout
+    assert limits["max_tokens"] <= limits["timeout"] * settings.SPECIALIST_TOKENS_PER_SECOND
+    assert limits["max_tokens"] <= specialist.max_tokens
+
+    # A generous hard limit keeps the configured cap; no deadline means no timeout
+    roomy = {"deadline": Deadline(settings.REQUEST_DEADLINE_MS, hard_ms=3600 * 1000)}
+    assert specialist._call_limits(roomy, 300)["max_tokens"] == 300
+    assert specialist._call_limits(None) == {"max_tokens": specialist.max_tokens}
@@ -0,0 +1,53 @@
+"""
+Embedding Cache Tests
+Reads run off the event loop and writes are committed in batches
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+
+from app.rag.embedding_cache import EmbeddingCache
+
+
+def test_fetch_many_reads_sqlite_off_the_event_loop(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "cache.sqlite3"), hot_size=0)
+    cache.put_many("m", [("a", [1.0, 2.0]), ("b", [3.0, 4.0])])
+    cache.flush()
+
+    loop_thread = threading.get_ident()
+    read_threads = []
+    read = cache._read
+
+    def recording_read(keys):
+        read_threads.append(threading.get_ident())
+        return read(keys)
+
+    cache._read = recording_read
+    vectors = asyncio.run(cache.fetch_many("m", ["a", "c", "b"]))
+
+    assert read_threads and loop_thread not in read_threads
+    assert vectors[0].tolist() == [1.0, 2.0]
+    assert vectors[1] is None
+    assert vectors[2].tolist() == [3.0, 4.0]
+    cache.close()
+
+
+def test_queued_writes_are_committed_together_and_on_close(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = EmbeddingCache(path=path)
+    cache.put_many("m", [(f"t{i}", np.full(4, i)) for i in range(100)])
+    cache.put_many("m", [("t0", np.zeros(4))])  # Existing key: left as it is
+
+    # Visible in this process before the writer has committed
+    assert cache.get("m", "t5").tolist() == [5.0] * 4
+    cache.close()
+
+    assert cache.writes == 100
+    assert cache.write_batches <= 2
+
+    reopened = EmbeddingCache(path=path, hot_size=0)
+    assert len(reopened) == 100
+    assert reopened.get("m", "t7").tolist() == [7.0] * 4
+    reopened.close()
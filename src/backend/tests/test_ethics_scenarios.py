@@ -0,0 +1,123 @@
+"""
+Ethics Scenario Tests
+Free-text answers: matching, caching and validation of the judge's rulings
+"""
+
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import settings
+from app.schemas.ethics import EthicsVerdict
+from app.services.ethics_scenarios import ScenarioStore, FreeTextJudge, normalize_answer
+
+
+SCENARIO = {
+    "id": "s1",
+    "topic": "Circular 230 Ethics",
+    "root": "ask",
+    "nodes": {
+        "ask": {
+            "situation": "The client wants the return signed without the missing 1099 income.",
+            "prompt": "\"Just sign it, nobody will notice.\"",
+            "choices": [
+                {"text": "I will sign the return", "is_ethical": False, "reference": "§10.22",
+                 "outcome": "Willful understatement.", "practice_rights_impact": -30, "next": None},
+                {"text": "Refuse until the income is reported", "is_ethical": True, "reference": "§10.22",
+                 "outcome": "Due diligence upheld.", "practice_rights_impact": 10, "next": "end"},
+            ],
+        },
+        "end": {"situation": "The client agrees to amend.", "prompt": "\"Fine.\"", "choices": []},
+    },
+}
+
+
+class _Judge:
+    def __init__(self, verdict):
+        self.verdict = verdict
+        self.calls = 0
+
+    async def process(self, answer, context=None):
+        self.calls += 1
+        return EthicsVerdict.model_validate(self.verdict).model_dump()
+
+
+def _judge(verdict):
+    store = ScenarioStore([SCENARIO])
+    return store, FreeTextJudge(store, _Judge(verdict))
+
+
+@pytest.mark.parametrize("answer", ["I will not sign the return", "I won't sign the return"])
+def test_negated_choice_goes_to_the_judge(answer):
+    store, judge = _judge({"matches_choice": None, "is_ethical": True, "practice_rights_impact": 5})
+
+    result, source = asyncio.run(judge.answer(0, answer))
+
+    assert source == "llm"
+    assert judge.agent.calls == 1
+    assert result["outcome"]["is_ethical"] is True
+
+
+def test_scripted_choice_word_for_word_skips_the_judge():
+    store, judge = _judge({"is_ethical": False})
+
+    result, source = asyncio.run(judge.answer(0, "  i will SIGN the return. "))
+
+    assert source == "matched"
+    assert result["outcome"]["text"] == "I will sign the return"
+    assert judge.agent.calls == 0
+
+
+def test_ruling_is_cached():
+    store, judge = _judge({"matches_choice": 1, "is_ethical": True})
+
+    asyncio.run(judge.answer(0, "No, report the income first"))
+    result, source = asyncio.run(judge.answer(0, "no, report the income first!"))
+
+    assert source == "cache"
+    assert result["outcome"]["text"] == "Refuse until the income is reported"
+    assert judge.agent.calls == 1
+    assert normalize_answer("no, report the income first!") == "no report the income first"
+
+
+def test_verdict_fields_are_coerced():
+    verdict = EthicsVerdict.model_validate({
+        "matches_choice": True, "is_ethical": "true", "reference": None, "practice_rights_impact": None
+    })
+    assert verdict.matches_choice is None
+    assert verdict.is_ethical is True
+    assert verdict.reference == ""
+    assert verdict.practice_rights_impact == 0
+
+    assert EthicsVerdict.model_validate({"is_ethical": False, "practice_rights_impact": -500}).practice_rights_impact == -30
+    assert EthicsVerdict.model_validate({"is_ethical": False, "matches_choice": "1"}).matches_choice == 1
+
+
+def test_verdict_without_ruling_is_rejected():
+    with pytest.raises(ValidationError):
+        EthicsVerdict.model_validate({"matches_choice": None, "is_ethical": None})
+
+
+def test_out_of_range_match_becomes_a_learned_choice():
+    store, judge = _judge({"matches_choice": 7, "is_ethical": True, "practice_rights_impact": 99})
+
+    result, _ = asyncio.run(judge.answer(0, "Explain the penalty and document the refusal"))
+
+    assert result["outcome"]["text"] == "Explain the penalty and document the refusal"
+    assert result["outcome"]["practice_rights_impact"] == 10
+    assert result["next"]["node"] == 1  # Where the scripted ethical choice leads
+
+
+def test_learned_answers_are_capped_per_node(monkeypatch):
+    monkeypatch.setattr(settings, "ETHICS_MAX_LEARNED_PER_NODE", 3)
+    store, judge = _judge({"matches_choice": None, "is_ethical": False, "outcome": "No."})
+
+    for i in range(10):
+        result, source = asyncio.run(judge.answer(0, f"answer number {i}"))
+        assert source == "llm"
+        assert result["outcome"]["text"] == f"answer number {i}"
+
+    assert store.get_metrics()["learned_answers"] == 3
+    assert store.get_metrics()["choices"] == 2 + 3
+    assert judge.stats["llm_uncached"] == 7
@@ -0,0 +1,81 @@
+"""
+Exam Session Tests
+Adaptive sessions continue on any worker, expire when idle and reject double answers
+"""
+
+import asyncio
+
+from app.config import EXAM_PARTS
+from app.services.exam_assembler import AdaptiveExamSession
+from app.services.exam_sessions import ExamSessionStore
+from app.services.question_bank import QuestionBank, DIFFICULTIES
+
+
+def _bank() -> QuestionBank:
+    return QuestionBank(
+        {
+            "id": f"{topic}-{difficulty}-{i}",
+            "topic": topic,
+            "difficulty": difficulty,
+            "options": ["a", "b", "c", "d"],
+            "correct_answer": i % 4,
+        }
+        for topic in EXAM_PARTS[1]["topics"]
+        for difficulty in DIFFICULTIES
+        for i in range(4)
+    )
+
+
+def test_session_continues_on_another_worker(tmp_path):
+    bank = _bank()
+    path = str(tmp_path / "sessions.sqlite3")
+    worker_a = ExamSessionStore(bank, path=path)
+    worker_b = ExamSessionStore(bank, path=path)
+
+    async def run():
+        session = AdaptiveExamSession(bank, 1, max_items=10)
+        question = session.next_question()
+        await worker_a.add(session)
+
+        for turn in range(4):
+            store = worker_a if turn % 2 == 0 else worker_b
+            current = await store.get(session.session_id)
+            answered = len(current.responses)
+            current.record_response(question["id"], 0)
+            question = current.next_question()
+            assert await store.save(current, answered)
+
+        # A stale copy cannot record a second answer to the same item
+        stale = await worker_a.get(session.session_id)
+        replayed = await worker_b.get(session.session_id)
+        answered = len(stale.responses)
+        stale.record_response(question["id"], 1)
+        assert await worker_a.save(stale, answered)
+        replayed.record_response(question["id"], 2)
+        assert not await worker_b.save(replayed, answered)
+
+        final = await worker_b.get(session.session_id)
+        return final
+
+    final = asyncio.run(run())
+    assert len(final.responses) == 5
+    assert final.responses[-1]["answer"] == 1
+
+
+def test_idle_sessions_expire_and_live_copies_are_bounded(tmp_path):
+    bank = _bank()
+    store = ExamSessionStore(bank, path=str(tmp_path / "sessions.sqlite3"), ttl_seconds=0, cache_size=2)
+
+    async def run():
+        sessions = []
+        for _ in range(3):
+            session = AdaptiveExamSession(bank, 1)
+            session.next_question()
+            await store.add(session)
+            sessions.append(session)
+        return sessions
+
+    sessions = asyncio.run(run())
+    assert len(store._live) == 2
+    assert len(store) == 1  # Each add purges sessions idle past the TTL
+    assert asyncio.run(store.get(sessions[0].session_id)) is None
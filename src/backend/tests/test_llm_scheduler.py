@@ -0,0 +1,52 @@
+"""
+LLM Scheduler Tests
+Adaptive limit behaviour under latency jitter and sustained slowdowns
+"""
+
+import random
+
+import pytest
+
+from app.agents.llm_scheduler import ModelLimiter
+from app.config import settings
+
+
+def _feed(limiter: ModelLimiter, calls: int, sigma: float, in_flight: int, slowdown: float = 1.0, seed: int = 0):
+    """Finish `calls` calls with lognormal latency jitter at a fixed concurrency"""
+    rng = random.Random(seed)
+    for _ in range(calls):
+        tokens = rng.randint(50, 300)
+        latency_ms = (tokens + 32) * 20.0 * slowdown * rng.lognormvariate(0.0, sigma)
+        limiter.in_flight = in_flight
+        limiter.on_success(latency_ms, tokens)
+
+
+@pytest.mark.parametrize("sigma", [0.2, 0.4, 0.6])
+@pytest.mark.parametrize("in_flight", [1, 8])
+def test_jitter_alone_keeps_limit(sigma, in_flight):
+    limiter = ModelLimiter("test-model")
+    _feed(limiter, 5000, sigma, in_flight)
+
+    assert limiter.limit >= 0.9 * settings.LLM_CONCURRENCY_INITIAL
+    assert limiter.decreases == 0
+
+
+def test_jitter_while_saturated_grows_limit():
+    limiter = ModelLimiter("test-model")
+    _feed(limiter, 2000, 0.4, in_flight=settings.LLM_CONCURRENCY_INITIAL + 4)
+
+    assert limiter.limit > settings.LLM_CONCURRENCY_INITIAL
+
+
+def test_sustained_slowdown_backs_off_then_settles():
+    limiter = ModelLimiter("test-model")
+    _feed(limiter, 1000, 0.3, in_flight=4)
+    _feed(limiter, 2000, 0.3, in_flight=4, slowdown=3.0, seed=1)
+
+    assert limiter.decreases > 0
+    assert limiter.limit < settings.LLM_CONCURRENCY_INITIAL
+
+    # The baseline has followed the slower provider: no further backoff
+    decreases = limiter.decreases
+    _feed(limiter, 2000, 0.3, in_flight=4, slowdown=3.0, seed=2)
+    assert limiter.decreases == decreases
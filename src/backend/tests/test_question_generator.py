@@ -0,0 +1,45 @@
+"""
+Question Generator Tests
+Only questions that are written to the bank may enter the near-duplicate index
+"""
+
+import asyncio
+import json
+
+from app.agents.tax_specialist import TaxSpecialistAgent
+from app.services.question_dedup import NearDuplicateIndex
+from app.services.question_generator import FakeQuestionLLM, generate_question_bank
+
+
+def test_rejected_questions_stay_out_of_dedup_index(tmp_path):
+    index = NearDuplicateIndex()
+    agent = TaxSpecialistAgent(rag_retriever=None, dedup_index=index)
+    agent.call_openai = FakeQuestionLLM(agent, latency_ms=0, invalid_rate=0.3, seed=1)
+    output = tmp_path / "bank.jsonl"
+
+    report = asyncio.run(generate_question_bank(
+        agent, {("Partnerships", "medium"): 20, ("Penalties", "hard"): 20}, str(output)
+    ))
+
+    written = [json.loads(line) for line in output.read_text().splitlines()]
+    assert report["rejected"]["invalid"] > 0
+    assert len(index) == len(written) == report["generated"]
+    assert {q["id"] for q in written} == set(index._signatures)
+
+
+class _EverythingIsADuplicate(NearDuplicateIndex):
+    def find_duplicates(self, question):
+        return [("existing", 1.0)]
+
+
+def test_slot_costs_at_most_max_attempts_calls(tmp_path):
+    agent = TaxSpecialistAgent(rag_retriever=None, dedup_index=_EverythingIsADuplicate())
+    agent.call_openai = FakeQuestionLLM(agent, latency_ms=0, invalid_rate=0.0, seed=1)
+
+    report = asyncio.run(generate_question_bank(
+        agent, {("Partnerships", "medium"): 4}, str(tmp_path / "bank.jsonl"), max_attempts=3
+    ))
+
+    assert report["generated"] == 0 and report["unfilled"] == 4
+    assert report["rejected"]["duplicates"] == 12
+    assert report["llm_calls"] == report["max_llm_calls"] == 4 * 3
@@ -0,0 +1,27 @@
+"""
+Question Parser Tests
+Embedded JSON questions are found in one pass, however many braces surround them
+"""
+
+import json
+import time
+
+from app.utils.question_parser import extract_practice_question
+
+QUESTION = {"question": "Which form reports {K-1} items?", "options": ["A) 1065", "B) 1040"], "correct_answer": 0}
+
+
+def test_embedded_json_question_is_found():
+    text = f"Set notation {{a, b}} first. {{ not json {json.dumps(QUESTION)} }} trailing {{"
+    parsed = extract_practice_question(text)
+
+    assert parsed["question"] == QUESTION["question"]
+    assert parsed["options"] == QUESTION["options"]
+    assert parsed["correct_answer"] == 0
+
+
+def test_brace_heavy_answer_is_linear():
+    started = time.perf_counter()
+    assert extract_practice_question("{" * 20000 + "no question here") is None
+    assert extract_practice_question("{}" * 20000 + json.dumps(QUESTION))["correct_answer"] == 0
+    assert time.perf_counter() - started < 1.0
@@ -0,0 +1,89 @@
+"""
+Rollup Store Tests
+Heatmap counters match a brute-force count, and memory tracks the buckets used
+"""
+
+import random
+from collections import Counter
+from datetime import date, timedelta
+
+from app.services.rollup_store import RollupStore, bucket_of
+
+TODAY = date(2026, 3, 2)
+TOPICS = ["Partnerships", "Estates", "Ethics"]
+
+
+def _attempts(n: int, days: int, seed: int = 7):
+    rng = random.Random(seed)
+    return [
+        (rng.choice(TOPICS), rng.random() < 0.7, TODAY - timedelta(days=rng.randrange(days)))
+        for _ in range(n)
+    ]
+
+
+def _brute_force(attempts, start: date, end: date, granularity: str):
+    counts = Counter()
+    for topic, _, day in attempts:
+        if start <= day <= end or bucket_of(start, granularity) <= bucket_of(day, granularity) <= bucket_of(end, granularity):
+            counts[topic, bucket_of(day, granularity)] += 1
+    return counts
+
+
+def _store(attempts) -> RollupStore:
+    store = RollupStore()
+    for topic, is_correct, day in attempts:
+        store.record_attempt("u1", topic, is_correct, 1.0, attempted_on=day, today=TODAY)
+    return store
+
+
+def _counts(heatmap, granularity: str):
+    first = bucket_of(date.fromisoformat(heatmap["buckets"][0]), granularity)
+    return Counter({
+        (row["topic"], first + i): n
+        for row in heatmap["topics"]
+        for i, n in enumerate(row["attempts"])
+        if n
+    })
+
+
+def test_ranges_and_rollups_match_brute_force():
+    attempts = _attempts(2000, days=110)
+    store = _store(attempts)
+
+    for granularity, start, end in [
+        ("day", TODAY - timedelta(days=59), TODAY),
+        ("day", TODAY - timedelta(days=100), TODAY - timedelta(days=60)),
+        ("week", TODAY - timedelta(weeks=20), TODAY),
+        ("month", date(2025, 10, 1), TODAY),
+    ]:
+        heatmap = store.heatmap("u1", start, end, granularity, today=TODAY)
+        assert _counts(heatmap, granularity) == _brute_force(attempts, start, end, granularity), granularity
+
+
+def test_shuffled_ingest_uses_about_as_much_memory_as_in_order():
+    attempts = _attempts(3000, days=120)
+    in_order = _store(sorted(attempts, key=lambda a: a[2]))
+    shuffled = _store(random.Random(1).sample(attempts, len(attempts)))
+
+    assert shuffled.get_metrics()["memory_bytes"] <= 1.5 * in_order.get_metrics()["memory_bytes"]
+    start = TODAY - timedelta(days=59)
+    assert _counts(shuffled.heatmap("u1", start, TODAY, "day", today=TODAY), "day") == _brute_force(
+        attempts, start, TODAY, "day"
+    )
+
+
+def test_compaction_drops_expired_buckets_and_keeps_counts():
+    attempts = _attempts(1000, days=110)
+    store = _store(attempts)
+    later = TODAY + timedelta(days=30)
+
+    before = store.get_metrics()["cells"]
+    assert store.compact(today=later) > 0
+    assert store.get_metrics()["cells"] < before
+
+    # Day buckets still in retention are intact; the rest live on in weeks and months
+    start = later - timedelta(days=59)
+    heatmap = store.heatmap("u1", start, TODAY, "day", today=later)
+    assert _counts(heatmap, "day") == _brute_force(attempts, start, TODAY, "day")
+    heatmap = store.heatmap("u1", date(2025, 11, 1), TODAY, "month", today=later)
+    assert _counts(heatmap, "month") == _brute_force(attempts, date(2025, 11, 1), TODAY, "month")
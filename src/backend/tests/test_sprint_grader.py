@@ -0,0 +1,90 @@
+"""
+Sprint Grader Tests
+A known answer earns XP once per window, whatever batch, sprint or worker it arrives on
+"""
+
+import asyncio
+
+from app.services.answer_key import AnswerKey
+from app.services.attempt_ingest import AttemptIngest
+from app.services.sprint_grader import SprintGrader
+
+
+def _grader(tmp_path, **kwargs) -> SprintGrader:
+    answer_key = AnswerKey()
+    answer_key.add({"id": "q1", "correct_answer": 2, "topic": "Partnerships"})
+    answer_key.add({"id": "q2", "correct_answer": 0, "topic": "Partnerships"})
+    return SprintGrader(answer_key, path=str(tmp_path / "sprint_state.sqlite3"), **kwargs)
+
+
+def test_replayed_answer_is_not_credited_again(tmp_path):
+    grader = _grader(tmp_path)
+    first, attempts = asyncio.run(grader.grade("u1", [{"question_id": "q1", "answer": 2}]))
+    assert first["xp_earned"] > 0 and len(attempts) == 1
+
+    # Same answer in a new batch, a second time within one batch, and for another question
+    replay, attempts = asyncio.run(grader.grade("u1", [
+        {"question_id": "q1", "answer": 2},
+        {"question_id": "q2", "answer": 0},
+        {"question_id": "q2", "answer": 0},
+    ]))
+    assert [r["status"] for r in replay["results"]] == ["duplicate", "graded", "duplicate"]
+    assert [a["question_id"] for a in attempts] == ["q2"]
+    assert replay["total_xp"] == first["xp_earned"] + replay["xp_earned"]
+
+    # Other users are unaffected
+    other, _ = asyncio.run(grader.grade("u2", [{"question_id": "q1", "answer": 2}]))
+    assert other["results"][0]["status"] == "graded"
+
+
+def test_workers_share_xp_and_dedup(tmp_path):
+    worker_a, worker_b = _grader(tmp_path), _grader(tmp_path)
+    first, _ = asyncio.run(worker_a.grade("u1", [{"question_id": "q1", "answer": 2}]))
+
+    # Replaying on another worker earns nothing; its totals carry on from the first
+    replay, attempts = asyncio.run(worker_b.grade("u1", [
+        {"question_id": "q1", "answer": 2},
+        {"question_id": "q2", "answer": 0},
+    ]))
+    assert [r["status"] for r in replay["results"]] == ["duplicate", "graded"]
+    assert len(attempts) == 1
+    assert replay["streak"] == 2
+    assert replay["total_xp"] == first["xp_earned"] + replay["xp_earned"]
+
+    # And a restarted worker sees the same totals
+    worker_a.close()
+    restarted = _grader(tmp_path)
+    again, _ = asyncio.run(restarted.grade("u1", [{"question_id": "q2", "answer": 0}]))
+    assert again["xp_earned"] == 0
+    assert again["total_xp"] == replay["total_xp"]
+
+
+def test_answer_counts_again_after_the_window(tmp_path):
+    grader = _grader(tmp_path, dedup_window_seconds=0)
+    asyncio.run(grader.grade("u1", [{"question_id": "q1", "answer": 2}]))
+    again, attempts = asyncio.run(grader.grade("u1", [{"question_id": "q1", "answer": 2}]))
+
+    assert again["results"][0]["status"] == "graded"
+    assert len(attempts) == 1
+
+
+def test_stop_flushes_queued_rows():
+    ingested = []
+
+    async def run():
+        ingest = AttemptIngest([ingested.extend]).start()
+        ingest.submit([{"user_id": "u1"}] * 3)
+        await ingest.stop()
+        return ingest
+
+    ingest = asyncio.run(run())
+    assert ingest.ingested == len(ingested) == 3
+    assert ingest.get_metrics()["pending"] == 0
+
+
+def test_explicit_zero_overrides_setting(tmp_path):
+    grader = _grader(tmp_path, xp_per_correct=0)
+    graded, _ = asyncio.run(grader.grade("u1", [{"question_id": "q1", "answer": 2}]))
+
+    assert grader.xp_per_correct == 0
+    assert graded["xp_earned"] == 0
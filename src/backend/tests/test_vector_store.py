@@ -0,0 +1,72 @@
+"""
+Vector Store Tests
+IVF search agrees with exact search, and saved partitions load back as saved
+"""
+
+import os
+
+import numpy as np
+
+from app.rag.ann_index import IVFIndex
+from app.rag.vector_store import VectorStore, _normalize
+
+
+def _vectors(n: int, d: int = 16, seed: int = 0) -> np.ndarray:
+    return _normalize(np.random.RandomState(seed).randn(n, d))
+
+
+def _store(n: int = 400) -> VectorStore:
+    store = VectorStore()
+    store.add("p17", [{"id": f"c{i}"} for i in range(n)], _vectors(n))
+    return store
+
+
+def test_ivf_with_every_cell_probed_is_exact():
+    vectors = _vectors(1000)
+    index = IVFIndex.train(vectors, nlist=16)
+    query = vectors[3]
+
+    ids, scores = index.search(vectors, query, 10, nprobe=index.nlist)
+    exact = np.argsort(-(vectors @ query))[:10]
+    assert sorted(ids.tolist()) == sorted(exact.tolist())
+    assert np.allclose(np.sort(scores), np.sort(vectors[exact] @ query))
+    assert len(index) == len(vectors)
+
+
+def test_ivf_nprobe_is_clamped():
+    vectors = _vectors(200)
+    index = IVFIndex.train(vectors, nlist=8)
+
+    for nprobe in (0, -3):
+        ids, _ = index.search(vectors, vectors[0], 5, nprobe=nprobe)
+        assert 0 in ids.tolist()  # The query's own cell is always probed
+    ids, _ = index.search(vectors, vectors[0], 5, nprobe=1000)
+    assert len(ids) == 5
+
+
+def test_save_and_load_round_trip(tmp_path):
+    store = _store()
+    assert store.build_index(min_chunks=100, nlist=8) == ["p17"]
+    store.save(str(tmp_path))
+
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.partitions["p17"].index is not None
+    query = _vectors(1, seed=5)[0]
+    assert loaded.search(query, 5, nprobe=8) == store.search(query, 5, nprobe=8)
+
+
+def test_rebuilt_partition_without_index_drops_the_old_one(tmp_path):
+    indexed = _store()
+    indexed.build_index(min_chunks=100, nlist=8)
+    indexed.save(str(tmp_path))
+
+    # Rebuilt smaller, below the indexing threshold, over the loaded (memory-mapped) copy
+    VectorStore.load(str(tmp_path))
+    rebuilt = _store(50)
+    rebuilt.save(str(tmp_path))
+
+    assert sorted(os.listdir(tmp_path)) == ["p17"]
+    assert not os.path.exists(tmp_path / "p17" / "index.npz")
+    loaded = VectorStore.load(str(tmp_path))
+    assert loaded.partitions["p17"].index is None
+    assert len(loaded.search(_vectors(1, seed=5)[0], 5)) == 5